@@ -1,234 +1,197 @@
 import streamlit as st
 import os
-import tempfile
-from faster_whisper import WhisperModel
-import math
-
-def format_timestamp(seconds):
-    """Converts seconds to SRT timestamp format (HH:MM:SS,mmm)."""
-    hours = math.floor(seconds / 3600)
-    seconds %= 3600
-    minutes = math.floor(seconds / 60)
-    seconds %= 60
-    milliseconds = round((seconds - math.floor(seconds)) * 1000)
-    seconds = math.floor(seconds)
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+import io
+import itertools
+import functools
+import uuid
+import time
+from model_pool import get_model_pool
+import pipeline
+from subtitle_writer import MIME_TYPES, render_bytes, write_subtitles
+from transcription_cache import get_transcription_cache
+from uploads import save_upload
+import gemini_correction
+from hanspell_custom import hanspell
+from correction_memo import CorrectionMemo
+from pcm_cache import get_pcm_cache
+from job_queue import CANCELLED, DONE, QUEUED, JobCancelled, QueueFull, get_job_queue
+from progress import ProgressReporter, format_progress
+from metrics import DEFAULT_LOG_PATH, METRICS_PORT, Trace, get_metrics, timed
+from script_alignment import align_segments
+from keyword_extraction import KEYWORD_MODEL, extract_keywords_async, extract_keywords_local, get_keyword_cache
 
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-import re
-from collections import Counter
+# Only this many cues are rendered into the on-page preview; downloads contain everything
+PREVIEW_CUES = 300
+# Finished jobs shown in the metrics panel
+MAX_TRACES = 5
 
-try:
-    import google.generativeai as genai
-    HAS_GEMINI = True
-except ImportError:
-    HAS_GEMINI = False
-
-def format_text(text):
+def extract_keywords_with_gemini(script_text, limit=50):
     """
-    Removes punctuation except for " ' ,
+    Starts keyword extraction with Google Gemini in the background and returns a Future.
+    Results are cached per script and limit, so an unchanged script costs no API call.
     """
-    # Remove punctuation but keep " 
-    # We want to remove . ? ! ; : , ' etc.
-    # Regex: replace [.?!\-;:,'] with empty string.
-    text = re.sub(r"[.?!\-;:,']", '', text)
-    return text
-
-def split_into_segments(words, max_chars=16):
-    """Splits a list of words into segments based on character limit and punctuation."""
-    segments = []
-    current_words = []
-    
-    for word in words:
-        # Check if adding this word exceeds max_chars
-        current_len = sum(len(w.word) for w in current_words)
-        new_len = current_len + len(word.word)
-        
-        # Check if previous word ended with sentence-ending punctuation
-        force_break = False
-        if current_words:
-            last_word_text = current_words[-1].word.strip()
-            if last_word_text.endswith('.') or last_word_text.endswith('?'):
-                force_break = True
-        
-        if (new_len > max_chars and current_words) or force_break:
-            # Finalize current segment
-            start = current_words[0].start
-            end = current_words[-1].end
-            text = "".join([w.word for w in current_words])
-            formatted_text = format_text(text).strip()
-            
-            segments.append({
-                'start': start,
-                'end': end,
-                'text': formatted_text
-            })
-            
-            # Start new segment
-            current_words = [word]
-        else:
-            current_words.append(word)
-                
-    # Append last segment
-    if current_words:
-        start = current_words[0].start
-        end = current_words[-1].end
-        text = "".join([w.word for w in current_words])
-        formatted_text = format_text(text).strip()
-        segments.append({
-            'start': start,
-            'end': end,
-            'text': formatted_text
-        })
-        
-    return segments
-
-def generate_srt_content(segments):
-    """Generates SRT content from processed segments."""
-    srt_content = ""
-    for i, segment in enumerate(segments, start=1):
-        start_time = format_timestamp(segment['start'])
-        end_time = format_timestamp(segment['end'])
-        text = segment['text']
-        srt_content += f"{i}\n{start_time} --> {end_time}\n{text}\n\n"
-    return srt_content
+    get_generate = lambda: gemini_correction.get_gemini_generate(KEYWORD_MODEL)
+    return extract_keywords_async(script_text, get_generate, limit=limit)
 
-def extract_keywords_with_gemini(script_text, limit=50):
-    """Extracts keywords using Google Gemini API."""
-    if not HAS_GEMINI:
-        st.error("Google Generative AI library not found.")
-        return None
-        
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        st.warning("GEMINI_API_KEY not found in .env file. Please add it.")
-        return None
-        
+def wait_for_keywords(future):
+    """Returns the extracted keywords (or None), reporting problems in the page."""
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
-        Analyze the following text and extract exactly {limit} keywords.
-        
-        Prioritize:
-        1. People's names (Crucial)
-        2. Proper nouns (Places, Organizations)
-        3. Technical terms
-        4. Important nouns that appear frequently
-        
-        Rules:
-        - Extract as many relevant words as possible to reach the target of {limit}.
-        - Exclude common verbs and simple adjectives.
-        - Output ONLY the comma-separated list.
-        
-        Text:
-        {script_text[:10000]}
-        """
-        
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        keywords, cached = future.result()
+    except gemini_correction.GeminiUnavailable as e:
+        st.warning(str(e))
+        return None
     except Exception as e:
         st.error(f"Gemini Error: {e}")
         return None
+    if cached:
+        st.caption("Keywords loaded from cache.")
+    return keywords or None
 
-def correct_with_gemini(srt_content):
-    """Corrects SRT content using Gemini API."""
-    if not HAS_GEMINI:
-        st.error("Google Generative AI library not found.")
-        return None
-        
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        st.error("GEMINI_API_KEY not found in .env file.")
+def correct_with_gemini(segments, concurrency=gemini_correction.DEFAULT_CONCURRENCY, memo=None):
+    """
+    Corrects subtitle text using Gemini API; only the text is sent, timings stay local.
+    Subtitles already in the memo are not sent again.
+    """
+    try:
+        generate = gemini_correction.get_gemini_generate()
+    except gemini_correction.GeminiUnavailable as e:
+        st.error(str(e))
         return None
-        
+
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
-        You are a professional subtitle editor. 
-        Please correct any typos, spelling mistakes, and grammatical errors in the following Korean SRT subtitles.
-        
-        IMPORTANT RULES:
-        1. Keep the exact SRT format (numbers, timestamps, blank lines).
-        2. Do NOT change the timing.
-        3. Only correct the text content.
-        4. Remove any punctuation (commas, periods, question marks) from the corrected text if they were added, to maintain the clean style.
-        5. Output ONLY the corrected SRT content, no other text.
-        
-        SRT Content:
-        {srt_content}
-        """
-        
-        response = model.generate_content(prompt)
-        return response.text
+        corrected_segments, report = gemini_correction.correct_segments(
+            segments, generate, memo=memo, concurrency=concurrency
+        )
     except Exception as e:
         st.error(f"Gemini API Error: {e}")
         return None
 
-def transcribe_audio(audio_path, initial_prompt=None, max_chars=16, progress_bar=None):
-    """Transcribes audio using Faster-Whisper."""
-    model_size = "medium"
-    
+    if report['unchanged_lines']:
+        st.warning(
+            f"{report['unchanged_lines']} of {len(segments)} subtitles could not be corrected "
+            "and were left unchanged."
+        )
+    if report['reused']:
+        st.caption(f"Sent {report['sent']} new subtitles; {report['reused']} were corrected before.")
+    return corrected_segments
+
+def transcribe_audio(job, audio_path, initial_prompt=None, max_chars=16, workers=1, audio_hash=None, trace=None):
+    """
+    Transcribes audio using Faster-Whisper as a background job, reporting progress to the job.
+    Returns (segments, raw transcript, info, finished trace); info.cached is set when the
+    transcript came from the cache. Runs outside the script thread, so it must not call Streamlit.
+    """
+    trace = trace or Trace("transcription")
     try:
-        model = WhisperModel(model_size, device="auto", compute_type="int8")
+        segments, raw_transcript, info = _transcribe(job, trace, audio_path, initial_prompt, max_chars, workers, audio_hash)
+    except JobCancelled:
+        trace.finish("cancelled")
+        raise
     except Exception as e:
-        st.error(f"Error loading model: {e}")
-        return None
+        trace.finish("failed", type(e).__name__)
+        raise
+    trace.attrs['cached'] = bool(getattr(info, "cached", False))
+    return segments, raw_transcript, info, trace.finish()
 
-    # Enable word_timestamps to allow precise splitting
-    segments, info = model.transcribe(
-        audio_path, 
-        beam_size=5, 
-        initial_prompt=initial_prompt,
-        language="ko",
-        word_timestamps=True
-    )
-    
-    total_duration = info.duration
-    processed_segments = []
-    
-    for segment in segments:
-        # Update progress
-        if progress_bar and total_duration > 0:
-            progress = min(segment.end / total_duration, 1.0)
-            progress_bar.progress(progress, text=f"Transcribing... {int(progress*100)}%")
-        
-        # Check length of the full segment (formatted)
-        formatted_text = format_text(segment.text).strip()
-        
-        if len(formatted_text) <= max_chars:
-            # Keep original segment (but formatted)
-            processed_segments.append({
-                'start': segment.start,
-                'end': segment.end,
-                'text': formatted_text
-            })
-        else:
-            # Split this long segment using its words
-            if segment.words:
-                sub_segments = split_into_segments(segment.words, max_chars=max_chars)
-                processed_segments.extend(sub_segments)
-            else:
-                # Fallback
-                processed_segments.append({
-                    'start': segment.start,
-                    'end': segment.end,
-                    'text': formatted_text
-                })
-            
-    if progress_bar:
-        progress_bar.progress(1.0, text="Processing Subtitles...")
-        
-    return processed_segments
+def _transcribe(job, trace, audio_path, initial_prompt, max_chars, workers, audio_hash):
+    def on_progress(progress):
+        job.report(progress.fraction, f"Transcribing... {format_progress(progress)}")
+
+    def on_wait(ahead):
+        job.report(0.0, f"Waiting for a free model ({ahead} job(s) ahead)..." if ahead else "Waiting for a free model...")
+
+    # Whisper reports every segment; the page only needs an update now and then
+    with ProgressReporter(on_progress) as reporter:
+        raw_transcript, info = pipeline.transcribe_raw(
+            audio_path,
+            initial_prompt=initial_prompt,
+            progress_callback=reporter,
+            wait_callback=on_wait,
+            workers=workers,
+            audio_hash=audio_hash,
+            trace=trace
+        )
+
+    job.report(1.0, "Processing Subtitles...")
+    with trace.span("segmentation") as span:
+        segments = pipeline.resegment(raw_transcript, max_chars=max_chars, keep_words=True)
+        span['subtitles'] = len(segments)
+    return segments, raw_transcript, info
+
+def remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+def end_job(path, trace):
+    """Job cleanup: removes the upload and closes the trace of a job cancelled before it started."""
+    remove_file(path)
+    trace.finish("cancelled")
+
+def render_download(segments, fmt):
+    with timed("render", format=fmt, subtitles=len(segments)):
+        return render_bytes(segments, fmt)
+
+def keep_trace(record):
+    """Remembers a finished trace for the metrics panel (most recent last)."""
+    st.session_state.traces = (st.session_state.traces + [record])[-MAX_TRACES:]
+
+def show_metrics(traces):
+    """Stage timings of the session's latest jobs."""
+    with st.expander("Job Metrics"):
+        for record in reversed(traces):
+            rss = f", peak memory {record['peak_rss_mb']:.0f} MB" if record.get('peak_rss_mb') else ""
+            st.caption(f"**{record['kind']}** ({record['status']}): {record['seconds']:.2f}s{rss}")
+            rows = [
+                {
+                    'stage': span['stage'],
+                    'seconds': round(span['seconds'], 3),
+                    'cpu seconds': round(span.get('cpu_seconds', 0.0), 3),
+                    'real-time factor': round(span['rtf'], 3) if 'rtf' in span else None,
+                }
+                for span in record['spans']
+            ]
+            if rows:
+                st.dataframe(rows, hide_index=True)
+        where = f"Appended to {DEFAULT_LOG_PATH}"
+        if METRICS_PORT:
+            where += f"; Prometheus metrics at :{METRICS_PORT}/metrics"
+        st.caption(where)
+
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id):
+    """Polls the background job once a second; a full rerun collects the result when it ends."""
+    queue = get_job_queue()
+    job = queue.get(job_id)
+    if job is None or not job.active:
+        st.rerun()
+    if job.status == QUEUED:
+        ahead = queue.position(job)
+        st.info(f"Waiting for {ahead} other job(s) to finish..." if ahead else "Starting transcription...")
+    else:
+        st.progress(job.progress, text=job.message or "Starting transcription...")
+    if st.button("Cancel", key="cancel_job"):
+        queue.cancel(job_id)
+        st.rerun()
+
+def align_to_script_text(segments, script_text):
+    """Snaps subtitle text to the script's wording; keeps the transcription if rapidfuzz is missing."""
+    try:
+        aligned, stats = align_segments(segments, script_text)
+    except ImportError:
+        st.warning("rapidfuzz is not installed; subtitles were not aligned to the script.")
+        return segments
+    st.caption(f"Aligned {stats['snapped']} of {len(segments)} subtitles to the script.")
+    return aligned
+
+def preview_srt(segments):
+    """Renders the first PREVIEW_CUES cues as SRT for the preview box."""
+    buffer = io.StringIO()
+    write_subtitles(itertools.islice(segments, PREVIEW_CUES), srt=buffer)
+    return buffer.getvalue()
 
 st.set_page_config(page_title="Local SRT Generator", page_icon="🎬")
+# Starts the /metrics endpoint once per process when METRICS_PORT is set
+get_metrics()
 
 st.title("🎬 Local SRT Generator")
 st.markdown("""
@@ -244,6 +207,53 @@ with st.sidebar:
     st.divider()
     prompt_limit = st.slider("Prompt Word Count", min_value=10, max_value=100, value=50, step=10)
     st.caption("Number of keywords to extract from script.")
+    keyword_source = st.radio("Keyword Extraction", ["Gemini", "Local (offline)"], horizontal=True)
+    st.caption("Local extraction ranks frequent nouns and names without any network call.")
+    align_to_script = st.checkbox("Align Subtitles to Script", value=False)
+    st.caption("Replaces recognized lines with the script's exact wording when they match closely.")
+
+    st.divider()
+    workers = st.number_input("Parallel Workers", min_value=1, max_value=os.cpu_count() or 1, value=1, step=1)
+    st.caption("More than 1 splits long audio on silence and transcribes the pieces in parallel.")
+
+    st.divider()
+    correction_concurrency = st.slider("Parallel Correction Requests", min_value=1, max_value=8,
+                                       value=gemini_correction.DEFAULT_CONCURRENCY)
+    st.caption("Gemini correction sends batches of subtitles concurrently.")
+
+    st.divider()
+    pool = get_model_pool()
+    with st.expander("Loaded Models"):
+        loaded = pool.loaded()
+        if loaded:
+            for (size, device, compute_type, cpu_threads, num_workers, instance), mb in loaded:
+                st.caption(f"{size} #{instance + 1} ({device}, {compute_type}, {cpu_threads or 'auto'} threads) ~{mb} MB")
+        else:
+            st.caption("No models loaded.")
+        st.caption(f"Memory budget: {pool.memory_budget_mb} MB")
+        if st.button("Unload Models", disabled=not loaded):
+            pool.clear()
+            st.rerun()
+
+    cache = get_transcription_cache()
+    with st.expander("Transcription Cache"):
+        stats = cache.stats()
+        st.caption(f"Hits: {stats['hits']} / Misses: {stats['misses']} ({stats['hit_rate']:.0%} hit rate)")
+        st.caption(f"{stats['entries']} transcripts, {stats['size_bytes'] / 2**20:.1f} / {stats['max_bytes'] / 2**20:.0f} MB")
+        pcm = get_pcm_cache()
+        pcm_stats = pcm.stats()
+        st.caption(
+            f"Decoded audio: {pcm_stats['entries']} files, {pcm_stats['seconds'] / 60:.0f} min, "
+            f"{pcm_stats['size_bytes'] / 2**20:.0f} / {pcm_stats['max_bytes'] / 2**20:.0f} MB"
+        )
+        keyword_cache = get_keyword_cache()
+        keyword_stats = keyword_cache.stats()
+        st.caption(f"Keywords: {keyword_stats['entries']} scripts, {keyword_stats['hits']} hits")
+        if st.button("Clear Cache", disabled=not (stats['entries'] or pcm_stats['entries'] or keyword_stats['entries'])):
+            cache.clear()
+            pcm.clear()
+            keyword_cache.clear()
+            st.rerun()
 
 uploaded_file = st.file_uploader("Upload MP3 Audio", type=["mp3", "wav", "m4a"])
 script_text = st.text_area("Script (Optional - helps with accuracy)", height=200, placeholder="Paste your script here...")
@@ -251,59 +261,139 @@ script_text = st.text_area("Script (Optional - helps with accuracy)", height=200
 # Initialize session state
 if 'segments' not in st.session_state:
     st.session_state.segments = None
-if 'srt_output' not in st.session_state:
-    st.session_state.srt_output = None
-if 'corrected_srt' not in st.session_state:
-    st.session_state.corrected_srt = None
+if 'raw_transcript' not in st.session_state:
+    # Raw Whisper output of the last job, so formatting changes never need a re-transcription
+    st.session_state.raw_transcript = None
+if 'segments_max_chars' not in st.session_state:
+    st.session_state.segments_max_chars = None
+if 'alignment_script' not in st.session_state:
+    # Script the current subtitles were aligned to (None when alignment is off)
+    st.session_state.alignment_script = None
+if 'corrected_segments' not in st.session_state:
+    st.session_state.corrected_segments = None
+if 'correction_memos' not in st.session_state:
+    # Corrections per subtitle text, so later corrections only send new or changed subtitles
+    st.session_state.correction_memos = {'gemini': CorrectionMemo(), 'speller': CorrectionMemo()}
+    st.session_state.correction_source = None
 if 'extracted_keywords' not in st.session_state:
     st.session_state.extracted_keywords = None
+if 'job_id' not in st.session_state:
+    # Background transcription of this session, polled until it ends
+    st.session_state.job_id = None
+    st.session_state.job_alignment_script = None
+    st.session_state.job_max_chars = None
+    st.session_state.session_owner = uuid.uuid4().hex
+if 'traces' not in st.session_state:
+    # Finished job traces of this session, for the metrics panel
+    st.session_state.traces = []
 
 initial_prompt = None
 
 if uploaded_file is not None:
-    st.audio(uploaded_file, format='audio/mp3')
+    # The player shares the upload's buffer; the transcriber reads a file streamed to disk below
+    st.audio(uploaded_file, format=uploaded_file.type or 'audio/mp3')
     
-    if st.button("Generate Subtitles", type="primary"):
+    if st.button("Generate Subtitles", type="primary", disabled=bool(st.session_state.job_id)):
         # Reset corrected SRT on new generation
-        st.session_state.corrected_srt = None
-        
-        # 1. Extract Keywords (if script provided)
-        if script_text:
-            with st.spinner("Step 1/2: Extracting keywords from script with Gemini..."):
-                initial_prompt = extract_keywords_with_gemini(script_text, limit=prompt_limit)
-                if initial_prompt:
-                    st.session_state.extracted_keywords = initial_prompt
-                    st.info(f"Context: {initial_prompt}")
+        st.session_state.corrected_segments = None
         
-        # Save uploaded file to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_path = tmp_file.name
+        # Timings of every stage of this job, finished by the background job
+        trace = Trace("transcription")
 
-        try:
-            with st.spinner("Step 2/2: Generating subtitles... (This may take a moment)"):
-                progress_bar = st.progress(0, text="Starting transcription...")
-                
-                segments = transcribe_audio(tmp_path, initial_prompt, max_chars, progress_bar)
-                
-                if segments:
-                    srt_output = generate_srt_content(segments)
-                    
-                    # Save to session state
-                    st.session_state.segments = segments
-                    st.session_state.srt_output = srt_output
-                    
-                    st.success("Transcription Complete!")
-                else:
-                    st.error("Transcription failed or returned no segments.")
+        # 1. Extract Keywords (if script provided); Gemini overlaps with saving the audio
+        keyword_future = None
+        if script_text and keyword_source == "Gemini":
+            keyword_started = time.perf_counter()
+            keyword_future = extract_keywords_with_gemini(script_text, limit=prompt_limit)
+            keyword_future.add_done_callback(
+                lambda _: trace.add("keyword_extraction", time.perf_counter() - keyword_started, source="gemini")
+            )
+        elif script_text:
+            with trace.span("keyword_extraction", source="local"):
+                initial_prompt = extract_keywords_local(script_text, limit=prompt_limit)
         
-        except Exception as e:
-            st.error(f"An error occurred: {e}")
+        # Stream the upload to a temporary file in chunks, hashing it on the way;
+        # identical audio + settings reuses the cached transcript instead of re-running Whisper
+        with trace.span("upload") as span:
+            tmp_path, audio_hash, span['bytes'] = save_upload(uploaded_file, uploaded_file.name)
         
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        try:
+            if keyword_future:
+                # The audio is decoded by the job, in the background while its model loads
+                with st.spinner("Step 1/2: Extracting keywords from script with Gemini..."):
+                    initial_prompt = wait_for_keywords(keyword_future)
+            if initial_prompt:
+                st.session_state.extracted_keywords = initial_prompt
+                st.info(f"Context: {initial_prompt}")
+
+            # Step 2/2 runs in the background, so reruns (widget changes) do not interrupt it
+            job = get_job_queue().submit(
+                transcribe_audio, tmp_path, initial_prompt, max_chars, workers, audio_hash, trace,
+                owner=st.session_state.session_owner,
+                cleanup=functools.partial(end_job, tmp_path, trace)
+            )
+        except QueueFull as e:
+            remove_file(tmp_path)
+            trace.finish("rejected")
+            st.error(str(e))
+        except BaseException as e:
+            # Also a rerun or stop of the script: the job never took the upload over, so delete it here
+            remove_file(tmp_path)
+            trace.finish("failed", type(e).__name__)
+            raise
+        else:
+            st.session_state.job_id = job.id
+            st.session_state.job_alignment_script = script_text if align_to_script and script_text else None
+            st.session_state.job_max_chars = max_chars
+
+if st.session_state.job_id:
+    job = get_job_queue().get(st.session_state.job_id)
+    if job is not None and job.active:
+        show_job_progress(job.id)
+    else:
+        # The job ended: move its result into the session once
+        st.session_state.job_id = None
+        if job is None:
+            st.error("The transcription job was lost (the server may have restarted).")
+        elif job.status == DONE:
+            segments, raw_transcript, info, record = job.result
+            keep_trace(record)
+            if segments and st.session_state.job_alignment_script:
+                segments = align_to_script_text(segments, st.session_state.job_alignment_script)
+            if segments:
+                # Save to session state; SRT/VTT/JSON are rendered from these on demand
+                st.session_state.segments = segments
+                st.session_state.raw_transcript = raw_transcript
+                # If max_chars changed while the job ran, the block below re-splits right away
+                st.session_state.segments_max_chars = st.session_state.job_max_chars
+                st.session_state.alignment_script = st.session_state.job_alignment_script
+                if getattr(info, "cached", False):
+                    st.success("Transcription Complete! (loaded from cache)")
+                else:
+                    st.success("Transcription Complete!")
+            else:
+                st.error("Transcription failed or returned no segments.")
+        elif job.status == CANCELLED:
+            st.warning("Transcription cancelled.")
+        else:
+            st.error(f"An error occurred: {job.error}")
+
+# Formatting settings changed since the last job: re-split the stored words instead of re-transcribing
+if st.session_state.raw_transcript is not None and st.session_state.segments_max_chars != max_chars:
+    with timed("resegment", "segmentation", max_chars=max_chars):
+        st.session_state.segments = pipeline.resegment(st.session_state.raw_transcript, max_chars=max_chars, keep_words=True)
+    if st.session_state.alignment_script:
+        st.session_state.segments = align_to_script_text(st.session_state.segments, st.session_state.alignment_script)
+    st.session_state.segments_max_chars = max_chars
+    if st.session_state.corrected_segments:
+        # Re-apply the corrections already made; lines that are new after the re-split stay as transcribed
+        memo = st.session_state.correction_memos[st.session_state.correction_source]
+        st.session_state.corrected_segments, stats = memo.apply(st.session_state.segments)
+        if stats['pending']:
+            st.info(
+                f"Subtitles were re-split for the new line length; {stats['pending']} new lines are not corrected yet. "
+                "Run the correction again to send only those."
+            )
 
 # Display results if available in session state
 if st.session_state.segments:
@@ -313,34 +403,66 @@ if st.session_state.segments:
     col1, col2 = st.columns(2)
     
     with col1:
+        download_format = st.selectbox("Format", ["srt", "vtt", "json"], format_func=str.upper)
+        segments = st.session_state.segments
+        # Rendered only when the button is clicked, streamed into a byte buffer
         st.download_button(
-            label="Download Original SRT",
-            data=st.session_state.srt_output,
-            file_name="subtitles.srt",
-            mime="text/plain",
+            label=f"Download Original {download_format.upper()}",
+            data=lambda: render_download(segments, download_format),
+            file_name=f"subtitles.{download_format}",
+            mime=MIME_TYPES[download_format],
             key="download_original"
         )
         
     with col2:
         if st.button("✨ Auto-Correct with Gemini"):
             with st.spinner("Correcting typos and grammar with Gemini..."):
-                corrected_srt = correct_with_gemini(st.session_state.srt_output)
-                if corrected_srt:
-                    st.session_state.corrected_srt = corrected_srt
+                with Trace("correction", source="gemini") as trace, trace.span("correction"):
+                    corrected_segments = correct_with_gemini(
+                        st.session_state.segments,
+                        concurrency=correction_concurrency,
+                        memo=st.session_state.correction_memos['gemini']
+                    )
+                keep_trace(trace.record)
+                if corrected_segments:
+                    st.session_state.corrected_segments = corrected_segments
+                    st.session_state.correction_source = 'gemini'
                     st.success("Correction Complete!")
         # The `correct_with_gemini` function internally checks for API key and handles errors.
         # So, the disabled button logic is now handled within the function or by its return value.
+        if st.button("✨ Correct Grammar"):
+            with st.spinner("Checking spelling and spacing with Naver Speller..."):
+                with Trace("correction", source="speller") as trace, trace.span("correction") as span:
+                    corrected_segments, stats = hanspell.correct_segments(
+                        st.session_state.segments, memo=st.session_state.correction_memos['speller']
+                    )
+                    span.update(sent=stats['sent'], changed=stats['changed'])
+                keep_trace(trace.record)
+                st.session_state.corrected_segments = corrected_segments
+                st.session_state.correction_source = 'speller'
+                st.success(f"Correction Complete! ({stats['changed']} subtitles changed, {stats['sent']} sent)")
+                if stats['failed']:
+                    st.warning(f"{stats['failed']} subtitles could not be checked and were left unchanged.")
 
-    st.text_area("Preview Subtitles (Original)", st.session_state.srt_output, height=300)
+    st.text_area("Preview Subtitles (Original)", preview_srt(st.session_state.segments), height=300)
+    if len(st.session_state.segments) > PREVIEW_CUES:
+        st.caption(f"Showing the first {PREVIEW_CUES} of {len(st.session_state.segments)} subtitles.")
     
-    if st.session_state.corrected_srt:
+    if st.session_state.corrected_segments:
         st.divider()
         st.subheader("✨ Corrected Subtitles")
+        corrected_segments = st.session_state.corrected_segments
         st.download_button(
-            label="Download Corrected SRT",
-            data=st.session_state.corrected_srt,
-            file_name="subtitles_corrected.srt",
-            mime="text/plain",
+            label=f"Download Corrected {download_format.upper()}",
+            data=lambda: render_download(corrected_segments, download_format),
+            file_name=f"subtitles_corrected.{download_format}",
+            mime=MIME_TYPES[download_format],
             key="download_corrected"
         )
-        st.text_area("Preview Corrected", st.session_state.corrected_srt, height=300)
+        st.text_area("Preview Corrected", preview_srt(corrected_segments), height=300)
+        diffs = st.session_state.correction_memos[st.session_state.correction_source].diff(st.session_state.segments)
+        with st.expander(f"Changes ({len(diffs)} subtitles)"):
+            st.dataframe(diffs[:PREVIEW_CUES], hide_index=True)
+
+if st.session_state.traces:
+    show_metrics(st.session_state.traces)
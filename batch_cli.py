@@ -0,0 +1,257 @@
+"""
+Headless batch transcription: writes an .srt (and optionally .vtt/.json) next to
+every audio file.
+
+    python batch_cli.py lectures/ "podcasts/**/*.m4a" --workers 4 --formats srt,vtt
+
+Each worker process loads its own Whisper model once and keeps it for all the
+files it handles. Files whose outputs are newer than the audio are skipped unless
+--force is given.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pipeline
+from progress import ProgressReporter, format_progress
+from subtitle_writer import FORMATS, write_subtitles
+from transcription_cache import hash_file
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a")
+
+def collect_audio_files(inputs, recursive=False):
+    """Expands directories, glob patterns and plain paths into a sorted list of audio files."""
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        elif os.path.isfile(item):
+            candidates = [item]
+        else:
+            candidates = glob.glob(item, recursive=True)
+
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(AUDIO_EXTENSIONS):
+                found.add(os.path.abspath(path))
+    return sorted(found)
+
+def output_path_for(audio_path, fmt="srt"):
+    return os.path.splitext(audio_path)[0] + "." + fmt
+
+def srt_path_for(audio_path):
+    return output_path_for(audio_path, "srt")
+
+def is_up_to_date(audio_path, srt_path):
+    """True if the subtitle file exists and is at least as new as the audio."""
+    return os.path.exists(srt_path) and os.path.getmtime(srt_path) >= os.path.getmtime(audio_path)
+
+def worker_cpu_threads(workers):
+    """Splits the machine's cores evenly across worker processes."""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+def _init_worker(model_size, compute_type, cpu_threads, chunk_workers=1):
+    # Load the model up front so the first file in each worker is not slower than the rest,
+    # through the same lease transcribe_file will take so no other copy is loaded.
+    # A failure here is reported per file by transcribe_file instead of breaking the pool.
+    try:
+        with pipeline.model_lease(model_size, compute_type=compute_type, cpu_threads=cpu_threads,
+                                  workers=chunk_workers):
+            pass
+    except Exception:
+        pass
+
+def needs_transcription(audio_path, formats):
+    return not all(is_up_to_date(audio_path, output_path_for(audio_path, fmt)) for fmt in formats)
+
+def write_outputs(segments, audio_path, formats):
+    """Streams the segments into every requested format in one pass. Returns the output paths."""
+    paths = {fmt: output_path_for(audio_path, fmt) for fmt in formats}
+    # Write to temp names first so an interrupted run never leaves a
+    # partial file that looks up to date
+    streams = {fmt: open(path + ".part", "w", encoding="utf-8", newline="") for fmt, path in paths.items()}
+    try:
+        write_subtitles(
+            segments,
+            srt=streams.get("srt"),
+            vtt=streams.get("vtt"),
+            json_out=streams.get("json")
+        )
+    finally:
+        for stream in streams.values():
+            stream.close()
+    for path in paths.values():
+        os.replace(path + ".part", path)
+    return list(paths.values())
+
+def progress_printer(audio_path, interval):
+    """A ProgressReporter printing '<file>: 42% (1:23 left, ...)' to stderr every `interval` seconds."""
+    name = os.path.basename(audio_path)
+
+    def show(progress):
+        print(f"{name}: {format_progress(progress)}", file=sys.stderr, flush=True)
+
+    return ProgressReporter(show, interval=interval)
+
+def transcribe_file(audio_path, options):
+    """Transcribes one file and writes its subtitles. Returns a result dict (never raises)."""
+    formats = options.get("formats", ("srt",))
+    started = time.perf_counter()
+    interval = options.get("progress_interval")
+    reporter = progress_printer(audio_path, interval) if interval else None
+    try:
+        audio_hash = hash_file(audio_path) if options.get("cache", True) else None
+        segments, info = pipeline.transcribe(
+            audio_path,
+            initial_prompt=options.get("initial_prompt"),
+            progress_callback=reporter,
+            max_chars=options.get("max_chars", 16),
+            model_size=options.get("model_size", pipeline.DEFAULT_MODEL_SIZE),
+            compute_type=options.get("compute_type", "int8"),
+            cpu_threads=options.get("cpu_threads", 0),
+            workers=options.get("chunk_workers", 1),
+            keep_words="json" in formats,
+            audio_hash=audio_hash
+        )
+        outputs = write_outputs(segments, audio_path, formats)
+        return {
+            'audio': audio_path,
+            'outputs': outputs,
+            'duration': info.duration,
+            'elapsed': time.perf_counter() - started,
+            'cues': len(segments),
+            'error': None
+        }
+    except Exception as e:
+        return {
+            'audio': audio_path,
+            'outputs': [],
+            'duration': 0.0,
+            'elapsed': time.perf_counter() - started,
+            'cues': 0,
+            'error': str(e)
+        }
+    finally:
+        if reporter:
+            reporter.close()
+
+def format_result(result, done, total):
+    if result['error']:
+        return f"[{done}/{total}] FAILED {result['audio']}: {result['error']}"
+    speed = result['duration'] / result['elapsed'] if result['elapsed'] > 0 else 0.0
+    outputs = ", ".join(os.path.basename(path) for path in result['outputs'])
+    return (
+        f"[{done}/{total}] {result['audio']} -> {outputs} "
+        f"({result['cues']} cues, {result['duration']:.1f}s audio in {result['elapsed']:.1f}s, {speed:.2f}x)"
+    )
+
+def format_summary(results, skipped, wall_seconds):
+    """Builds the end-of-run summary including audio-hours per wall-hour."""
+    ok = [r for r in results if not r['error']]
+    failed = len(results) - len(ok)
+    audio_hours = sum(r['duration'] for r in ok) / 3600
+    wall_hours = wall_seconds / 3600
+    throughput = audio_hours / wall_hours if wall_hours > 0 else 0.0
+    return (
+        f"Transcribed {len(ok)} file(s), skipped {skipped}, failed {failed}. "
+        f"{audio_hours:.2f} audio-hours in {wall_hours:.2f} wall-hours "
+        f"({throughput:.2f} audio-hours per wall-hour)."
+    )
+
+def run_batch(audio_files, options, workers=1, force=False, log=print):
+    """Transcribes every file that needs it. Returns (results, skipped_count)."""
+    formats = options.get("formats", ("srt",))
+    pending = [p for p in audio_files if force or needs_transcription(p, formats)]
+    skipped = len(audio_files) - len(pending)
+    if skipped:
+        log(f"Skipping {skipped} up-to-date file(s).")
+
+    results = []
+    total = len(pending)
+    if not pending:
+        return results, skipped
+
+    if workers <= 1:
+        for path in pending:
+            result = transcribe_file(path, options)
+            results.append(result)
+            log(format_result(result, len(results), total))
+        return results, skipped
+
+    initargs = (
+        options.get("model_size", pipeline.DEFAULT_MODEL_SIZE),
+        options.get("compute_type", "int8"),
+        options.get("cpu_threads", 0),
+        options.get("chunk_workers", 1)
+    )
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        futures = [executor.submit(transcribe_file, path, options) for path in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            log(format_result(result, len(results), total))
+    return results, skipped
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("inputs", nargs="+", help="Audio files, directories or glob patterns")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes (default: 1)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Search directories recursively")
+    parser.add_argument("-f", "--force", action="store_true", help="Re-transcribe even if the SRT is up to date")
+    parser.add_argument("--model", default=pipeline.DEFAULT_MODEL_SIZE, help="Whisper model size")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--cpu-threads", type=int, default=None,
+                        help="Threads per worker (default: cores divided by workers)")
+    parser.add_argument("--chunk-workers", type=int, default=1,
+                        help="Split each file on silence and transcribe chunks with this many threads")
+    parser.add_argument("--max-chars", type=int, default=16, help="Max characters per subtitle line")
+    parser.add_argument("--formats", default="srt",
+                        help="Comma-separated output formats: srt, vtt, json (default: srt)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the transcription cache")
+    parser.add_argument("--prompt", default=None, help="Initial prompt (keywords) passed to Whisper")
+    parser.add_argument("--progress", type=float, default=None, metavar="SECONDS",
+                        help="Print each file's progress and ETA to stderr at most this often")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    audio_files = collect_audio_files(args.inputs, recursive=args.recursive)
+    if not audio_files:
+        print("No audio files found.", file=sys.stderr)
+        return 1
+
+    formats = tuple(fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip())
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown or not formats:
+        print(f"Unknown output format(s): {', '.join(unknown) or args.formats}", file=sys.stderr)
+        return 2
+
+    workers = max(1, args.workers)
+    options = {
+        "model_size": args.model,
+        "compute_type": args.compute_type,
+        "cpu_threads": args.cpu_threads if args.cpu_threads is not None else worker_cpu_threads(workers),
+        "chunk_workers": args.chunk_workers,
+        "max_chars": args.max_chars,
+        "formats": formats,
+        "cache": not args.no_cache,
+        "initial_prompt": args.prompt,
+        "progress_interval": args.progress
+    }
+
+    print(f"Found {len(audio_files)} audio file(s); using {workers} worker(s) with {options['cpu_threads']} thread(s) each.")
+    started = time.perf_counter()
+    results, skipped = run_batch(audio_files, options, workers=workers, force=args.force)
+    print(format_summary(results, skipped, time.perf_counter() - started))
+
+    return 1 if any(r['error'] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark: sequential vs. VAD-chunked parallel transcription of the same file.
+
+    python bench_chunked.py lecture.m4a --workers 8 --model medium
+    python bench_chunked.py --fake --minutes 30 --workers 8   # simulated model, no download
+
+Prints wall time for both paths, the speedup, and how many subtitle cues each produced.
+"""
+import argparse
+import os
+import time
+
+import pipeline
+from chunked import SAMPLE_RATE, transcribe_chunked
+
+class SleepyModel:
+    """Fake model whose transcription time is proportional to the audio length (GIL released)."""
+
+    def __init__(self, real_time_factor):
+        self.real_time_factor = real_time_factor
+
+    def transcribe(self, audio, **kwargs):
+        seconds = len(audio) / SAMPLE_RATE
+        time.sleep(seconds * self.real_time_factor)
+        words = [pipeline.Word(t, t + 0.4, " 말", 1.0) for t in range(0, int(seconds))]
+        segment = pipeline.Segment(0.0, float(int(seconds)), "".join(w.word for w in words), words)
+        return iter([segment]), None
+
+def bench_fake(args):
+    import numpy as np
+
+    total_seconds = int(args.minutes * 60)
+    audio = np.zeros(total_seconds * SAMPLE_RATE, dtype="float32")
+    # 8 seconds of "speech" every 10 seconds
+    speech = [
+        {'start': t * SAMPLE_RATE, 'end': (t + 8) * SAMPLE_RATE}
+        for t in range(0, total_seconds - 8, 10)
+    ]
+    model = SleepyModel(args.fake_rtf)
+
+    started = time.perf_counter()
+    segments, _ = model.transcribe(audio)
+    list(segments)
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    transcribe_chunked(
+        audio,
+        workers=args.workers,
+        max_chunk_seconds=args.chunk_seconds,
+        speech_timestamps=speech,
+        model=model
+    )
+    parallel = time.perf_counter() - started
+    return sequential, parallel, None, None
+
+def bench_real(args):
+    from chunked import load_audio
+    from model_pool import get_model_pool
+
+    options = {"model_size": args.model, "compute_type": args.compute_type}
+    cores = os.cpu_count() or 1
+    # Load both model configurations up front so only transcription is timed
+    pool = get_model_pool()
+    pool.get(args.model, compute_type=args.compute_type, cpu_threads=cores)
+    pool.get(args.model, compute_type=args.compute_type, cpu_threads=max(1, cores // args.workers),
+             num_workers=args.workers)
+    audio = load_audio(args.audio)
+
+    started = time.perf_counter()
+    sequential_segments, _ = pipeline.transcribe(audio, cpu_threads=cores, **options)
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parallel_segments, _ = pipeline.transcribe(
+        audio,
+        workers=args.workers,
+        max_chunk_seconds=args.chunk_seconds,
+        **options
+    )
+    parallel = time.perf_counter() - started
+    return sequential, parallel, len(sequential_segments), len(parallel_segments)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", nargs="?")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--model", default="medium")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--chunk-seconds", type=float, default=60)
+    parser.add_argument("--fake", action="store_true")
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--fake-rtf", type=float, default=0.002, help="Simulated seconds of compute per audio second")
+    args = parser.parse_args()
+
+    if not args.fake and not args.audio:
+        parser.error("an audio file is required unless --fake is given")
+
+    sequential, parallel, sequential_cues, parallel_cues = bench_fake(args) if args.fake else bench_real(args)
+    print(f"sequential: {sequential:8.2f}s" + (f"  ({sequential_cues} cues)" if sequential_cues is not None else ""))
+    print(f"chunked x{args.workers}: {parallel:8.2f}s" + (f"  ({parallel_cues} cues)" if parallel_cues is not None else ""))
+    print(f"speedup: {sequential / parallel:.2f}x")
+
+if __name__ == "__main__":
+    main()
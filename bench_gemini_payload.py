@@ -0,0 +1,83 @@
+"""
+Benchmark: correction payload size (and, with --live, latency) of the old
+"echo the whole SRT" protocol vs. the compact NUMBER|TEXT protocol.
+
+    python bench_gemini_payload.py subtitles.srt            # token estimates only
+    python bench_gemini_payload.py subtitles.srt --live     # also count tokens and time real calls
+
+Without a file, a synthetic 30-minute transcript is used.
+"""
+import argparse
+import time
+
+import gemini_correction
+from gemini_correction import build_prompt, estimate_tokens
+from pipeline import generate_srt_content
+from srt_parser import parse_file, parse_subtitles
+
+# The prompt used before the compact protocol, for comparison
+SRT_ECHO_PROMPT = """
+        You are a professional subtitle editor.
+        Please correct any typos, spelling mistakes, and grammatical errors in the following Korean SRT subtitles.
+
+        IMPORTANT RULES:
+        1. Keep the exact SRT format (numbers, timestamps, blank lines).
+        2. Do NOT change the timing.
+        3. Only correct the text content.
+        4. Remove any punctuation (commas, periods, question marks) from the corrected text if they were added, to maintain the clean style.
+        5. Output ONLY the corrected SRT content, no other text.
+
+        SRT Content:
+        {srt_content}
+        """
+
+def synthetic_srt(minutes=30):
+    phrases = ["안녕하세요 여러분", "오늘은 날씨가 좋네요", "김민중 씨가 말했습니다", "그래서 결론은", "다음 주에 봬요"]
+    segments = [
+        {'start': i * 2.5, 'end': i * 2.5 + 2.2, 'text': phrases[i % len(phrases)]}
+        for i in range(int(minutes * 60 / 2.5))
+    ]
+    return generate_srt_content(segments)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("srt", nargs="?")
+    parser.add_argument("--live", action="store_true", help="Call Gemini (needs GEMINI_API_KEY)")
+    args = parser.parse_args()
+
+    if args.srt:
+        cues, _ = parse_file(args.srt)
+    else:
+        cues, _ = parse_subtitles(synthetic_srt())
+
+    numbered = [(i, c['text']) for i, c in enumerate(cues, start=1)]
+    srt = generate_srt_content(cues)
+    old_prompt = SRT_ECHO_PROMPT.format(srt_content=srt)
+    new_prompt = build_prompt(numbered)
+    # The expected reply is the payload itself, echoed back corrected
+    old_reply = srt
+    new_reply = "\n".join(f"{n}|{t}" for n, t in numbered)
+
+    print(f"{len(cues)} cues")
+    print(f"{'':10} {'prompt chars':>14} {'~tokens':>9} {'reply chars':>13} {'~tokens':>9}")
+    for name, prompt, reply in (("srt echo", old_prompt, old_reply), ("compact", new_prompt, new_reply)):
+        print(f"{name:10} {len(prompt):14,} {estimate_tokens(prompt):9,} {len(reply):13,} {estimate_tokens(reply):9,}")
+    saved = 1 - (len(new_prompt) + len(new_reply)) / (len(old_prompt) + len(old_reply))
+    print(f"estimated tokens saved (in + out): {saved:.0%}")
+
+    if not args.live:
+        return
+
+    import google.generativeai as genai
+    generate = gemini_correction.get_gemini_generate()
+    model = genai.GenerativeModel(gemini_correction.GEMINI_MODEL)
+    for name, prompt in (("srt echo", old_prompt), ("compact", new_prompt)):
+        tokens_in = model.count_tokens(prompt).total_tokens
+        started = time.perf_counter()
+        reply = generate(prompt)
+        elapsed = time.perf_counter() - started
+        tokens_out = model.count_tokens(reply).total_tokens
+        print(f"{name:10} in {tokens_in:,} tokens, out {tokens_out:,} tokens, {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
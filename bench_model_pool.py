@@ -0,0 +1,70 @@
+"""
+Benchmark: latency of consecutive transcription jobs with and without the model pool.
+
+    python bench_model_pool.py [audio_file] [--model tiny] [--jobs 3]
+    python bench_model_pool.py --fake     # no model download; simulated load/decode cost
+
+Without the pool every job pays the model load; with the pool only the first does,
+so jobs 2..N should take transcription time only.
+"""
+import argparse
+import time
+
+from model_pool import ModelPool, load_whisper_model
+
+class FakeWhisperModel:
+    """Stands in for WhisperModel: slow to construct, fixed cost per transcription."""
+
+    def __init__(self, load_seconds, transcribe_seconds):
+        time.sleep(load_seconds)
+        self.transcribe_seconds = transcribe_seconds
+
+    def transcribe(self, audio, **kwargs):
+        time.sleep(self.transcribe_seconds)
+        return iter(()), None
+
+def make_audio(seconds=10):
+    import numpy as np
+    t = np.arange(int(16000 * seconds)) / 16000
+    return (0.1 * np.sin(2 * np.pi * 220 * t)).astype("float32")
+
+def run_job(get_model, audio, model_size):
+    start = time.perf_counter()
+    model = get_model(model_size)
+    loaded = time.perf_counter()
+    segments, _ = model.transcribe(audio, beam_size=5, language="ko", word_timestamps=True)
+    for _ in segments:
+        pass
+    end = time.perf_counter()
+    return loaded - start, end - loaded
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", nargs="?", help="Audio file to transcribe (default: 10s synthetic tone)")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--jobs", type=int, default=3)
+    parser.add_argument("--fake", action="store_true", help="Use a simulated model instead of faster-whisper")
+    parser.add_argument("--fake-load", type=float, default=2.0)
+    parser.add_argument("--fake-transcribe", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.fake:
+        def loader(model_size, **kwargs):
+            return FakeWhisperModel(args.fake_load, args.fake_transcribe)
+        audio = None
+    else:
+        loader = load_whisper_model
+        audio = args.audio or make_audio()
+
+    scenarios = [
+        ("no pool", lambda size: loader(size, device="auto", compute_type="int8")),
+        ("pooled", ModelPool(loader=loader).get),
+    ]
+    for name, get_model in scenarios:
+        print(f"--- {name} ---")
+        for job in range(1, args.jobs + 1):
+            load_s, transcribe_s = run_job(get_model, audio, args.model)
+            print(f"job {job}: load {load_s:7.3f}s  transcribe {transcribe_s:7.3f}s  total {load_s + transcribe_s:7.3f}s")
+
+if __name__ == "__main__":
+    main()
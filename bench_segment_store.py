@@ -0,0 +1,96 @@
+"""
+Benchmark: SegmentStore against lists of segment dicts.
+
+    python bench_segment_store.py [--cues 100000]
+
+Times the same work on both representations: formatting every timestamp, writing
+the SRT file, shifting all cues, converting the frame rate and closing short gaps,
+and compares the memory each one holds (traced allocations of building it).
+"""
+import argparse
+import io
+import random
+import time
+import tracemalloc
+
+from pipeline import format_timestamp
+from segment_store import SegmentStore, format_timestamps
+from subtitle_writer import write_subtitles
+
+VOCABULARY = ["오늘은", "날씨가", "정말", "좋네요", "그리고", "김민중", "씨가", "말했습니다", "네", "강의를"]
+
+def make_segments(cues, seed=0):
+    rng = random.Random(seed)
+    segments = []
+    t = 0.0
+    for _ in range(cues):
+        start = t + rng.uniform(0.0, 0.8)
+        end = start + rng.uniform(0.8, 3.0)
+        segments.append({'start': start, 'end': end, 'text': " ".join(rng.choices(VOCABULARY, k=3))})
+        t = end
+    return segments
+
+def dict_shift(segments, seconds):
+    return [dict(s, start=max(s['start'] + seconds, 0.0), end=max(s['end'] + seconds, 0.0)) for s in segments]
+
+def dict_scale(segments, factor):
+    return [dict(s, start=s['start'] * factor, end=s['end'] * factor) for s in segments]
+
+def dict_close_gaps(segments, max_gap, min_gap=0.0):
+    closed = [dict(s) for s in segments]
+    for current, following in zip(closed, closed[1:]):
+        gap = following['start'] - current['end']
+        if min_gap < gap <= max_gap:
+            current['end'] = following['start'] - min_gap
+    return closed
+
+def best_time(fn, runs=3):
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def traced_mb(build):
+    tracemalloc.start()
+    try:
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cues", type=int, default=100000)
+    args = parser.parse_args()
+
+    segments = make_segments(args.cues)
+    store = SegmentStore.from_segments(segments)
+    times = [t for s in segments for t in (s['start'], s['end'])]
+
+    cases = [
+        ("format timestamps", lambda: [format_timestamp(t) for t in times],
+         lambda: (format_timestamps(store.starts).tolist(), format_timestamps(store.ends).tolist())),
+        ("write srt", lambda: write_subtitles(segments, srt=io.StringIO()), lambda: store.write_srt(io.StringIO())),
+        ("shift", lambda: dict_shift(segments, -1.5), lambda: store.shift(-1.5)),
+        ("23.976 -> 25 fps", lambda: dict_scale(segments, 23.976 / 25), lambda: store.convert_frame_rate(23.976, 25)),
+        ("close gaps", lambda: dict_close_gaps(segments, 0.5, 0.05), lambda: store.close_gaps(0.5, 0.05)),
+    ]
+    print(f"{args.cues:,} cues")
+    print(f"{'operation':<20} {'dicts ms':>10} {'store ms':>10} {'speed-up':>9}")
+    for name, with_dicts, with_store in cases:
+        dict_seconds = best_time(with_dicts)
+        store_seconds = best_time(with_store)
+        print(f"{name:<20} {dict_seconds * 1000:>10.1f} {store_seconds * 1000:>10.1f} "
+              f"{dict_seconds / store_seconds:>8.1f}x")
+
+    dict_mb = traced_mb(lambda: make_segments(args.cues))
+    store_mb = traced_mb(lambda: SegmentStore.from_segments(make_segments(args.cues)))
+    print(f"{'memory held':<20} {dict_mb:>9.1f}M {store_mb:>9.1f}M {dict_mb / store_mb:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: split_into_segments on synthetic word streams.
+
+    python bench_split.py [--hours 10]
+
+"subtitles" uses the normal 16-character limit (many short segments).
+"no breaks" uses an unbounded limit and no punctuation, so everything lands in one
+segment; this is where the previous sum()-per-word implementation went quadratic.
+"""
+import argparse
+import random
+import time
+
+from pipeline import split_into_segments
+from test_split_linear import MockWord, reference_split_into_segments
+
+WORDS_PER_SECOND = 2.8  # typical Korean speech rate in Whisper word tokens
+
+def make_words(hours, punctuation=True, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [" 오늘은", " 날씨가", " 정말", " 좋네요", " 그리고", " 김민중", " 씨가", " 말했습니다", " 네"]
+    enders = [".", "?", ""] if punctuation else [""]
+    words = []
+    t = 0.0
+    for _ in range(int(hours * 3600 * WORDS_PER_SECOND)):
+        text = rng.choice(vocabulary)
+        if rng.random() < 0.1:
+            text += rng.choice(enders)
+        words.append(MockWord(text, t, t + 0.3))
+        t += 1 / WORDS_PER_SECOND
+    return words
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=10)
+    parser.add_argument("--reference-cap", type=int, default=20000,
+                        help="Max words fed to the old implementation in the no-breaks case")
+    args = parser.parse_args()
+
+    words = make_words(args.hours)
+    print(f"--- subtitles: {len(words)} words ({args.hours:g} h), max_chars=16 ---")
+    new_s, new_segments = timed(split_into_segments, words, max_chars=16)
+    old_s, old_segments = timed(reference_split_into_segments, words, max_chars=16)
+    assert new_segments == old_segments
+    print(f"linear:    {new_s:7.3f}s  ({len(words) / new_s:,.0f} words/s)")
+    print(f"reference: {old_s:7.3f}s  ({len(words) / old_s:,.0f} words/s)")
+
+    words = make_words(args.hours, punctuation=False)
+    print(f"--- no breaks: {len(words)} words in one segment ---")
+    new_s, _ = timed(split_into_segments, words, max_chars=10**9)
+    print(f"linear:    {new_s:7.3f}s  ({len(words) / new_s:,.0f} words/s)")
+    capped = words[:args.reference_cap]
+    old_s, _ = timed(reference_split_into_segments, capped, max_chars=10**9)
+    print(f"reference: {old_s:7.3f}s  for only {len(capped)} words ({len(capped) / old_s:,.0f} words/s)")
+
+if __name__ == "__main__":
+    main()
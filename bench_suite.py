@@ -0,0 +1,271 @@
+"""
+Benchmark suite for the subtitle pipeline, with a stored baseline.
+
+    python bench_suite.py                      # run and compare with bench_baseline.json
+    python bench_suite.py --sizes 1min 10min   # only the small inputs
+    python bench_suite.py --save-baseline      # record this machine's numbers as the baseline
+
+Micro benchmarks time the real pipeline functions (format_timestamp, format_text,
+split_into_segments, generate_srt_content) and the SRT parser on synthetic Korean
+speech; the macro benchmark runs pipeline.transcribe_audio end to end with a fake
+WhisperModel that yields segments and words at a normal speech rate, so it measures
+everything except Whisper itself. Inputs go from 1 minute to 10 hours of audio.
+
+Each benchmark is timed in REPEATS samples of at least SAMPLE_SECONDS each (the
+function is called as often as that takes). Virtual machines speed up and slow
+down by tens of percent between (and during) runs, so every sample is paired with
+a sample of a fixed reference workload, and the result is scored as ops per
+reference run. A result records the median throughput (ops/sec), the median score,
+its spread (standard error relative to the score) and the peak traced memory of one
+run. A result is a regression when its score drops by more than the larger of
+--tolerance and NOISE_FACTOR times the combined spread of the run and the
+baseline, or when its memory grows by more than --tolerance; the exit status is
+then 1.
+
+Timings only compare on the same machine, so no baseline is shipped: record one
+with --save-baseline on the machine that runs the comparison (bench_baseline.json
+is ignored by git).
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+import pipeline
+from srt_parser import parse_subtitles
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+SIZES = {"1min": 60, "10min": 600, "1h": 3600, "10h": 36000}
+WORDS_PER_SECOND = 2.8  # typical Korean speech rate in Whisper word tokens
+WORDS_PER_SEGMENT = 14
+# Smallest score drop (and memory growth) reported; noisier results get a wider margin.
+# Scores of unchanged code moved by up to about 25% between runs on a shared VM
+DEFAULT_TOLERANCE = 0.3
+# How many standard errors a score drop must exceed to count as a regression
+NOISE_FACTOR = 3
+# Small results are noisy in absolute terms; memory growth below this is ignored
+MEMORY_SLACK_MB = 1.0
+# Timed samples per benchmark; each one calls the function until it ran this long
+REPEATS = 11
+SAMPLE_SECONDS = 0.1
+
+Info = namedtuple("Info", "duration language")
+
+VOCABULARY = [" 오늘은", " 날씨가", " 정말", " 좋네요", " 그리고", " 김민중", " 씨가", " 말했습니다", " 네", " 강의를"]
+
+def make_words(seconds, seed=0):
+    """Synthetic Whisper words covering `seconds` of speech, with occasional sentence ends."""
+    rng = random.Random(seed)
+    words = []
+    step = 1 / WORDS_PER_SECOND
+    for i in range(int(seconds * WORDS_PER_SECOND)):
+        text = rng.choice(VOCABULARY)
+        if rng.random() < 0.1:
+            text += rng.choice(".?,")
+        start = i * step
+        words.append(pipeline.Word(start, start + step * 0.9, text, 0.9))
+    return words
+
+def make_segments(words):
+    """Groups words into Whisper-sized segments."""
+    for i in range(0, len(words), WORDS_PER_SEGMENT):
+        chunk = words[i:i + WORDS_PER_SEGMENT]
+        yield pipeline.Segment(chunk[0].start, chunk[-1].end, "".join(w.word for w in chunk), chunk)
+
+class FakeWhisperModel:
+    """Stands in for WhisperModel: yields synthetic segments lazily, like faster-whisper does."""
+
+    def __init__(self, seconds, seed=0):
+        self.seconds = seconds
+        self.seed = seed
+
+    def transcribe(self, audio, **kwargs):
+        return make_segments(make_words(self.seconds, self.seed)), Info(self.seconds, pipeline.LANGUAGE)
+
+def make_cases(seconds):
+    """(name, unit, ops, fn) for every benchmark at one input size; inputs are built outside the timing."""
+    words = make_words(seconds)
+    segments = pipeline.split_into_segments(words)
+    timestamps = [t for s in segments for t in (s['start'], s['end'])]
+    texts = [s.text for s in make_segments(words)]
+    srt = pipeline.generate_srt_content(segments)
+    model = FakeWhisperModel(seconds)
+
+    def format_timestamps():
+        for t in timestamps:
+            pipeline.format_timestamp(t)
+
+    def format_texts():
+        for text in texts:
+            pipeline.format_text(text)
+
+    return [
+        ("format_timestamp", "timestamps", len(timestamps), format_timestamps),
+        ("format_text", "segments", len(texts), format_texts),
+        ("split_into_segments", "words", len(words), lambda: pipeline.split_into_segments(words)),
+        ("generate_srt_content", "cues", len(segments), lambda: pipeline.generate_srt_content(segments)),
+        ("parse_srt", "cues", len(segments), lambda: parse_subtitles(srt)),
+        ("transcribe_audio", "audio seconds", seconds,
+         lambda: pipeline.transcribe_audio("synthetic.wav", model=model)),
+    ]
+
+def time_calls(fn, number):
+    """Seconds per call of `number` back-to-back calls."""
+    # Like timeit: a collection landing in one sample would only add noise
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+    return elapsed / number
+
+def reference_work():
+    """Fixed pure-Python workload (formatting, dicts, lists); results are scored against its speed."""
+    parts = []
+    for i in range(2000):
+        item = {'index': i, 'text': f"{i // 60:02d}:{i % 60:02d},{i * 7 % 1000:03d}"}
+        parts.append(item['text'].split(",")[0])
+    return " ".join(parts)
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+def calls_per_sample(fn):
+    # The first call warms up and tells how many calls fill a sample
+    first = time_calls(fn, 1)
+    return max(1, math.ceil(SAMPLE_SECONDS / first)) if first > 0 else 1
+
+def measure(fn, ops):
+    """
+    Returns {'ops_per_sec', 'seconds', 'score', 'spread', 'peak_mb'} from REPEATS timed
+    samples, then one traced run. Each sample is paired with a sample of reference_work
+    right before it: 'score' is the median of ops per reference_work call, which
+    cancels out how fast the machine happens to be running, and 'spread' is the
+    standard error of that median relative to it.
+    """
+    number = calls_per_sample(fn)
+    reference_number = calls_per_sample(reference_work)
+    samples, scores = [], []
+    for _ in range(REPEATS):
+        reference_seconds = time_calls(reference_work, reference_number)
+        seconds = time_calls(fn, number)
+        samples.append(seconds)
+        scores.append(ops * reference_seconds / seconds if seconds else float("inf"))
+    seconds = median(samples)
+    score = median(scores)
+    # Standard error of the median, from the median absolute deviation (normal samples)
+    deviation = 1.4826 * median(abs(s - score) for s in scores)
+    spread = 1.2533 * deviation / math.sqrt(REPEATS) / score if score else 0.0
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'ops_per_sec': ops / seconds if seconds else float("inf"),
+        'seconds': seconds,
+        'score': score,
+        'spread': spread,
+        'peak_mb': peak / 2**20,
+    }
+
+def run_suite(sizes=tuple(SIZES), names=None):
+    """Runs the benchmarks; returns {"name[size]": {'unit', 'ops', 'ops_per_sec', 'seconds', 'score', 'spread', 'peak_mb'}}."""
+    results = {}
+    for size in sizes:
+        for name, unit, ops, fn in make_cases(SIZES[size]):
+            if names and name not in names:
+                continue
+            result = measure(fn, ops)
+            result.update(unit=unit, ops=ops)
+            results[f"{name}[{size}]"] = result
+    return results
+
+def allowed_drop(result, base, tolerance=DEFAULT_TOLERANCE):
+    """Fraction of the baseline score a result may lose before it counts as a regression."""
+    noise = NOISE_FACTOR * math.hypot(result.get('spread', 0.0), base.get('spread', 0.0))
+    return max(tolerance, noise)
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns a list of regression messages (empty when everything is within tolerance)."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or 'score' not in base:
+            # Not in the baseline, or recorded before results were scored
+            continue
+        allowed = allowed_drop(result, base, tolerance)
+        if result['score'] < base['score'] * (1 - allowed):
+            regressions.append(
+                f"{key}: score {result['score']:,.1f}, baseline {base['score']:,.1f} "
+                f"({result['score'] / base['score'] - 1:+.0%}, allowed -{allowed:.0%})"
+            )
+        if result['peak_mb'] > base['peak_mb'] * (1 + tolerance) + MEMORY_SLACK_MB:
+            regressions.append(f"{key}: peak {result['peak_mb']:.1f} MB, baseline {base['peak_mb']:.1f} MB")
+    return regressions
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)['results']
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Stores results in the baseline file, keeping entries for benchmarks that were not run."""
+    merged = load_baseline(path)
+    merged.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'python': sys.version.split()[0], 'results': merged}, f, indent=1, sort_keys=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--only", nargs="+", help="Benchmark names to run (default: all)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results = run_suite(args.sizes, args.only)
+
+    print(f"{'benchmark':<32} {'ops/sec':>14} {'unit':<14} {'spread':>7} {'peak MB':>8} {'vs base':>8}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        change = f"{result['score'] / base['score'] - 1:+.0%}" if base and 'score' in base else "-"
+        print(f"{key:<32} {result['ops_per_sec']:>14,.0f} {result['unit']:<14} {result['spread']:>7.1%} "
+              f"{result['peak_mb']:>8.1f} {change:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if not baseline:
+        print("No baseline to compare with (run with --save-baseline).")
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
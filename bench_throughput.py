@@ -0,0 +1,159 @@
+"""
+Load test: job latency when several sessions transcribe at once.
+
+    python bench_throughput.py                          # simulated 8-core box, no model download
+    python bench_throughput.py --instances 2 --cores 16
+    python bench_throughput.py --real audio.wav --model tiny
+
+Compares two set-ups at 1, 4 and 8 concurrent sessions (each running --jobs jobs
+back to back) and prints p50/p95 job latency and throughput:
+
+-   unbounded: every job loads its own model with all cores (what happens without
+    a shared pool), so concurrent jobs fight over the cores.
+-   pool: jobs lease one of --instances pooled models (model_pool.ModelPool.lease),
+    each with its share of the cores; other jobs wait for a free one.
+
+The simulated machine shares --cores between the running jobs. A job's speed grows
+with its threads by Amdahl's law (--parallel share of the work scales), and once
+more threads run than there are cores everyone loses --oversubscription of their
+speed to context switches. Loading a model costs --load core-seconds, one
+transcription --work core-seconds. The numbers show the shape of the trade-off,
+not real Whisper timings; use --real for those.
+"""
+import argparse
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+
+from model_pool import ModelPool, load_whisper_model, thread_plan
+
+TICK = 0.005
+SESSIONS = (1, 4, 8)
+
+Info = namedtuple("Info", "duration")
+
+class SimulatedCpu:
+    def __init__(self, cores, parallel=0.8, oversubscription=0.15):
+        self.cores = cores
+        self.parallel = parallel
+        self.oversubscription = oversubscription
+        self.threads = 0
+        self._lock = threading.Lock()
+
+    def _speed(self, threads, running):
+        share = threads * min(1.0, self.cores / running)
+        if share < 1:
+            speed = share
+        else:
+            speed = 1 / ((1 - self.parallel) + self.parallel / share)
+        if running > self.cores:
+            speed *= 1 - self.oversubscription
+        return speed
+
+    def run(self, work, threads):
+        """Blocks until `work` single-core seconds are done on `threads` threads."""
+        with self._lock:
+            self.threads += threads
+        try:
+            done = 0.0
+            while done < work:
+                time.sleep(TICK)
+                with self._lock:
+                    running = self.threads
+                done += TICK * self._speed(threads, running)
+        finally:
+            with self._lock:
+                self.threads -= threads
+
+class SimulatedModel:
+    def __init__(self, cpu, threads, load_work, work):
+        self.cpu = cpu
+        self.threads = threads
+        self.work = work
+        cpu.run(load_work, threads)
+
+    def transcribe(self, audio, **kwargs):
+        self.cpu.run(self.work, self.threads)
+        return iter(()), Info(duration=0.0)
+
+def percentile(values, share):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+def transcribe(model, audio):
+    segments, _ = model.transcribe(audio, beam_size=5, language="ko", word_timestamps=True)
+    for _ in segments:
+        pass
+
+def run_sessions(sessions, jobs, job):
+    """Runs `sessions` threads of `jobs` back-to-back jobs each. Returns (latencies, wall seconds)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def session():
+        for _ in range(jobs):
+            start = time.perf_counter()
+            job()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=2, help="Model instances in the pool")
+    parser.add_argument("--jobs", type=int, default=3, help="Jobs per session")
+    parser.add_argument("--cores", type=int, default=8, help="Simulated cores")
+    parser.add_argument("--work", type=float, default=1.0, help="Simulated core-seconds per transcription")
+    parser.add_argument("--load", type=float, default=0.5, help="Simulated core-seconds per model load")
+    parser.add_argument("--parallel", type=float, default=0.8)
+    parser.add_argument("--oversubscription", type=float, default=0.15)
+    parser.add_argument("--real", metavar="AUDIO", help="Transcribe this file with faster-whisper instead")
+    parser.add_argument("--model", default="tiny")
+    args = parser.parse_args()
+
+    if args.real:
+        cores = os.cpu_count() or 1
+        audio = args.real
+
+        def load(model_size, cpu_threads=0, **kwargs):
+            return load_whisper_model(model_size, cpu_threads=cpu_threads)
+    else:
+        cores = args.cores
+        cpu = SimulatedCpu(cores, args.parallel, args.oversubscription)
+        audio = None
+
+        def load(model_size, cpu_threads=0, **kwargs):
+            return SimulatedModel(cpu, cpu_threads or cores, args.load, args.work)
+
+    pool = ModelPool(memory_budget_mb=10**6, loader=load)
+    threads = thread_plan(args.instances, cores)
+
+    def unbounded_job():
+        transcribe(load(args.model, cpu_threads=cores), audio)
+
+    def pooled_job():
+        with pool.lease(args.model, cpu_threads=threads, instances=args.instances) as model:
+            transcribe(model, audio)
+
+    print(f"{cores} cores, pool of {args.instances} x {threads} threads, {args.jobs} jobs per session")
+    print(f"{'set-up':<10} {'sessions':>8} {'p50 s':>8} {'p95 s':>8} {'jobs/min':>9}")
+    for name, job in (("unbounded", unbounded_job), ("pool", pooled_job)):
+        for sessions in SESSIONS:
+            latencies, wall = run_sessions(sessions, args.jobs, job)
+            print(
+                f"{name:<10} {sessions:>8} {percentile(latencies, 0.5):>8.2f} "
+                f"{percentile(latencies, 0.95):>8.2f} {len(latencies) / wall * 60:>9.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Parallel transcription of a single long file.
+
+The audio is decoded once, cut into chunks of bounded length at silences found by
+the Silero VAD bundled with faster-whisper, and the chunks are transcribed
+concurrently by one model loaded with num_workers > 1. Each chunk is padded with a
+little overlap for context; afterwards every word is kept only by the chunk whose
+(unpadded) span contains its midpoint, which removes the duplicated boundary words.
+"""
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from model_pool import get_model_pool
+from pipeline import BEAM_SIZE, DEFAULT_MODEL_SIZE, LANGUAGE, Segment, Word
+
+SAMPLE_RATE = 16000
+
+ChunkedInfo = namedtuple("ChunkedInfo", "duration language chunks")
+
+def load_audio(audio, sampling_rate=SAMPLE_RATE):
+    """Returns audio as a mono float32 array, decoding paths and file objects."""
+    if hasattr(audio, "dtype"):
+        return audio
+    from faster_whisper.audio import decode_audio
+    return decode_audio(audio, sampling_rate=sampling_rate)
+
+def detect_speech(audio, max_chunk_seconds, sampling_rate=SAMPLE_RATE):
+    """Runs the Silero VAD and returns [{'start': sample, 'end': sample}, ...]."""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+    options = VadOptions(
+        min_silence_duration_ms=300,
+        max_speech_duration_s=max_chunk_seconds,
+        speech_pad_ms=200
+    )
+    return get_speech_timestamps(audio, options, sampling_rate=sampling_rate)
+
+def plan_chunks(speech_timestamps, total_samples, max_chunk_seconds=60, sampling_rate=SAMPLE_RATE):
+    """
+    Groups speech regions into contiguous chunks no longer than max_chunk_seconds.
+    Cuts are placed in the middle of the silence between two speech regions.
+    Returns a list of (start_sample, end_sample) covering the speech. When the VAD
+    found no speech, the whole file is one chunk, as in sequential transcription.
+    """
+    if not speech_timestamps:
+        return [(0, total_samples)] if total_samples else []
+
+    max_samples = int(max_chunk_seconds * sampling_rate)
+    chunks = []
+    chunk_start = 0
+    previous_end = None
+
+    for region in speech_timestamps:
+        if previous_end is not None and region['end'] - chunk_start > max_samples:
+            cut = (previous_end + region['start']) // 2
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+        previous_end = region['end']
+
+    chunks.append((chunk_start, total_samples))
+    return chunks
+
+def _shift_segment(segment, offset):
+    words = None
+    if segment.words:
+        words = [Word(w.start + offset, w.end + offset, w.word, w.probability) for w in segment.words]
+    return Segment(segment.start + offset, segment.end + offset, segment.text, words)
+
+def stitch_chunks(chunk_results):
+    """
+    Merges per-chunk segments into one absolute-time segment list.
+
+    chunk_results is a list of (own_start, own_end, segments) in seconds, where the
+    segments already carry absolute timestamps. Only words whose midpoint falls in
+    [own_start, own_end) are kept, and a word repeated across the boundary is dropped.
+    """
+    stitched = []
+    last_word = None
+
+    for own_start, own_end, segments in chunk_results:
+        for segment in segments:
+            if not segment.words:
+                midpoint = (segment.start + segment.end) / 2
+                if own_start <= midpoint < own_end:
+                    stitched.append(segment)
+                continue
+
+            kept = []
+            for word in segment.words:
+                midpoint = (word.start + word.end) / 2
+                if not own_start <= midpoint < own_end:
+                    continue
+                # Whisper may place the same word slightly differently in two chunks
+                if (last_word is not None and word.word.strip() == last_word.word.strip()
+                        and word.start < last_word.end):
+                    continue
+                kept.append(word)
+                last_word = word
+
+            if not kept:
+                continue
+            if len(kept) == len(segment.words):
+                stitched.append(segment)
+            else:
+                text = "".join(w.word for w in kept)
+                stitched.append(Segment(kept[0].start, kept[-1].end, text, kept))
+
+    return stitched
+
+def chunk_threads(workers, cpu_threads=0):
+    """CPU threads per chunk worker, splitting the caller's thread budget (default: every core)."""
+    return max(1, (cpu_threads or os.cpu_count() or 1) // max(1, workers))
+
+def get_chunk_model(workers, model_size=DEFAULT_MODEL_SIZE, device="auto", compute_type="int8", cpu_threads=0):
+    """
+    Returns the pooled model set up for `workers` concurrent chunks. cpu_threads is the
+    total thread budget (e.g. one batch process's share), split between the chunks.
+    """
+    return get_model_pool().get(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=chunk_threads(workers, cpu_threads),
+        num_workers=workers
+    )
+
+def transcribe_chunked(audio, initial_prompt=None, workers=None, max_chunk_seconds=60,
+                       overlap_seconds=1.0, progress_callback=None, model_size=DEFAULT_MODEL_SIZE,
+                       device="auto", compute_type="int8", speech_timestamps=None, model=None, cpu_threads=0):
+    """
+    Transcribes one file as concurrent VAD-bounded chunks.
+    Returns (segments with absolute timestamps and words, ChunkedInfo).
+    """
+    workers = workers or os.cpu_count() or 1
+    audio = load_audio(audio)
+    total_samples = len(audio)
+    duration = total_samples / SAMPLE_RATE
+
+    if speech_timestamps is None:
+        speech_timestamps = detect_speech(audio, max_chunk_seconds)
+    chunks = plan_chunks(speech_timestamps, total_samples, max_chunk_seconds)
+
+    if model is None:
+        model = get_chunk_model(workers, model_size, device, compute_type, cpu_threads)
+
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    lock = threading.Lock()
+    done_samples = [0]
+
+    def run(chunk):
+        own_start, own_end = chunk
+        start = max(0, own_start - overlap)
+        end = min(total_samples, own_end + overlap)
+        segments, _ = model.transcribe(
+            audio[start:end],
+            beam_size=BEAM_SIZE,
+            initial_prompt=initial_prompt,
+            language=LANGUAGE,
+            word_timestamps=True
+        )
+        offset = start / SAMPLE_RATE
+        shifted = [_shift_segment(segment, offset) for segment in segments]
+
+        if progress_callback:
+            with lock:
+                done_samples[0] += own_end - own_start
+                progress = done_samples[0] / total_samples if total_samples else 1.0
+            progress_callback(min(progress, 1.0))
+
+        return own_start / SAMPLE_RATE, own_end / SAMPLE_RATE, shifted
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        chunk_results = list(executor.map(run, chunks))
+
+    info = ChunkedInfo(duration=duration, language=LANGUAGE, chunks=len(chunks))
+    return stitch_chunks(chunk_results), info
@@ -0,0 +1,105 @@
+"""
+Per-subtitle memo of corrections, keyed on the normalized subtitle text.
+
+Correcting the same subtitles again (another click, a re-split for a new line
+length, a re-run on similar audio) only sends the texts the memo has not seen;
+everything else is filled in from the memo. Failed corrections are not stored, so
+they are retried next time. The original/corrected diff is read straight from the
+memo, so it never needs a correction pass of its own.
+"""
+import re
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 50000
+
+# Runs of whitespace other than line breaks
+_SPACES_RE = re.compile(r"[^\S\n]+")
+
+def normalize_text(text):
+    """Collapses spaces and tabs within each line; the line breaks of multi-line cues are kept."""
+    lines = (_SPACES_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+class CorrectionMemo:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, text):
+        """Returns the stored correction of text, or None."""
+        key = normalize_text(text)
+        corrected = self._entries.get(key)
+        if corrected is not None:
+            self._entries.move_to_end(key)
+        return corrected
+
+    def put(self, text, corrected):
+        key = normalize_text(text)
+        self._entries[key] = corrected
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pending(self, segments):
+        """Distinct texts (in order) that have no stored correction yet."""
+        seen = set()
+        texts = []
+        for segment in segments:
+            key = normalize_text(segment['text'])
+            if key not in self._entries and key not in seen:
+                seen.add(key)
+                texts.append(key)
+        return texts
+
+    def apply(self, segments, correct=None):
+        """
+        Returns (corrected segments, stats). `correct` takes a list of texts and
+        returns one corrected text per input, or None where the correction failed;
+        it is only called with texts missing from the memo, each once. Without it,
+        unknown texts are left as they are.
+        """
+        texts = self.pending(segments)
+        failed = 0
+        if texts and correct is not None:
+            for text, corrected in zip(texts, correct(texts)):
+                if corrected is None:
+                    failed += 1
+                else:
+                    self.put(text, corrected)
+
+        corrected_segments = []
+        changed = 0
+        for segment in segments:
+            corrected = self.get(segment['text'])
+            if corrected is None or corrected == segment['text']:
+                corrected_segments.append(segment)
+                continue
+            # Word timings describe the original wording, so they are not carried over
+            fixed = {key: value for key, value in segment.items() if key != 'words'}
+            fixed['text'] = corrected
+            corrected_segments.append(fixed)
+            changed += 1
+
+        new_texts = set(texts)
+        stats = {
+            'segments': len(segments),
+            'sent': len(texts) if correct is not None else 0,
+            # Segments answered from earlier corrections without sending anything
+            'reused': sum(1 for s in segments if normalize_text(s['text']) not in new_texts),
+            'pending': len(texts) if correct is None else failed,
+            'failed': failed,
+            'changed': changed
+        }
+        return corrected_segments, stats
+
+    def diff(self, segments):
+        """[{'index', 'original', 'corrected'}] for every segment whose stored correction differs (1-based index)."""
+        diffs = []
+        for i, segment in enumerate(segments):
+            corrected = self._entries.get(normalize_text(segment['text']))
+            if corrected is not None and corrected != segment['text']:
+                diffs.append({'index': i + 1, 'original': segment['text'], 'corrected': corrected})
+        return diffs
@@ -0,0 +1,151 @@
+"""
+Small content-addressed blob cache on disk with size-based LRU eviction.
+
+Entries are files named after their key (a hex digest). Reads refresh the file's
+mtime, so eviction by oldest mtime is least-recently-used. Writes go through a
+temp file and os.replace, which keeps the cache safe to share between processes.
+"""
+import os
+import tempfile
+import threading
+
+DEFAULT_CACHE_DIR = os.getenv("SRT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "srt-generator"))
+
+class DiskCache:
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key):
+        """Returns the stored bytes, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def get_path(self, key):
+        """Returns the path of a stored entry (for reading in place, e.g. memory-mapping), or None on a miss."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def temp_path(self, key):
+        """Returns a new temporary file next to where key will be stored, for put_file."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        return tmp_path
+
+    def put_file(self, key, tmp_path):
+        """Moves a file written at temp_path(key) into the cache."""
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+        return self._path(key)
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _entries(self):
+        """Returns (mtime, size, path) for every stored entry."""
+        entries = []
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def __len__(self):
+        return len(self._entries())
+
+    def stats(self):
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': len(self),
+            'size_bytes': self.size_bytes(),
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,256 @@
+"""
+Gemini-based subtitle correction for transcripts of any length.
+
+Only the subtitle text travels to the model, one "<number>|<text>" line per cue;
+indices, timestamps and blank lines never leave the process, so the model cannot
+corrupt the timing and roughly half of the tokens in and out are saved. The reply
+is parsed back by number and the SRT is regenerated locally.
+
+Cues are split into batches bounded by an estimated token count and sent
+concurrently (up to `concurrency` at a time, spaced by a rate limiter). Lines that
+come back missing or malformed are re-requested on their own; if they still fail
+they keep their original text, so one bad reply never loses the whole file.
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from correction_memo import CorrectionMemo
+from pipeline import format_text, generate_srt_content
+from srt_parser import parse_subtitles
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Rough size of a token for Korean subtitle text; only used to size batches
+CHARS_PER_TOKEN = 2
+
+DEFAULT_BATCH_TOKENS = 2000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+CORRECTION_PROMPT = """
+        You are a professional subtitle editor.
+        Please correct any typos, spelling mistakes, and grammatical errors in the following Korean subtitle lines.
+
+        Each line has the form NUMBER|TEXT.
+
+        IMPORTANT RULES:
+        1. Reply with exactly one line per input line, in the same NUMBER|TEXT form, keeping every number.
+        2. Do NOT merge, split, add or drop lines.
+        3. Only correct the text.
+        4. Remove any punctuation (commas, periods, question marks) from the corrected text if they were added, to maintain the clean style.
+        5. <br> marks a line break inside a subtitle: keep every <br>.
+        6. Output ONLY the corrected lines, no other text.
+
+        Lines:
+        {lines}
+        """
+
+_LINE_RE = re.compile(r"^\s*(\d+)\s*\|(.*)$")
+# Line breaks of multi-line cues; the model may add spaces around it or write <br/>
+LINE_BREAK = "<br>"
+_LINE_BREAK_RE = re.compile(r"\s*<br\s*/?>\s*", re.IGNORECASE)
+
+class GeminiUnavailable(RuntimeError):
+    """Raised when the Gemini library or API key is missing."""
+
+def get_gemini_generate(model_name=GEMINI_MODEL):
+    """Returns a prompt -> text callable backed by the Gemini API."""
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        raise GeminiUnavailable("Google Generative AI library not found.")
+    try:
+        # The key may live in a .env file; read it only when Gemini is actually used
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise GeminiUnavailable("GEMINI_API_KEY not found in .env file.")
+
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel(model_name)
+
+    def generate(prompt):
+        return model.generate_content(prompt).text
+
+    return generate
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def encode_line(number, text):
+    # Multi-line cues travel as one line; the marker is turned back into a newline on return.
+    # "&" and "<" are escaped first, so text that itself contains "<br>" is not split
+    text = text.replace("&", "&amp;").replace("<", "&lt;")
+    return f"{number}|{text.replace(chr(10), LINE_BREAK)}"
+
+def decode_text(text):
+    text = _LINE_BREAK_RE.sub("\n", text.strip())
+    return text.replace("&lt;", "<").replace("&amp;", "&")
+
+def build_prompt(numbered_texts):
+    """numbered_texts: [(number, text)] -> compact correction prompt."""
+    return CORRECTION_PROMPT.format(lines="\n".join(encode_line(n, t) for n, t in numbered_texts))
+
+def parse_reply(reply, expected_numbers):
+    """
+    Parses NUMBER|TEXT lines. Returns {number: text} for expected numbers only;
+    unknown, duplicated or empty lines are ignored so they get re-requested.
+    """
+    expected = set(expected_numbers)
+    found = {}
+    duplicates = set()
+    for line in reply.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        number = int(match.group(1))
+        text = decode_text(match.group(2))
+        if number not in expected or not text:
+            continue
+        if number in found:
+            duplicates.add(number)
+        found[number] = text
+    for number in duplicates:
+        del found[number]
+    return found
+
+def batch_lines(numbered_texts, max_tokens=DEFAULT_BATCH_TOKENS):
+    """Groups consecutive (number, text) pairs into batches under max_tokens."""
+    batches = []
+    current = []
+    current_tokens = 0
+    for number, text in numbered_texts:
+        tokens = estimate_tokens(encode_line(number, text)) + 1
+        if current and current_tokens + tokens > max_tokens:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append((number, text))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+class RateLimiter:
+    """Spaces calls evenly so no more than `per_minute` start in any minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+def correct_texts(texts, generate, max_batch_tokens=DEFAULT_BATCH_TOKENS, concurrency=DEFAULT_CONCURRENCY,
+                  requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, retries=1):
+    """
+    Corrects a list of subtitle texts with `generate` (prompt -> reply text).
+    Returns (corrected texts in the same order, report). The report counts
+    batches, re-requests and lines that kept their original text; the indices of
+    those lines are in report['failed_lines'].
+    """
+    numbered = list(enumerate(texts, start=1))
+    batches = batch_lines(numbered, max_batch_tokens)
+    limiter = RateLimiter(requests_per_minute)
+    report = {
+        'cues': len(texts),
+        'batches': len(batches),
+        'requests': 0,
+        'retries': 0,
+        'unchanged_lines': 0,
+        'failed_batches': 0,
+        'failed_lines': [],
+        'prompt_chars': 0,
+        'reply_chars': 0,
+        'errors': []
+    }
+    lock = threading.Lock()
+
+    def request(pending):
+        prompt = build_prompt(pending)
+        limiter.wait()
+        with lock:
+            report['requests'] += 1
+            report['prompt_chars'] += len(prompt)
+        try:
+            reply = generate(prompt)
+        except Exception as e:
+            with lock:
+                report['errors'].append(str(e))
+            return {}
+        with lock:
+            report['reply_chars'] += len(reply)
+        return parse_reply(reply, [n for n, _ in pending])
+
+    def run(batch):
+        corrected = {}
+        pending = batch
+        for attempt in range(retries + 1):
+            if attempt:
+                with lock:
+                    report['retries'] += 1
+            corrected.update(request(pending))
+            # Only the missing or malformed lines are asked for again
+            pending = [(n, t) for n, t in pending if n not in corrected]
+            if not pending:
+                break
+        if pending:
+            with lock:
+                report['unchanged_lines'] += len(pending)
+                report['failed_lines'].extend(n - 1 for n, _ in pending)
+                if len(pending) == len(batch):
+                    report['failed_batches'] += 1
+        return [corrected.get(n, t) for n, t in batch]
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = list(executor.map(run, batches))
+
+    # Batches come back in submission order, so the numbering lines up again
+    return [text for batch in results for text in batch], report
+
+def correct_segments(segments, generate, memo=None, **options):
+    """
+    Corrects subtitle segments' text; timings are never sent. Returns (new segments, report).
+    With a CorrectionMemo, texts corrected before are reused and only new ones are sent;
+    report['sent'] and report['reused'] count both.
+    """
+    report = {'cues': 0, 'requests': 0, 'unchanged_lines': 0, 'failed_lines': [], 'errors': []}
+
+    def correct(texts):
+        corrected, batch_report = correct_texts(texts, generate, **options)
+        report.update(batch_report)
+        failed = set(batch_report['failed_lines'])
+        # Keep the clean subtitle style even if the model added punctuation back
+        return [None if i in failed else format_text(text).strip() for i, text in enumerate(corrected)]
+
+    corrected, stats = (memo if memo is not None else CorrectionMemo()).apply(segments, correct)
+    report.update(sent=stats['sent'], reused=stats['reused'], changed=stats['changed'])
+    return corrected, report
+
+def correct_srt(srt_content, generate, **options):
+    """
+    Corrects SRT text: only the cue texts are sent, the SRT is rebuilt locally. Returns (SRT, report);
+    report['parse_issues'] lists what srt_parser had to skip in malformed input.
+    """
+    segments, issues = parse_subtitles(srt_content)
+    texts, report = correct_texts([s['text'] for s in segments], generate, **options)
+    failed = set(report['failed_lines'])
+    # Same clean subtitle style as correct_segments; lines that failed keep their original text
+    texts = [text if i in failed else format_text(text).strip() for i, text in enumerate(texts)]
+    report['parse_issues'] = issues
+    return generate_srt_content([dict(segment, text=text) for segment, text in zip(segments, texts)]), report
@@ -0,0 +1,205 @@
+"""
+Client for the Naver spell checker (the service behind search.naver.com's 맞춤법 검사기).
+
+One pooled requests.Session is reused for every call. The passport key the service
+requires is scraped from the search page once and cached for PASSPORT_TTL seconds;
+when the speller rejects it, it is fetched again and the request retried once.
+
+check_batch packs consecutive texts into requests of at most MAX_CHARS characters
+(one text per line), sends the requests concurrently and maps the corrected lines
+back to their texts. If a reply does not have one line per text, that batch is
+checked text by text instead.
+"""
+import html
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from correction_memo import CorrectionMemo
+from pipeline import format_text
+
+SEARCH_URL = "https://search.naver.com/search.naver?where=nexearch&sm=top_hty&fbm=1&ie=utf8&query=맞춤법검사기"
+SPELLER_URL = "https://m.search.naver.com/p/csearch/ocontent/util/SpellerProxy"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/57.0.2987.133 Safari/537.36"
+)
+
+# The speller refuses longer input
+MAX_CHARS = 500
+PASSPORT_TTL = 3600
+DEFAULT_CONCURRENCY = 4
+TIMEOUT = 10
+
+Checked = namedtuple("Checked", "result original checked errors")
+
+_PASSPORT_RE = re.compile(r"passportKey=([a-zA-Z0-9]+)")
+_TAG_RE = re.compile(r"<[^>]+>")
+_BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+class SpellerError(RuntimeError):
+    pass
+
+class PassportError(SpellerError):
+    """The passport key is missing, expired or was rejected."""
+
+def html_to_text(markup):
+    """The speller marks corrections with <em>/<span> tags; line breaks come back as <br>."""
+    return html.unescape(_TAG_RE.sub("", _BR_RE.sub("\n", markup)))
+
+def pack_texts(texts, max_chars=MAX_CHARS):
+    """Groups consecutive text indices into batches whose joined length stays under max_chars."""
+    batches = []
+    current = []
+    length = 0
+    for i, text in enumerate(texts):
+        # Texts with their own line breaks would not map back line by line
+        alone = "\n" in text or len(text) >= max_chars
+        if current and (alone or length + len(text) + 1 > max_chars):
+            batches.append(current)
+            current = []
+            length = 0
+        current.append(i)
+        length += len(text) + 1
+        if alone:
+            batches.append(current)
+            current = []
+            length = 0
+    if current:
+        batches.append(current)
+    return batches
+
+class SpellerClient:
+    def __init__(self, search_url=SEARCH_URL, speller_url=SPELLER_URL, max_chars=MAX_CHARS,
+                 concurrency=DEFAULT_CONCURRENCY, passport_ttl=PASSPORT_TTL, timeout=TIMEOUT):
+        self.search_url = search_url
+        self.speller_url = speller_url
+        self.max_chars = max_chars
+        self.concurrency = concurrency
+        self.passport_ttl = passport_ttl
+        self.timeout = timeout
+
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._passport_key = None
+        self._passport_time = 0.0
+        self._passport_lock = threading.Lock()
+        self.stats = {'requests': 0, 'passport_fetches': 0, 'fallbacks': 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled requests.Session, created on first use (requests is imported only then)."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                session.headers['User-Agent'] = USER_AGENT
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, self.concurrency))
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def passport_key(self, refresh=False, rejected=None):
+        """
+        Returns the cached passport key, scraping a new one when it is older than the
+        TTL or refresh is set. `rejected` is the key that failed: if another thread
+        already replaced it, that newer key is returned without fetching again.
+        """
+        with self._passport_lock:
+            fresh = time.monotonic() - self._passport_time < self.passport_ttl
+            if self._passport_key and fresh and not (refresh and self._passport_key == rejected):
+                return self._passport_key
+            response = self.session.get(self.search_url, timeout=self.timeout)
+            self._count('passport_fetches')
+            match = _PASSPORT_RE.search(response.text)
+            if not match:
+                raise PassportError("Could not find the speller passport key")
+            self._passport_key = match.group(1)
+            self._passport_time = time.monotonic()
+            return self._passport_key
+
+    def _request(self, text, key):
+        params = {'q': text, 'color_blindness': 0, 'passportKey': key}
+        response = self.session.get(self.speller_url, params=params, timeout=self.timeout)
+        self._count('requests')
+        if response.status_code in (401, 403):
+            raise PassportError(f"Speller rejected the passport key (HTTP {response.status_code})")
+        response.raise_for_status()
+        data = json.loads(response.text)
+        message = data.get('message', {})
+        if 'error' in message:
+            # An expired key comes back as a 200 with an error message
+            raise PassportError(message['error'])
+        if 'result' not in message:
+            raise SpellerError(f"Unexpected speller reply: {response.text[:200]}")
+        return message['result']
+
+    def _speller(self, text):
+        """Sends one request; refreshes the passport key and retries once if it was rejected."""
+        key = self.passport_key()
+        try:
+            return self._request(text, key)
+        except PassportError:
+            return self._request(text, self.passport_key(refresh=True, rejected=key))
+
+    def check(self, text):
+        """Checks one text. Never raises: on failure result is False and checked is the original."""
+        if not text.strip():
+            return Checked(True, text, text, 0)
+        try:
+            result = self._speller(text)
+        except Exception:
+            return Checked(False, text, text, 0)
+        return Checked(True, text, html_to_text(result['html']), result.get('errata_count', 0))
+
+    def _check_batch(self, texts):
+        if len(texts) == 1:
+            return [self.check(texts[0])]
+        joined = self.check("\n".join(texts))
+        if not joined.result:
+            return [Checked(False, text, text, 0) for text in texts]
+        lines = joined.checked.split("\n")
+        if len(lines) != len(texts):
+            # Lines were merged or split: fall back to checking each text on its own
+            self._count('fallbacks')
+            return [self.check(text) for text in texts]
+        return [
+            Checked(True, original, checked, int(original != checked))
+            for original, checked in zip(texts, lines)
+        ]
+
+    def check_batch(self, texts):
+        """Checks many texts with as few concurrent requests as the length limit allows. Returns Checked per text."""
+        batches = pack_texts(texts, self.max_chars)
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            results = list(executor.map(lambda batch: self._check_batch([texts[i] for i in batch]), batches))
+        checked = [None] * len(texts)
+        for batch, batch_results in zip(batches, results):
+            for i, result in zip(batch, batch_results):
+                checked[i] = result
+        return checked
+
+    def correct_segments(self, segments, memo=None):
+        """
+        Returns (segments with corrected text, stats); timings are untouched. With a
+        CorrectionMemo only texts not corrected before are sent.
+        """
+        def correct(texts):
+            # Keep the clean subtitle style even if the speller added punctuation
+            return [format_text(r.checked).strip() if r.result else None for r in self.check_batch(texts)]
+
+        return (memo if memo is not None else CorrectionMemo()).apply(segments, correct)
+
+# Shared client, so every caller reuses the same connections and passport key
+hanspell = SpellerClient()
@@ -0,0 +1,198 @@
+"""
+Background queue for long jobs (transcriptions), shared by every session on the server.
+
+A Streamlit rerun re-executes the script from the top, so work done inline is lost
+or blocks the page. Instead a job is submitted here and the page only polls its
+status, progress and result by job id. A fixed number of worker threads run the
+jobs; waiting jobs are taken round-robin across owners (sessions), so one user
+queuing several files does not hold everyone else back.
+
+A job function receives its Job as the first argument. It reports progress with
+job.report(), which also raises JobCancelled once cancellation was requested, so
+a job stops at its next progress update.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+# By default as many jobs run as there are model instances to run them (see model_pool)
+DEFAULT_WORKERS = int(os.getenv("TRANSCRIBE_JOBS", os.getenv("WHISPER_INSTANCES", "1")))
+MAX_PENDING_PER_OWNER = 4
+# Finished jobs are forgotten after this long
+KEEP_FINISHED_SECONDS = 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+class JobCancelled(Exception):
+    pass
+
+class QueueFull(RuntimeError):
+    pass
+
+class Job:
+    def __init__(self, owner, fn, args, kwargs, cleanup=None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._cleanup = cleanup
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def report(self, progress, message=None):
+        """Records progress (0..1); raises JobCancelled if the job should stop."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def wait(self, timeout=None):
+        """Blocks until the job has finished (in any state). Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished = time.time()
+        # The job's inputs are not needed any more
+        self._fn = self._args = self._kwargs = None
+        if self._cleanup:
+            try:
+                self._cleanup()
+            except Exception:
+                pass
+            self._cleanup = None
+        self._done.set()
+
+class JobQueue:
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending_per_owner=MAX_PENDING_PER_OWNER):
+        self.max_pending_per_owner = max_pending_per_owner
+        self._jobs = {}
+        # owner -> deque of queued jobs; the order of owners is the round-robin order
+        self._pending = OrderedDict()
+        self._lock = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn, *args, owner=None, cleanup=None, **kwargs):
+        """
+        Queues fn(job, *args, **kwargs) and returns the Job. `cleanup` runs once the
+        job has finished, failed or been cancelled (even if it never started).
+        """
+        job = Job(owner, fn, args, kwargs, cleanup)
+        with self._lock:
+            queue = self._pending.get(owner)
+            if queue is not None and len(queue) >= self.max_pending_per_owner:
+                raise QueueFull(f"At most {self.max_pending_per_owner} jobs can wait per user")
+            self._forget_old()
+            self._jobs[job.id] = job
+            self._pending.setdefault(owner, deque()).append(job)
+            self._lock.notify()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        with self._lock:
+            return [job for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def position(self, job):
+        """Number of queued jobs that will start before this one (0 when running or next)."""
+        with self._lock:
+            if job.status != QUEUED:
+                return 0
+            queues = [list(q) for q in self._pending.values()]
+        # Replays the round-robin order the workers will follow
+        ahead = 0
+        for depth in range(max(len(q) for q in queues)):
+            for queue in queues:
+                if depth < len(queue):
+                    if queue[depth] is job:
+                        return ahead
+                    ahead += 1
+        return ahead
+
+    def cancel(self, job_id):
+        """Cancels a queued job at once, or asks a running job to stop. Returns the Job or None."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.active:
+                return job
+            job._cancel.set()
+            queue = self._pending.get(job.owner)
+            if job.status == QUEUED and queue is not None and job in queue:
+                queue.remove(job)
+                if not queue:
+                    del self._pending[job.owner]
+                job._finish(CANCELLED)
+        return job
+
+    def _next(self):
+        """Takes the first job of the owner at the front and moves that owner to the back."""
+        owner, queue = next(iter(self._pending.items()))
+        job = queue.popleft()
+        del self._pending[owner]
+        if queue:
+            self._pending[owner] = queue
+        return job
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+                job = self._next()
+                job.status = RUNNING
+            try:
+                result = job._fn(job, *job._args, **job._kwargs)
+            except JobCancelled:
+                job._finish(CANCELLED)
+            except Exception as e:
+                job._finish(CANCELLED if job.cancelled() else FAILED, error=str(e) or type(e).__name__)
+            else:
+                job._finish(DONE, result=result)
+
+    def _forget_old(self):
+        cutoff = time.time() - KEEP_FINISHED_SECONDS
+        for job_id in [i for i, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """Returns the server-wide job queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,341 @@
+"""
+Keyword extraction from a script, used as Whisper's initial prompt.
+
+Long scripts are not truncated: they are split into chunks at whitespace, each
+chunk is sent concurrently, and the per-chunk lists are merged by how many chunks
+named a keyword and how highly (reciprocal rank fusion). A total time budget bounds
+the wait; chunks still running when it expires are left out of the merge.
+
+Results are cached on disk keyed on the script hash, the keyword limit and the
+model name, so pressing "Generate Subtitles" again with the same script skips the
+Gemini round trip. Entries expire after a TTL and the cache is capped in size.
+`extract_keywords_async` runs the extraction in a background thread so it can
+overlap with saving and decoding the uploaded audio.
+
+`extract_keywords_local` is an offline alternative: particles are stripped with a
+longest-match suffix trie, stop words dropped, and words ranked by frequency with
+a boost for likely proper nouns. Each distinct word is processed once, so even a
+1 MB script takes milliseconds.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+
+KEYWORD_MODEL = "gemini-2.5-flash"
+
+# Longest piece of script sent in one request
+CHUNK_CHARS = 10000
+
+DEFAULT_CONCURRENCY = int(os.getenv("KEYWORD_CONCURRENCY", "4"))
+DEFAULT_TIME_BUDGET = float(os.getenv("KEYWORD_TIME_BUDGET", "60"))
+
+# Reciprocal rank fusion constant: larger values weigh agreement between chunks over rank
+RRF_K = 60
+
+DEFAULT_TTL_SECONDS = int(os.getenv("KEYWORD_CACHE_TTL_HOURS", "168")) * 3600
+DEFAULT_MAX_MB = int(os.getenv("KEYWORD_CACHE_MB", "16"))
+
+KEYWORD_PROMPT = """
+        Analyze the following text and extract exactly {limit} keywords.
+
+        Prioritize:
+        1. People's names (Crucial)
+        2. Proper nouns (Places, Organizations)
+        3. Technical terms
+        4. Important nouns that appear frequently
+
+        Rules:
+        - Extract as many relevant words as possible to reach the target of {limit}.
+        - Exclude common verbs and simple adjectives.
+        - Output ONLY the comma-separated list.
+
+        Text:
+        {text}
+        """
+
+def build_keyword_prompt(text, limit=50):
+    return KEYWORD_PROMPT.format(limit=limit, text=text)
+
+def split_script(script_text, max_chars=CHUNK_CHARS):
+    """Splits a script into pieces of at most max_chars, cutting at whitespace where possible."""
+    chunks = []
+    start = 0
+    while start < len(script_text):
+        end = start + max_chars
+        if end < len(script_text):
+            cut = max(script_text.rfind("\n", start, end), script_text.rfind(" ", start, end))
+            if cut > start:
+                end = cut
+        chunk = script_text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
+
+def parse_keywords(reply):
+    """Comma- or line-separated reply -> keyword list without duplicates."""
+    seen = set()
+    keywords = []
+    for item in re.split(r"[,\n]", reply):
+        keyword = item.strip().strip("-*•. ").strip()
+        if keyword and keyword not in seen:
+            seen.add(keyword)
+            keywords.append(keyword)
+    return keywords
+
+def merge_keyword_lists(lists, limit=50):
+    """Merges ranked keyword lists: keywords named by more chunks, and higher up, come first."""
+    scores = {}
+    for keywords in lists:
+        for rank, keyword in enumerate(keywords):
+            scores[keyword] = scores.get(keyword, 0.0) + 1.0 / (RRF_K + rank)
+    # sorted is stable, so ties keep the order keywords first appeared in
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+def extract_keywords(script_text, generate, limit=50, concurrency=DEFAULT_CONCURRENCY,
+                     time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Asks `generate` (prompt -> reply text) for keywords, chunk by chunk for long scripts.
+    Returns (comma-separated keywords, report). The report counts chunks that
+    completed, failed or missed the time budget; if every chunk failed, the
+    first error is raised.
+    """
+    chunks = split_script(script_text)
+    report = {'chunks': len(chunks), 'completed': 0, 'failed': 0, 'timed_out': 0, 'errors': []}
+    if not chunks:
+        return "", report
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks))))
+    try:
+        futures = [executor.submit(generate, build_keyword_prompt(chunk, limit)) for chunk in chunks]
+        done, not_done = wait(futures, timeout=time_budget)
+    finally:
+        # Requests still running past the budget are abandoned, not waited for
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    lists = []
+    first_error = None
+    for future in futures:
+        if future in not_done:
+            report['timed_out'] += 1
+        elif future.exception() is not None:
+            report['failed'] += 1
+            report['errors'].append(str(future.exception()))
+            first_error = first_error or future.exception()
+        else:
+            report['completed'] += 1
+            lists.append(parse_keywords(future.result()))
+
+    if not lists:
+        if first_error is not None:
+            raise first_error
+        raise TimeoutError(f"Keyword extraction took longer than {time_budget:.0f}s")
+    return ", ".join(merge_keyword_lists(lists, limit)), report
+
+def make_keyword_key(script_text, limit, model_name=KEYWORD_MODEL):
+    params = json.dumps([script_text, limit, model_name], ensure_ascii=False)
+    return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+class KeywordCache:
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.store = DiskCache(root or os.path.join(DEFAULT_CACHE_DIR, "keywords"), max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.expired = 0
+
+    def get(self, key):
+        """Returns the cached keywords, or None on a miss or an expired entry."""
+        data = self.store.get(key)
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data.decode("utf-8"))
+            created, keywords = entry['created'], entry['keywords']
+        except Exception:
+            self.store.delete(key)
+            return None
+        # The disk cache refreshes mtime on reads, so the age is stored in the entry itself
+        if self.ttl_seconds and time.time() - created > self.ttl_seconds:
+            self.store.delete(key)
+            self.expired += 1
+            return None
+        return keywords
+
+    def put(self, key, keywords):
+        entry = {'created': time.time(), 'keywords': keywords}
+        self.store.put(key, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self):
+        stats = self.store.stats()
+        stats['expired'] = self.expired
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_keyword_cache():
+    """Returns the process-wide keyword cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = KeywordCache()
+        return _cache
+
+def cached_extract_keywords(script_text, get_generate, limit=50, model_name=KEYWORD_MODEL, cache=None, **options):
+    """
+    Returns (keywords, cached). `get_generate` builds the generate callable and is
+    only called on a miss, so a cache hit needs neither the API key nor the network.
+    Errors from the model are raised, and only complete results (every chunk
+    answered) are cached. `options` go to extract_keywords.
+    """
+    cache = cache or get_keyword_cache()
+    key = make_keyword_key(script_text, limit, model_name)
+    keywords = cache.get(key)
+    if keywords is not None:
+        return keywords, True
+    keywords, report = extract_keywords(script_text, get_generate(), limit, **options)
+    if keywords and report['completed'] == report['chunks']:
+        cache.put(key, keywords)
+    return keywords, False
+
+_executor = None
+
+def extract_keywords_async(script_text, get_generate, limit=50, model_name=KEYWORD_MODEL, cache=None, **options):
+    """Starts cached_extract_keywords in a background thread and returns its Future."""
+    global _executor
+    with _cache_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="keywords")
+    return _executor.submit(cached_extract_keywords, script_text, get_generate, limit, model_name, cache, **options)
+
+PARTICLE_SUFFIXES = (
+    '에게서', '에서는', '에서도', '이라는', '이라고', '으로는', '으로도', '까지는', '까지도', '부터는', '부터도',
+    '에게는', '에게도', '한테는', '한테도', '께서는', '입니다', '습니다', '합니다', '하고는',
+    '에게', '에서', '으로', '까지', '부터', '한테', '께서', '처럼', '하고', '이나', '이랑', '이라', '와는', '과는',
+    '은', '는', '이', '가', '을', '를', '의', '에', '로', '와', '과', '도', '만', '나', '랑', '야', '여', '라', '고'
+)
+
+STOP_WORDS = frozenset({
+    '거죠', '거예요', '그런데', '그리고', '그건', '하지만', '그래서',
+    '나는', '내가', '저는', '제가', '우리', '그는', '이건', '저건', '그게', '이게', '뭐가',
+    '합니다', '입니다', '됩니다', '있습니다', '없습니다'
+})
+
+# Honorific that follows names ("김민중 씨", "김민중씨가")
+NAME_HONORIFIC = '씨'
+
+# Score multiplier for words that look like proper nouns
+PROPER_NOUN_BOOST = 2.0
+
+_WORD_RE = re.compile(r"\w+")
+_SPACED_NAME_RE = re.compile(
+    r"(\w+)\s+" + NAME_HONORIFIC
+    + "(?:" + "|".join(sorted(PARTICLE_SUFFIXES, key=len, reverse=True)) + r")?(?!\w)"
+)
+
+class SuffixTrie:
+    """Trie over reversed suffixes; finds the longest suffix of a word in one backwards walk."""
+
+    def __init__(self, suffixes):
+        self.root = {}
+        for suffix in suffixes:
+            node = self.root
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            node[None] = True
+
+    def longest_suffix(self, word, min_stem=1):
+        """Length of the longest known suffix that leaves at least min_stem characters, or 0."""
+        node = self.root
+        best = 0
+        for length in range(1, len(word) - min_stem + 1):
+            node = node.get(word[-length])
+            if node is None:
+                break
+            if None in node:
+                best = length
+        return best
+
+    def strip(self, word, min_stem=1):
+        length = self.longest_suffix(word, min_stem)
+        return word[:-length] if length else word
+
+PARTICLES = SuffixTrie(PARTICLE_SUFFIXES)
+
+# Past/future markers that end a verb or adjective stem (이야기했, 길었, 좋았, 만나겠)
+PREDICATE_MARKERS = frozenset('했었았였겠됐웠셨')
+# Endings that may follow such a marker (좋았어요, 준비했었다, 확인했고, 길었습니다)
+PREDICATE_ENDINGS = SuffixTrie((
+    '습니다', '어요', '아요', '네요', '지만', '는데', '어서', '으니', '다', '어', '죠', '고', '던'
+))
+
+def _predicate_noun(word):
+    """
+    For a conjugated verb or adjective returns the noun of a 하다 verb (확인했고 -> 확인)
+    or '' (dropped); None when the word does not look like a predicate.
+    """
+    base = PREDICATE_ENDINGS.strip(word)
+    if base[-1] not in PREDICATE_MARKERS:
+        return None
+    if base[-1] == '했' and len(base) >= 3:
+        return base[:-1]
+    return ''
+
+def _normalize(word):
+    """Returns (stem, is_name) for one distinct word, or (None, False) if it is dropped."""
+    if len(word) < 2 or word in STOP_WORDS:
+        return None, False
+    noun = _predicate_noun(word)
+    if noun is not None:
+        # A verb or adjective: at most the noun of a 하다 verb is kept
+        return (noun, False) if noun and noun not in STOP_WORDS else (None, False)
+    stem = PARTICLES.strip(word)
+    if stem == NAME_HONORIFIC:
+        return None, False
+    if len(stem) < 2 and len(word) == 2:
+        # Two-syllable nouns such as 강의 or 회의 only look like stem + particle
+        stem = word
+    is_name = False
+    if stem.endswith(NAME_HONORIFIC) and len(stem) >= 3:
+        stem = stem[:-1]
+        is_name = True
+    if len(stem) < 2 or stem in STOP_WORDS:
+        return None, False
+    # Capitalized Latin words (names, products, acronyms) are likely proper nouns too
+    if stem[0].isascii() and stem[0].isupper():
+        is_name = True
+    return stem, is_name
+
+def extract_keywords_local(script_text, limit=50):
+    """Offline keyword extraction. Returns a comma-separated list like the Gemini path, or None."""
+    if not script_text:
+        return None
+
+    # Count raw words first; stripping then runs once per distinct word, not per occurrence
+    scores = Counter()
+    proper = set()
+    for word, count in Counter(_WORD_RE.findall(script_text)).items():
+        stem, is_name = _normalize(word)
+        if stem is None:
+            continue
+        scores[stem] += count
+        if is_name:
+            proper.add(stem)
+    for name in set(_SPACED_NAME_RE.findall(script_text)):
+        stem, _ = _normalize(name)
+        if stem is not None:
+            proper.add(stem)
+
+    for stem in proper:
+        scores[stem] *= PROPER_NOUN_BOOST
+    keywords = [word for word, _ in scores.most_common(limit)]
+    return ", ".join(keywords) or None
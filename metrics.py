@@ -0,0 +1,254 @@
+"""
+Per-job stage timings and resource use.
+
+A Trace collects one span per stage of a job (model load, decode, transcription,
+segmentation, keyword extraction, correction, rendering): wall time, process CPU
+time and, for transcription, the real-time factor. A finished trace is appended
+to a JSON-lines log (METRICS_LOG) and added to process-wide counters, which
+prometheus_text() renders in the Prometheus text format. With METRICS_PORT set,
+start_server() serves them at http://host:METRICS_PORT/metrics for scraping.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from disk_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_LOG_PATH = os.getenv("METRICS_LOG", os.path.join(DEFAULT_CACHE_DIR, "metrics.jsonl"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Upper bounds (seconds) of the stage duration histogram
+BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+def peak_rss_mb():
+    """Peak resident memory of the process so far, or None where the platform cannot tell."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS, where this overstates by 1024x)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class Trace:
+    """
+    Stage spans of one job. Used as a context manager, it finishes itself on exit,
+    with status "failed" (and the exception type) if the block raised.
+    """
+
+    def __init__(self, kind, metrics=None, log_path=None, **attrs):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.attrs = attrs
+        self.spans = []
+        self.record = None
+        self._metrics = metrics
+        self._log_path = log_path
+        self._started = time.time()
+        self._clock = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        """
+        Times the block as one stage. Yields the span's dict, so the block can add
+        attributes; with 'audio_seconds' the real-time factor ('rtf') is filled in.
+        Safe to use from several threads.
+        """
+        record = {'stage': stage, **attrs}
+        started = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['seconds'] = time.perf_counter() - started
+            # Process-wide: includes other threads running at the same time
+            record['cpu_seconds'] = time.process_time() - cpu
+            self._add(record)
+
+    def add(self, stage, seconds, **attrs):
+        """Records a stage timed elsewhere."""
+        self._add({'stage': stage, **attrs, 'seconds': seconds})
+
+    def _add(self, record):
+        if record.get('audio_seconds'):
+            record['rtf'] = record['seconds'] / record['audio_seconds']
+        with self._lock:
+            self.spans.append(record)
+
+    def finish(self, status="done", error=None):
+        """Closes the trace, logs it and adds it to the metrics. Returns the trace as a dict."""
+        if self.record is not None:
+            return self.record
+        with self._lock:
+            spans = list(self.spans)
+        self.record = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': status,
+            'started': self._started,
+            'seconds': time.perf_counter() - self._clock,
+            'peak_rss_mb': peak_rss_mb(),
+            **self.attrs,
+            'spans': spans
+        }
+        if error:
+            self.record['error'] = error
+        metrics = self._metrics or get_metrics()
+        metrics.observe(self.record)
+        metrics.append_log(self.record, self._log_path)
+        return self.record
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finish()
+        else:
+            self.finish("failed", exc_type.__name__)
+        return False
+
+@contextmanager
+def timed(kind, stage=None, **attrs):
+    """A trace with a single span, for one-off actions; yields the span's dict."""
+    with Trace(kind, **attrs) as trace:
+        with trace.span(stage or kind) as span:
+            yield span
+
+def _labels(**labels):
+    return ",".join(f'{key}="{str(value).replace(chr(34), "")}"' for key, value in labels.items())
+
+class Metrics:
+    """Process-wide counters built from finished traces."""
+
+    def __init__(self, log_path=DEFAULT_LOG_PATH, buckets=BUCKETS):
+        self.log_path = log_path
+        self.buckets = buckets
+        self._stages = {}  # stage -> {'count', 'sum', 'cpu', 'buckets'}
+        self._jobs = {}  # (kind, status) -> count
+        self._audio_seconds = 0.0
+        self._transcribe_seconds = 0.0
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    def observe(self, record):
+        with self._lock:
+            key = (record['kind'], record['status'])
+            self._jobs[key] = self._jobs.get(key, 0) + 1
+            for span in record['spans']:
+                stage = self._stages.setdefault(
+                    span['stage'], {'count': 0, 'sum': 0.0, 'cpu': 0.0, 'buckets': [0] * len(self.buckets)}
+                )
+                stage['count'] += 1
+                stage['sum'] += span['seconds']
+                stage['cpu'] += span.get('cpu_seconds', 0.0)
+                for i, bound in enumerate(self.buckets):
+                    if span['seconds'] <= bound:
+                        stage['buckets'][i] += 1
+                if span.get('audio_seconds'):
+                    self._audio_seconds += span['audio_seconds']
+                    self._transcribe_seconds += span['seconds']
+
+    def append_log(self, record, path=None):
+        """Appends one trace to the JSON-lines log. Logging never fails the job."""
+        path = path or self.log_path
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            line = json.dumps(record, ensure_ascii=False)
+            with self._log_lock, open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            pass
+
+    def prometheus_text(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP srt_stage_seconds Wall time per pipeline stage.",
+            "# TYPE srt_stage_seconds histogram",
+        ]
+        with self._lock:
+            stages = {name: dict(stage, buckets=list(stage['buckets'])) for name, stage in self._stages.items()}
+            jobs = dict(self._jobs)
+            audio_seconds, transcribe_seconds = self._audio_seconds, self._transcribe_seconds
+        for name, stage in sorted(stages.items()):
+            for bound, count in zip(self.buckets, stage['buckets']):
+                lines.append(f"srt_stage_seconds_bucket{{{_labels(stage=name, le=bound)}}} {count}")
+            lines.append(f"srt_stage_seconds_bucket{{{_labels(stage=name, le='+Inf')}}} {stage['count']}")
+            lines.append(f"srt_stage_seconds_sum{{{_labels(stage=name)}}} {stage['sum']:.6f}")
+            lines.append(f"srt_stage_seconds_count{{{_labels(stage=name)}}} {stage['count']}")
+        lines += [
+            "# HELP srt_stage_cpu_seconds_total Process CPU time spent during each stage.",
+            "# TYPE srt_stage_cpu_seconds_total counter",
+        ]
+        for name, stage in sorted(stages.items()):
+            lines.append(f"srt_stage_cpu_seconds_total{{{_labels(stage=name)}}} {stage['cpu']:.6f}")
+        lines += ["# HELP srt_jobs_total Finished jobs by kind and status.", "# TYPE srt_jobs_total counter"]
+        for (kind, status), count in sorted(jobs.items()):
+            lines.append(f"srt_jobs_total{{{_labels(kind=kind, status=status)}}} {count}")
+        lines += [
+            "# HELP srt_transcribed_audio_seconds_total Audio transcribed (real-time factor = transcribe time / audio).",
+            "# TYPE srt_transcribed_audio_seconds_total counter",
+            f"srt_transcribed_audio_seconds_total {audio_seconds:.3f}",
+            "# HELP srt_transcribe_seconds_total Wall time spent transcribing that audio.",
+            "# TYPE srt_transcribe_seconds_total counter",
+            f"srt_transcribe_seconds_total {transcribe_seconds:.3f}",
+        ]
+        rss = peak_rss_mb()
+        if rss is not None:
+            lines += [
+                "# HELP srt_process_peak_rss_bytes Peak resident memory of the process.",
+                "# TYPE srt_process_peak_rss_bytes gauge",
+                f"srt_process_peak_rss_bytes {int(rss * 2**20)}",
+            ]
+        return "\n".join(lines) + "\n"
+
+def start_server(port=METRICS_PORT, metrics=None, host="0.0.0.0"):
+    """Serves /metrics on a daemon thread; returns the server (None when port is 0)."""
+    if not port:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    metrics = metrics or get_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+_metrics = None
+_server = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Returns the process-wide metrics, starting the /metrics server once if METRICS_PORT is set."""
+    global _metrics, _server
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+            try:
+                _server = start_server(METRICS_PORT, _metrics)
+            except OSError:
+                # Another process on this machine already serves the port
+                _server = None
+        return _metrics
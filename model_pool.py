@@ -0,0 +1,317 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Approximate resident size (MB) of each Whisper checkpoint when loaded as int8.
+# Used only to decide when the pool is over budget, so rough numbers are fine.
+MODEL_SIZE_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 480,
+    "medium": 1500,
+    "large-v1": 3000,
+    "large-v2": 3000,
+    "large-v3": 3000,
+    "large": 3000,
+}
+
+COMPUTE_TYPE_SCALE = {
+    "int8": 1.0,
+    "int8_float16": 1.0,
+    "int8_float32": 1.0,
+    "int16": 2.0,
+    "float16": 2.0,
+    "bfloat16": 2.0,
+    "float32": 4.0,
+}
+
+DEFAULT_MEMORY_BUDGET_MB = int(os.getenv("WHISPER_MODEL_MEMORY_MB", "4096"))
+# Model instances that may transcribe at the same time (one job each); the cores are split between them
+DEFAULT_INSTANCES = int(os.getenv("WHISPER_INSTANCES", "1"))
+# How often a waiting lease re-reports its position (and lets on_wait raise to give up)
+WAIT_POLL_SECONDS = 1.0
+
+def estimate_model_mb(model_size, compute_type="int8"):
+    """Estimates the memory footprint of a loaded model in MB."""
+    base = MODEL_SIZE_MB.get(model_size, MODEL_SIZE_MB["large"])
+    scale = COMPUTE_TYPE_SCALE.get(compute_type, 1.0)
+    return int(base * scale)
+
+def thread_plan(instances, cores=None):
+    """CPU threads for each of `instances` models sharing the machine, so together they use every core once."""
+    cores = cores or os.cpu_count() or 1
+    return max(1, cores // max(1, instances))
+
+def load_whisper_model(model_size, device="auto", compute_type="int8", cpu_threads=0, num_workers=1):
+    """Loads a faster-whisper model (imported lazily so the pool stays cheap to import)."""
+    from faster_whisper import WhisperModel
+    return WhisperModel(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers
+    )
+
+class InstanceSlots:
+    """
+    Counting semaphore over `count` numbered slots that serves waiters first come,
+    first served, so a waiter can tell how many are ahead of it.
+    """
+
+    def __init__(self, count):
+        self.count = max(1, count)
+        self._free = list(range(self.count - 1, -1, -1))
+        self._waiting = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self, on_wait=None):
+        """
+        Blocks until a slot is free and returns its number. While waiting,
+        on_wait(ahead) is called every WAIT_POLL_SECONDS; if it raises, the wait is abandoned.
+        """
+        ticket = object()
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while not (self._free and self._waiting[0] is ticket):
+                    if on_wait:
+                        on_wait(self._waiting.index(ticket))
+                    self._cond.wait(WAIT_POLL_SECONDS)
+            finally:
+                self._waiting.remove(ticket)
+                # The next waiter may be able to go now
+                self._cond.notify_all()
+            return self._free.pop()
+
+    def release(self, slot):
+        with self._cond:
+            self._free.append(slot)
+            self._cond.notify_all()
+
+    def waiting(self):
+        with self._cond:
+            return len(self._waiting)
+
+    def in_use(self):
+        with self._cond:
+            return self.count - len(self._free)
+
+class ModelPool:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Models are keyed by (size, device, compute_type, cpu_threads, num_workers, instance)
+    and shared by every caller in the process. num_workers > 1 lets several threads run
+    transcribe() on the same model in parallel. When the estimated total exceeds the memory budget, the
+    least recently used models that are not leased are unloaded. Loads in progress
+    count against the budget too, so concurrent loads cannot overshoot it together.
+
+    lease() hands out one of a fixed number of separate instances of a model, so
+    concurrent jobs each get their own model and share of the cores instead of all
+    contending for one; further jobs wait for a free instance. No more instances are
+    used than fit in the budget.
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, loader=load_whisper_model):
+        self.memory_budget_mb = memory_budget_mb
+        self._loader = loader
+        self._models = OrderedDict()  # key -> (model, estimated_mb)
+        self._lock = threading.RLock()
+        # Notified whenever a load finishes or a lease ends
+        self._changed = threading.Condition(self._lock)
+        # Estimated size of the models being loaded right now
+        self._reserved_mb = 0
+        # key -> number of active leases; leased models are never evicted
+        self._leases = {}
+        # One lock per key so two sessions asking for the same model load it only once,
+        # while loads of different models do not block each other.
+        self._load_locks = {}
+        # (size, device, compute_type, instances) -> InstanceSlots
+        self._slots = {}
+
+    @staticmethod
+    def make_key(model_size, device="auto", compute_type="int8", cpu_threads=0, num_workers=1, instance=0):
+        return (model_size, device, compute_type, cpu_threads, num_workers, instance)
+
+    def get(self, model_size, device="auto", compute_type="int8", cpu_threads=0, num_workers=1, instance=0):
+        """Returns a loaded model, loading it (and evicting others) if needed."""
+        return self._get(self.make_key(model_size, device, compute_type, cpu_threads, num_workers, instance))
+
+    def _get(self, key, leased=False):
+        with self._lock:
+            if key in self._models:
+                return self._use(key, leased)
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Another thread may have finished loading while we waited.
+                if key in self._models:
+                    return self._use(key, leased)
+                model_size, device, compute_type, cpu_threads, num_workers, _ = key
+                estimated_mb = estimate_model_mb(model_size, compute_type)
+                self._reserve(estimated_mb)
+
+            try:
+                model = self._loader(
+                    model_size,
+                    device=device,
+                    compute_type=compute_type,
+                    cpu_threads=cpu_threads,
+                    num_workers=num_workers
+                )
+            except BaseException:
+                with self._lock:
+                    self._reserved_mb -= estimated_mb
+                    self._changed.notify_all()
+                raise
+
+            with self._lock:
+                # The reservation becomes the model in one step, so no other load sees the room in between
+                self._reserved_mb -= estimated_mb
+                self._models[key] = (model, estimated_mb)
+                self._load_locks.pop(key, None)
+                self._changed.notify_all()
+                return self._use(key, leased)
+
+    def _use(self, key, leased):
+        self._models.move_to_end(key)
+        if leased:
+            self._leases[key] = self._leases.get(key, 0) + 1
+        return self._models[key][0]
+
+    def _reserve(self, incoming_mb):
+        """Makes room for a model about to be loaded and counts it against the budget."""
+        while True:
+            self._evict_for(incoming_mb)
+            if self.used_mb() + self._reserved_mb + incoming_mb <= self.memory_budget_mb or not self._reserved_mb:
+                break
+            # Wait for the loads in progress; what they load may be evictable afterwards
+            self._changed.wait()
+        self._reserved_mb += incoming_mb
+
+    def max_instances(self, model_size, compute_type="int8", instances=DEFAULT_INSTANCES):
+        """`instances`, reduced to as many copies of the model as fit in the memory budget (at least 1)."""
+        fit = self.memory_budget_mb // estimate_model_mb(model_size, compute_type)
+        return max(1, min(instances, fit))
+
+    def slots(self, model_size, device="auto", compute_type="int8", instances=DEFAULT_INSTANCES):
+        """
+        The InstanceSlots guarding `instances` copies of a model. Chunked (num_workers > 1)
+        and sequential jobs share them, so together they stay within the bound.
+        """
+        key = (model_size, device, compute_type, max(1, instances))
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = InstanceSlots(instances)
+            return self._slots[key]
+
+    @contextmanager
+    def lease(self, model_size, device="auto", compute_type="int8", cpu_threads=0,
+              instances=DEFAULT_INSTANCES, on_wait=None, num_workers=1):
+        """
+        Waits for one of `instances` copies of the model to be free and yields it,
+        loaded with cpu_threads per worker (default: the cores split evenly between the
+        instances and their num_workers).
+        `instances` is capped at what fits in the memory budget. The leased copy is
+        not evicted while the lease lasts. on_wait(ahead) is called while waiting
+        (see InstanceSlots.acquire).
+        """
+        instances = self.max_instances(model_size, compute_type, instances)
+        slots = self.slots(model_size, device, compute_type, instances)
+        slot = slots.acquire(on_wait)
+        try:
+            key = self.make_key(
+                model_size, device, compute_type, cpu_threads or thread_plan(slots.count * num_workers),
+                num_workers, slot
+            )
+            model = self._get(key, leased=True)
+            try:
+                yield model
+            finally:
+                with self._lock:
+                    self._leases[key] -= 1
+                    if not self._leases[key]:
+                        del self._leases[key]
+                    self._changed.notify_all()
+        finally:
+            slots.release(slot)
+
+    def leased(self):
+        """Keys of the models currently leased."""
+        with self._lock:
+            return list(self._leases)
+
+    def _evict_for(self, incoming_mb):
+        """Drops least recently used models that are not leased until `incoming_mb` fits in the budget."""
+        for key in list(self._models):
+            if self.used_mb() + self._reserved_mb + incoming_mb <= self.memory_budget_mb:
+                break
+            if key not in self._leases:
+                del self._models[key]
+
+    def unload(self, model_size=None, device=None, compute_type=None, cpu_threads=None, num_workers=None,
+               instance=None):
+        """
+        Unloads every model matching the given fields (None matches anything).
+        Returns the number of models removed.
+        """
+        pattern = (model_size, device, compute_type, cpu_threads, num_workers, instance)
+        with self._lock:
+            doomed = [
+                key for key in self._models
+                if all(want is None or want == have for want, have in zip(pattern, key))
+            ]
+            for key in doomed:
+                del self._models[key]
+        return len(doomed)
+
+    def clear(self):
+        """Unloads all models."""
+        return self.unload()
+
+    def set_memory_budget(self, memory_budget_mb):
+        """Changes the budget and evicts immediately if the pool no longer fits."""
+        with self._lock:
+            self.memory_budget_mb = memory_budget_mb
+            self._evict_for(0)
+
+    def used_mb(self):
+        with self._lock:
+            return sum(mb for _, mb in self._models.values())
+
+    def loaded(self):
+        """Returns (key, estimated_mb) pairs, least recently used first."""
+        with self._lock:
+            return [(key, mb) for key, (_, mb) in self._models.items()]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._models
+
+    def __len__(self):
+        with self._lock:
+            return len(self._models)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_model_pool():
+    """Returns the process-wide model pool (survives Streamlit reruns and sessions)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModelPool()
+        return _pool
+
+def get_model(model_size="medium", device="auto", compute_type="int8", cpu_threads=0, num_workers=1):
+    """Shortcut for get_model_pool().get(...)."""
+    return get_model_pool().get(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers
+    )
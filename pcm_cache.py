@@ -0,0 +1,75 @@
+"""
+Disk cache of decoded audio: 16 kHz mono float32 PCM, keyed on the audio hash.
+
+Decoding a long m4a/mp3 is a noticeable share of a transcription. The first job
+writes the decoded samples to a raw float32 file; later jobs on the same audio
+(another model size, a different prompt, chunked workers) memory-map that file
+instead of decoding again, so the samples are paged in from disk on demand and
+shared between processes through the page cache.
+"""
+import os
+import threading
+
+from chunked import SAMPLE_RATE, load_audio
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+
+DEFAULT_MAX_MB = int(os.getenv("PCM_CACHE_MB", "4096"))
+
+class PcmCache:
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        # The sample rate is part of the location, so a different rate never reads stale samples
+        self.store = DiskCache(root or os.path.join(DEFAULT_CACHE_DIR, f"pcm{SAMPLE_RATE // 1000}k"), max_bytes)
+        self.decodes = 0
+
+    def get(self, audio_hash):
+        """Returns the cached samples as a read-only memory-mapped float32 array, or None."""
+        import numpy as np
+
+        path = self.store.get_path(audio_hash)
+        if path is None:
+            return None
+        if os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(path, dtype=np.float32, mode="r")
+
+    def put(self, audio_hash, samples):
+        import numpy as np
+
+        tmp_path = self.store.temp_path(audio_hash)
+        try:
+            np.asarray(samples, dtype=np.float32).tofile(tmp_path)
+            self.store.put_file(audio_hash, tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, audio, audio_hash):
+        """Returns the decoded samples of `audio` (path or file object), decoding and storing them on a miss."""
+        samples = self.get(audio_hash)
+        if samples is not None:
+            return samples
+        samples = load_audio(audio)
+        self.decodes += 1
+        self.put(audio_hash, samples)
+        return samples
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self):
+        stats = self.store.stats()
+        stats['decodes'] = self.decodes
+        stats['seconds'] = stats['size_bytes'] / 4 / SAMPLE_RATE
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_pcm_cache():
+    """Returns the process-wide decoded-audio cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PcmCache()
+        return _cache
@@ -0,0 +1,290 @@
+import io
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+
+from model_pool import DEFAULT_INSTANCES, get_model_pool
+
+DEFAULT_MODEL_SIZE = "medium"
+BEAM_SIZE = 5
+LANGUAGE = "ko"
+
+# Same fields as faster-whisper's Word/Segment that the pipeline relies on, for
+# transcripts that are rebuilt or stitched together outside of WhisperModel.transcribe
+Word = namedtuple("Word", "start end word probability")
+Segment = namedtuple("Segment", "start end text words")
+
+def format_timestamp(seconds):
+    """Converts seconds to SRT timestamp format (HH:MM:SS,mmm)."""
+    # Whole milliseconds first, so rounding carries into the seconds (never ",1000")
+    milliseconds = max(0, round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+def format_text(text):
+    """
+    Removes punctuation except for " ' ,
+    """
+    # Remove punctuation but keep "
+    # We want to remove . ? ! ; : , ' etc.
+    # Regex: replace [.?!\-;:,'] with empty string.
+    text = re.sub(r"[.?!\-;:,']", '', text)
+    return text
+
+def word_timings(words):
+    """Compact (start, end, word) tuples for a segment's words."""
+    return [(w.start, w.end, w.word) for w in words]
+
+def _words_to_segment(words, keep_words=False):
+    """Builds one subtitle segment from a run of consecutive words."""
+    text = "".join(w.word for w in words)
+    segment = {
+        'start': words[0].start,
+        'end': words[-1].end,
+        'text': format_text(text).strip()
+    }
+    if keep_words:
+        segment['words'] = word_timings(words)
+    return segment
+
+def split_into_segments(words, max_chars=16, keep_words=False):
+    """
+    Splits a list of words into segments based on character limit and punctuation.
+    Runs in linear time: the length of the open segment is kept as a running total.
+    With keep_words, each segment also carries its word timings under 'words'.
+    """
+    segments = []
+    current_words = []
+    current_len = 0
+    # Whether the previous word ended with sentence-ending punctuation
+    force_break = False
+
+    for word in words:
+        word_text = word.word
+
+        if current_words and (force_break or current_len + len(word_text) > max_chars):
+            # Finalize current segment and start a new one
+            segments.append(_words_to_segment(current_words, keep_words))
+            current_words = []
+            current_len = 0
+
+        current_words.append(word)
+        current_len += len(word_text)
+
+        last_word_text = word_text.strip()
+        force_break = last_word_text.endswith('.') or last_word_text.endswith('?')
+
+    # Append last segment
+    if current_words:
+        segments.append(_words_to_segment(current_words, keep_words))
+
+    return segments
+
+def generate_srt_content(segments):
+    """
+    Generates SRT content from processed segments.
+    Prefer subtitle_writer.write_subtitles for large outputs that can go straight to a file.
+    """
+    from subtitle_writer import write_subtitles
+
+    buffer = io.StringIO()
+    write_subtitles(segments, srt=buffer)
+    return buffer.getvalue()
+
+def process_segment(segment, max_chars=16, keep_words=False):
+    """Turns one Whisper segment into subtitle segments, splitting it by words if too long."""
+    # Check length of the full segment (formatted)
+    formatted_text = format_text(segment.text).strip()
+
+    if len(formatted_text) <= max_chars:
+        # Keep original segment (but formatted)
+        kept = {
+            'start': segment.start,
+            'end': segment.end,
+            'text': formatted_text
+        }
+        if keep_words and segment.words:
+            kept['words'] = word_timings(segment.words)
+        return [kept]
+
+    # Split this long segment using its words
+    if segment.words:
+        return split_into_segments(segment.words, max_chars=max_chars, keep_words=keep_words)
+
+    # Fallback
+    return [{
+        'start': segment.start,
+        'end': segment.end,
+        'text': formatted_text
+    }]
+
+def process_segments(segments, max_chars=16, keep_words=False):
+    """Turns a sequence of Whisper segments into subtitle segments."""
+    processed_segments = []
+    for segment in segments:
+        processed_segments.extend(process_segment(segment, max_chars=max_chars, keep_words=keep_words))
+    return processed_segments
+
+def resegment(raw_transcript, max_chars=16, keep_words=False):
+    """Re-splits a stored RawTranscript into subtitle segments without running Whisper."""
+    return process_segments(raw_transcript.iter_segments(), max_chars=max_chars, keep_words=keep_words)
+
+def model_lease(model_size=DEFAULT_MODEL_SIZE, device="auto", compute_type="int8", cpu_threads=0,
+                workers=1, instances=None, wait_callback=None):
+    """
+    The pooled model lease transcribe_raw uses for these options (a context manager
+    yielding the WhisperModel); entering and leaving it preloads that exact model.
+    """
+    if workers > 1 and cpu_threads:
+        from chunked import chunk_threads
+        # The thread budget is shared by the chunk workers of one model
+        cpu_threads = chunk_threads(workers, cpu_threads)
+    # Models are shared process-wide, so only the first job pays the load cost; at most
+    # `instances` jobs transcribe at once (chunked or not), each on its own copy with its
+    # share of the cores
+    return get_model_pool().lease(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        instances=instances or DEFAULT_INSTANCES,
+        on_wait=wait_callback,
+        num_workers=workers
+    )
+
+def transcribe_raw(audio, initial_prompt=None, progress_callback=None,
+                   model_size=DEFAULT_MODEL_SIZE, device="auto", compute_type="int8", cpu_threads=0,
+                   workers=1, max_chunk_seconds=60, audio_hash=None, cache=None, model=None, pcm_cache=None,
+                   instances=None, wait_callback=None, trace=None):
+    """
+    Transcribes audio (path, file object or 16 kHz float32 array) with Faster-Whisper
+    and returns (RawTranscript, transcription info) with every segment and word kept.
+    With workers > 1 the file is split on silence and the chunks are transcribed in parallel.
+    When audio_hash (SHA-256 of the audio bytes) is given, the raw transcript is
+    looked up in and saved to the transcription cache, and the decoded audio is
+    taken from (or added to) the PCM cache while the model loads.
+    progress_callback(fraction) is called for every segment; pass a progress.ProgressReporter
+    to throttle the updates and get ETA and real-time factor.
+    Otherwise one of `instances` pooled copies of the model is leased (default
+    WHISPER_INSTANCES); wait_callback(jobs ahead) is called while all are busy.
+    `model` overrides the pooled WhisperModel (anything with a compatible transcribe()).
+    With a metrics.Trace, the model load, decode and transcription stages are timed into it.
+    Errors are raised to the caller.
+    """
+    from metrics import Trace
+    from progress import ProgressReporter
+    from transcript import RawTranscript
+
+    if trace is None:
+        # Not finished, so nothing is logged
+        trace = Trace("transcription")
+
+    cache_key = None
+    if audio_hash:
+        from transcription_cache import get_transcription_cache, make_key
+        cache = cache or get_transcription_cache()
+        # The chunk plan (not the worker count) changes the transcript
+        cache_key = make_key(audio_hash, model_size, compute_type, BEAM_SIZE, LANGUAGE, initial_prompt,
+                             max_chunk_seconds if workers > 1 else None)
+        with trace.span("cache_lookup") as span:
+            cached = cache.get(cache_key)
+            span['hit'] = cached is not None
+        if cached is not None:
+            return cached, cached.info(cached=True)
+
+    decoded = None
+    if audio_hash and not hasattr(audio, "dtype"):
+        from pcm_cache import get_pcm_cache
+        pcm_cache = pcm_cache or get_pcm_cache()
+        # Decode (or map the cached samples) in the background while the model loads
+        def decode():
+            with trace.span("decode"):
+                return pcm_cache.load(audio, audio_hash)
+
+        decoder = ThreadPoolExecutor(max_workers=1)
+        decoded = decoder.submit(decode)
+        decoder.shutdown(wait=False)
+
+    if model is not None:
+        lease = nullcontext(model)
+    else:
+        lease = model_lease(model_size, device, compute_type, cpu_threads, workers, instances, wait_callback)
+
+    with ExitStack() as stack:
+        # Includes waiting for a free model instance
+        with trace.span("model_load"):
+            model = stack.enter_context(lease)
+
+        if decoded is not None:
+            try:
+                audio = decoded.result()
+            except Exception:
+                # The cache is only a shortcut: let the model decode (and report problems) itself
+                pass
+
+        with trace.span("transcribe", workers=workers) as span:
+            reporter = progress_callback if isinstance(progress_callback, ProgressReporter) else None
+            if reporter:
+                from chunked import SAMPLE_RATE
+                # Decoded audio tells its length up front; otherwise it is set from info below
+                reporter.begin(len(audio) / SAMPLE_RATE if hasattr(audio, "dtype") else None)
+            if workers > 1:
+                from chunked import transcribe_chunked
+                segments, info = transcribe_chunked(
+                    audio,
+                    initial_prompt=initial_prompt,
+                    workers=workers,
+                    max_chunk_seconds=max_chunk_seconds,
+                    progress_callback=progress_callback,
+                    model_size=model_size,
+                    device=device,
+                    compute_type=compute_type,
+                    model=model
+                )
+                # Progress was already reported per chunk
+                progress_callback = None
+            else:
+                # Enable word_timestamps to allow precise splitting
+                segments, info = model.transcribe(
+                    audio,
+                    beam_size=BEAM_SIZE,
+                    initial_prompt=initial_prompt,
+                    language=LANGUAGE,
+                    word_timestamps=True
+                )
+
+            total_duration = info.duration
+            if reporter:
+                reporter.audio_seconds = total_duration
+            raw = RawTranscript(duration=total_duration, language=LANGUAGE)
+
+            # Segments are generated lazily, so the model is held until the last one
+            for segment in segments:
+                # Update progress
+                if progress_callback and total_duration > 0:
+                    progress_callback(min(segment.end / total_duration, 1.0))
+                raw.append(segment)
+            span['audio_seconds'] = total_duration
+            span['segments'] = len(raw)
+
+    if cache_key:
+        cache.put(cache_key, raw)
+
+    return raw, info
+
+def transcribe(audio, initial_prompt=None, max_chars=16, progress_callback=None, keep_words=False, **options):
+    """
+    Transcribes audio and splits it into subtitles (see transcribe_raw for the options).
+    With keep_words, each subtitle segment also carries its word timings.
+    Returns (subtitle segments, transcription info).
+    """
+    raw, info = transcribe_raw(audio, initial_prompt, progress_callback, **options)
+    return resegment(raw, max_chars=max_chars, keep_words=keep_words), info
+
+def transcribe_audio(audio_path, initial_prompt=None, max_chars=16, progress_callback=None, **model_options):
+    """Transcribes audio using Faster-Whisper and returns subtitle segments."""
+    segments, _ = transcribe(audio_path, initial_prompt, max_chars, progress_callback, **model_options)
+    return segments
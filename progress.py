@@ -0,0 +1,127 @@
+"""
+Throttled progress reporting for long transcriptions.
+
+Whisper reports progress once per segment, thousands of times for a long file.
+A ProgressReporter is passed as the progress_callback instead: each call only
+stores the latest fraction, and a background thread forwards it to the real sink
+at most every `interval` seconds, and only when it moved by at least `min_delta`.
+Each update carries the elapsed time, an ETA and, once the audio length is known,
+the measured real-time factor.
+
+Exceptions raised by the sink (e.g. JobCancelled from Job.report) are re-raised
+in the producer at its next update, so cancellation still stops the decode loop.
+"""
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_MIN_DELTA = 0.01
+
+# eta and rtf are None until they can be estimated
+Progress = namedtuple("Progress", "fraction elapsed eta rtf")
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def format_progress(progress):
+    """e.g. '42% (1:23 left, 0.35x real time)'."""
+    details = []
+    if progress.eta is not None:
+        details.append(f"{format_duration(progress.eta)} left")
+    if progress.rtf is not None:
+        details.append(f"{progress.rtf:.2f}x real time")
+    text = f"{int(progress.fraction * 100)}%"
+    return f"{text} ({', '.join(details)})" if details else text
+
+class ProgressReporter:
+    def __init__(self, sink, interval=DEFAULT_INTERVAL, min_delta=DEFAULT_MIN_DELTA, audio_seconds=None,
+                 clock=time.monotonic):
+        self.sink = sink
+        self.interval = interval
+        self.min_delta = min_delta
+        # Length of the audio being transcribed, for the real-time factor; may be set later
+        self.audio_seconds = audio_seconds
+        self.updates = 0
+        self.sent = 0
+        self._clock = clock
+        self._started = clock()
+        self._fraction = None
+        self._sent_fraction = None
+        self._error = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __call__(self, fraction):
+        """Records progress (0..1). Cheap enough to call for every segment."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        self._fraction = min(max(fraction, 0.0), 1.0)
+        self.updates += 1
+        if self._thread is None:
+            self.start()
+
+    def begin(self, audio_seconds=None):
+        """Restarts the clock (e.g. once the model is loaded), so ETA and real-time factor cover decoding only."""
+        self._started = self._clock()
+        if audio_seconds:
+            self.audio_seconds = audio_seconds
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="progress-reporter", daemon=True)
+                self._thread.start()
+        return self
+
+    def snapshot(self, fraction=None):
+        """The Progress for a fraction (default: the latest one)."""
+        fraction = self._fraction if fraction is None else fraction
+        elapsed = self._clock() - self._started
+        eta = rtf = None
+        if fraction:
+            # Time per unit of progress so far predicts the rest
+            eta = elapsed * (1 - fraction) / fraction
+            if self.audio_seconds:
+                rtf = elapsed / (fraction * self.audio_seconds)
+        return Progress(fraction or 0.0, elapsed, eta, rtf)
+
+    def _emit(self, force=False):
+        fraction = self._fraction
+        if fraction is None or fraction == self._sent_fraction:
+            return
+        if not force and self._sent_fraction is not None and fraction - self._sent_fraction < self.min_delta \
+                and fraction < 1.0:
+            return
+        self._sent_fraction = fraction
+        self.sent += 1
+        try:
+            self.sink(self.snapshot(fraction))
+        except Exception as e:
+            self._error = e
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._emit()
+
+    def close(self):
+        """Stops the reporter thread and sends the last update."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._emit(force=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        if exc_type is None and self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        return False
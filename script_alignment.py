@@ -0,0 +1,176 @@
+"""
+Snaps transcribed subtitles to the matching words of the original script.
+
+The script is split into sentences and the subtitles are walked once, in order.
+Each subtitle is scored against a window of sentences after the current position
+in one vectorized rapidfuzz call; a good match replaces the subtitle text with the
+script's wording and moves the position forward. When nothing in the window
+matches (the speaker skipped ahead, or ad-libbed for a while), a character n-gram
+inverted index over the whole script proposes a few candidate sentences, so the
+aligner can re-anchor without scanning every sentence.
+
+Matching ignores spaces and punctuation, since Whisper's spacing rarely agrees
+with the script's. Needs rapidfuzz.
+"""
+import re
+from collections import Counter
+
+from pipeline import format_text
+
+DEFAULT_WINDOW = 20
+# Minimum partial-ratio score to snap to a sentence in the window
+DEFAULT_THRESHOLD = 80
+# Re-anchoring far from the current position needs a more convincing match
+DEFAULT_REANCHOR_THRESHOLD = 90
+# Subtitles shorter than this (without spaces) match too many places to be snapped
+MIN_MATCH_CHARS = 4
+
+NGRAM = 2
+# Posting lists longer than this share of the script are too common to help
+MAX_POSTING_SHARE = 0.05
+CANDIDATES = 8
+
+_SENTENCE_RE = re.compile(r"[.?!]+|\n")
+_IGNORED_RE = re.compile(r"[\s.?!\-;:,'\"]")
+
+def split_sentences(script_text):
+    return [s.strip() for s in _SENTENCE_RE.split(script_text) if s.strip()]
+
+def normalize(text):
+    """Returns (text without spaces and punctuation, original index of every kept character)."""
+    chars = []
+    positions = []
+    for i, char in enumerate(text):
+        if not _IGNORED_RE.match(char):
+            chars.append(char)
+            positions.append(i)
+    return "".join(chars), positions
+
+def _ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class NgramIndex:
+    """Inverted index from character n-grams to the sentences containing them."""
+
+    def __init__(self, texts, n=NGRAM):
+        self.n = n
+        self.size = len(texts)
+        self.postings = {}
+        for sentence_id, text in enumerate(texts):
+            for gram in _ngrams(text, n):
+                self.postings.setdefault(gram, []).append(sentence_id)
+        self.max_postings = max(50, int(self.size * MAX_POSTING_SHARE))
+
+    def candidates(self, text, start=0, limit=CANDIDATES):
+        """Sentence ids at or after `start` sharing the most n-grams with text, best first."""
+        hits = Counter()
+        for gram in _ngrams(text, self.n):
+            posting = self.postings.get(gram)
+            # Very common n-grams say little and would make the lookup linear in the script
+            if posting is None or len(posting) > self.max_postings:
+                continue
+            hits.update(sentence_id for sentence_id in posting if sentence_id >= start)
+        return [sentence_id for sentence_id, _ in hits.most_common(limit)]
+
+def _snap_to_words(text, index, forward):
+    """Moves a cut that falls inside a word of `text` to the nearest word boundary."""
+    if index <= 0 or index >= len(text) or text[index - 1].isspace() or text[index].isspace():
+        return index
+    left = index
+    while left > 0 and not text[left - 1].isspace():
+        left -= 1
+    right = index
+    while right < len(text) and not text[right].isspace():
+        right += 1
+    if index - left == right - index:
+        # Ties keep the whole word: start cuts move left, end cuts move right
+        return right if forward else left
+    return left if index - left < right - index else right
+
+class ScriptAligner:
+    def __init__(self, script_text, window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD,
+                 reanchor_threshold=DEFAULT_REANCHOR_THRESHOLD):
+        self.sentences = split_sentences(script_text)
+        normalized = [normalize(s) for s in self.sentences]
+        self.normalized = [text for text, _ in normalized]
+        self.positions = [positions for _, positions in normalized]
+        self.index = NgramIndex(self.normalized)
+        self.window = window
+        self.threshold = threshold
+        self.reanchor_threshold = reanchor_threshold
+        self.position = 0
+        self.stats = {'snapped': 0, 'reanchored': 0, 'unmatched': 0}
+
+    def _best(self, text, sentence_ids, cutoff):
+        """Scores text against the given sentences at once; returns (sentence id, score) or None."""
+        from rapidfuzz import fuzz, process
+
+        if not sentence_ids:
+            return None
+        choices = [self.normalized[i] for i in sentence_ids]
+        scores = process.cdist([text], choices, scorer=fuzz.partial_ratio, score_cutoff=cutoff)[0]
+        best = int(scores.argmax())
+        if scores[best] < cutoff or scores[best] == 0:
+            return None
+        return sentence_ids[best], float(scores[best])
+
+    def _snap(self, text, sentence_id):
+        """Replaces the matched part of text with the script's wording. Returns (text, reached sentence end)."""
+        from rapidfuzz import fuzz
+
+        norm_text, text_positions = normalize(text)
+        sentence = self.sentences[sentence_id]
+        positions = self.positions[sentence_id]
+        alignment = fuzz.partial_ratio_alignment(norm_text, self.normalized[sentence_id])
+
+        start = _snap_to_words(sentence, positions[alignment.dest_start], forward=False)
+        end = _snap_to_words(sentence, positions[alignment.dest_end - 1] + 1, forward=True)
+        # Anything in the subtitle outside the matched part is kept as transcribed
+        prefix = text[:text_positions[alignment.src_start]] if alignment.src_start else ""
+        suffix = text[text_positions[alignment.src_end - 1] + 1:] if alignment.src_end < len(norm_text) else ""
+        snapped = (prefix + sentence[start:end] + suffix).strip()
+        at_end = alignment.dest_end >= len(self.normalized[sentence_id]) - 1
+        return format_text(snapped), at_end
+
+    def align_text(self, text):
+        """Aligns one subtitle text and advances the position. Returns the (possibly snapped) text."""
+        norm_text, _ = normalize(text)
+        if len(norm_text) < MIN_MATCH_CHARS or self.position >= len(self.sentences):
+            self.stats['unmatched'] += 1
+            return text
+
+        window = list(range(self.position, min(self.position + self.window, len(self.sentences))))
+        match = self._best(norm_text, window, self.threshold)
+        if match is None:
+            # Lost sync: look the text up in the whole remaining script
+            candidates = self.index.candidates(norm_text, start=self.position)
+            match = self._best(norm_text, candidates, self.reanchor_threshold)
+            if match is None:
+                self.stats['unmatched'] += 1
+                return text
+            self.stats['reanchored'] += 1
+
+        sentence_id, _ = match
+        snapped, at_end = self._snap(text, sentence_id)
+        # A subtitle is often only part of a sentence; stay on it until its end is reached
+        self.position = sentence_id + 1 if at_end else sentence_id
+        self.stats['snapped'] += 1
+        return snapped
+
+    def align(self, segments):
+        """Yields segments with their text snapped to the script, in one monotonic pass."""
+        for segment in segments:
+            text = self.align_text(segment['text'])
+            if text == segment['text']:
+                yield segment
+                continue
+            # Word timings describe the transcribed wording, so they are not carried over
+            aligned = {key: value for key, value in segment.items() if key != 'words'}
+            aligned['text'] = text
+            yield aligned
+
+def align_segments(segments, script_text, **options):
+    """Returns (segments aligned to the script, stats)."""
+    aligner = ScriptAligner(script_text, **options)
+    aligned = list(aligner.align(segments))
+    return aligned, aligner.stats
@@ -0,0 +1,154 @@
+"""
+Columnar storage for subtitle segments.
+
+A SegmentStore holds cues as a struct of arrays: start and end times in two
+float64 NumPy arrays, and all texts packed into one string with an offsets array
+(text i is text[offsets[i]:offsets[i + 1]]). Compared with a list of
+{'start', 'end', 'text'} dicts this needs a fraction of the memory for long
+transcripts, formats every timestamp in one vectorized pass, and retimes all cues
+at once (global offset, frame-rate conversion, gap closing).
+
+Stores are immutable: retiming returns a new store sharing the packed text.
+Word timings are not kept; segments come back as plain {'start', 'end', 'text'}.
+"""
+import numpy as np
+
+# Cues formatted and written per batch, so writing never builds the whole file as one string
+WRITE_BATCH = 4096
+
+def format_timestamps(seconds, separator=","):
+    """
+    Vectorized format_timestamp: an array of 'HH:MM:SS,mmm' strings (separator "."
+    for WebVTT), identical to formatting each time on its own.
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    # Same rounding as pipeline.format_timestamp (round half to even on milliseconds)
+    milliseconds = np.rint(np.maximum(seconds, 0.0) * 1000).astype(np.int64)
+    hours, milliseconds = np.divmod(milliseconds, 3600000)
+    minutes, milliseconds = np.divmod(milliseconds, 60000)
+    secs, milliseconds = np.divmod(milliseconds, 1000)
+
+    # One row of ASCII bytes per timestamp, filled a column at a time
+    chars = np.empty(seconds.shape + (12,), dtype=np.uint8)
+    for value, digits, first in ((hours, 2, 0), (minutes, 2, 3), (secs, 2, 6), (milliseconds, 3, 9)):
+        for i in range(digits):
+            chars[..., first + digits - 1 - i] = 48 + value // 10 ** i % 10
+    chars[..., 2] = chars[..., 5] = ord(":")
+    chars[..., 8] = ord(separator)
+    formatted = chars.view("S12").reshape(seconds.shape).astype("U12")
+
+    wide = hours >= 100
+    if wide.any():
+        # Hours widen past two digits; rare enough to format one by one
+        formatted = formatted.astype(object)
+        for index in zip(*np.nonzero(wide)):
+            formatted[index] = f"{hours[index]}:{formatted[index][3:]}"
+        formatted = formatted.astype(str)
+    return formatted
+
+class SegmentStore:
+    def __init__(self, starts, ends, text="", offsets=None):
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self.text = text
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        if not len(self.starts) == len(self.ends) == len(self.offsets) - 1:
+            raise ValueError("starts, ends and offsets do not describe the same number of cues")
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Builds a store from an iterable of segment dicts (or anything with start/end/text keys)."""
+        starts, ends, texts = [], [], []
+        for segment in segments:
+            starts.append(segment['start'])
+            ends.append(segment['end'])
+            texts.append(segment['text'])
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=offsets[1:])
+        return cls(starts, ends, "".join(texts), offsets)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def text_at(self, index):
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def texts(self, begin=0, end=None):
+        """The texts of cues begin..end as a list."""
+        end = len(self) if end is None else end
+        bounds = self.offsets[begin:end + 1].tolist()
+        text = self.text
+        return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return {'start': float(self.starts[index]), 'end': float(self.ends[index]), 'text': self.text_at(index)}
+
+    def __iter__(self):
+        for begin in range(0, len(self), WRITE_BATCH):
+            end = min(begin + WRITE_BATCH, len(self))
+            starts, ends = self.starts[begin:end].tolist(), self.ends[begin:end].tolist()
+            for start, stop, text in zip(starts, ends, self.texts(begin, end)):
+                yield {'start': start, 'end': stop, 'text': text}
+
+    def to_segments(self):
+        return list(self)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the store."""
+        return self.starts.nbytes + self.ends.nbytes + self.offsets.nbytes + len(self.text.encode("utf-8"))
+
+    def _retimed(self, starts, ends):
+        return SegmentStore(starts, ends, self.text, self.offsets)
+
+    def shift(self, seconds):
+        """Moves every cue by `seconds` (negative = earlier); times before zero are clamped to zero."""
+        return self._retimed(np.maximum(self.starts + seconds, 0.0), np.maximum(self.ends + seconds, 0.0))
+
+    def scale(self, factor):
+        """Multiplies every time by `factor`."""
+        return self._retimed(self.starts * factor, self.ends * factor)
+
+    def convert_frame_rate(self, source_fps, target_fps):
+        """
+        Retimes subtitles for a video sped up or slowed down to another frame rate,
+        e.g. 23.976 -> 25 for a PAL release (every frame keeps its subtitle).
+        """
+        return self.scale(source_fps / target_fps)
+
+    def close_gaps(self, max_gap, min_gap=0.0):
+        """
+        Extends each cue up to the next one when the silence between them is at most
+        `max_gap` seconds, leaving `min_gap` seconds between them. Overlaps are left alone.
+        """
+        ends = self.ends.copy()
+        if len(self) > 1:
+            next_starts = self.starts[1:]
+            gaps = next_starts - ends[:-1]
+            close = (gaps > min_gap) & (gaps <= max_gap)
+            ends[:-1][close] = next_starts[close] - min_gap
+        return self._retimed(self.starts.copy(), ends)
+
+    def _write(self, fp, separator):
+        for begin in range(0, len(self), WRITE_BATCH):
+            end = min(begin + WRITE_BATCH, len(self))
+            starts = format_timestamps(self.starts[begin:end], separator).tolist()
+            ends = format_timestamps(self.ends[begin:end], separator).tolist()
+            fp.write("".join([
+                f"{index}\n{start} --> {stop}\n{text}\n\n"
+                for index, start, stop, text in zip(range(begin + 1, end + 1), starts, ends, self.texts(begin, end))
+            ]))
+        return len(self)
+
+    def write_srt(self, fp):
+        """Writes the cues as SRT to a text stream; same output as subtitle_writer. Returns the cue count."""
+        return self._write(fp, ",")
+
+    def write_vtt(self, fp):
+        """Writes the cues as WebVTT to a text stream. Returns the cue count."""
+        fp.write("WEBVTT\n\n")
+        return self._write(fp, ".")
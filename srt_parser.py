@@ -0,0 +1,163 @@
+"""
+Streaming, tolerant SRT/WebVTT parser.
+
+Turns subtitle text back into segments ({'start', 'end', 'text'}, times in
+seconds), e.g. SRT written by an LLM or edited by hand. Input is read line by line
+from any iterable of lines (an open file, a StringIO), so multi-megabyte files are
+never held in memory as one string, and every line is looked at once.
+
+Malformed input is repaired where the intent is clear: code fences and commentary
+around the subtitles, missing cue numbers or blank lines between cues, ':' or '.'
+before the milliseconds, short or missing milliseconds, WebVTT headers, NOTE/STYLE
+blocks and cue settings. Lines that had to be skipped and cues whose timing is
+unusable are reported as Issues with their line and column; with strict=True the
+first one raises SubtitleParseError instead.
+"""
+import io
+import re
+from collections import namedtuple
+
+# line and column are 1-based
+Issue = namedtuple("Issue", "line column message")
+
+_TIMESTAMP = r"\d+(?::\d+)+(?:[,.]\d+)?"
+# Optional cue number on the same line, then start --> end and optional WebVTT cue settings
+_TIMING_RE = re.compile(
+    rf"^\s*(?:\d+\s+)?(?P<start>{_TIMESTAMP})\s*(?:-->|->|—>|→)\s*(?P<end>{_TIMESTAMP})(?:\s.*)?$"
+)
+# Inside a cue's text only a complete SRT/WebVTT timing line starts the next cue
+_FULL_TIMESTAMP = r"\d+:\d{2}:\d{2}[,.]\d{3}"
+_FULL_TIMING_RE = re.compile(
+    rf"^\s*(?:\d+\s+)?(?P<start>{_FULL_TIMESTAMP})\s*-->\s*(?P<end>{_FULL_TIMESTAMP})(?:\s.*)?$"
+)
+# At the start of a cue, a line with a real SRT arrow is its timing line even when the times are broken
+_BROKEN_TIMING_RE = re.compile(r"^\s*(?:\d+\s+)?(?P<start>\S+)\s*-->\s*(?P<end>\S+)(?:\s.*)?$")
+_PARTS_RE = re.compile(r"^(?:(\d+):)?(\d+):(\d+)(?:[,.:](\d+))?$")
+_SKIPPED_BLOCKS = ("NOTE", "STYLE", "REGION")
+
+class SubtitleParseError(ValueError):
+    def __init__(self, message, line, column=1):
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.message = message
+        self.line = line
+        self.column = column
+
+def parse_timestamp(text):
+    """
+    'HH:MM:SS,mmm' (or WebVTT 'MM:SS.mmm', 'H:MM:SS', 'HH:MM:SS:mmm') -> seconds,
+    or None when it is not a valid time.
+    """
+    match = _PARTS_RE.match(text)
+    if not match:
+        return None
+    hours, minutes, seconds, fraction = match.groups()
+    if int(minutes) >= 60 or int(seconds) >= 60:
+        return None
+    milliseconds = round(float("0." + fraction) * 1000) if fraction else 0
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) + milliseconds / 1000
+
+class _Parser:
+    def __init__(self, strict, issues):
+        self.strict = strict
+        self.issues = issues
+
+    def issue(self, line, column, message):
+        if self.strict:
+            raise SubtitleParseError(message, line, column)
+        self.issues.append(Issue(line, column, message))
+
+    def unmatched(self, label):
+        number, column, text = label
+        self.issue(number, column, f"'{text}' is not followed by a timing line")
+
+    def timing(self, match, number):
+        """(start, end) from a timing line, or None (reported) when a time is invalid."""
+        start = parse_timestamp(match.group("start"))
+        end = parse_timestamp(match.group("end"))
+        for value, group in ((start, "start"), (end, "end")):
+            if value is None:
+                self.issue(number, match.start(group) + 1, f"invalid timestamp '{match.group(group)}'")
+                return None
+        if end < start:
+            self.issue(number, match.start("end") + 1, "cue ends before it starts")
+            end = start
+        return start, end
+
+def iter_segments(lines, strict=False, issues=None):
+    """
+    Yields segments from an iterable of SRT or WebVTT lines. Problems are appended
+    to `issues` (a list) if given, or raise SubtitleParseError when strict.
+    """
+    parser = _Parser(strict, [] if issues is None else issues)
+    cue = None  # [start, end, text lines] of the cue being read
+    label = None  # (line number, column, text) of a cue number/identifier waiting for its timing line
+    skipping = False  # inside a WebVTT header, NOTE/STYLE/REGION block or a cue with bad timing
+    block_start = True
+
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if number == 1:
+            line = line.lstrip("\ufeff")
+        stripped = line.strip()
+
+        if not stripped or stripped.startswith("```"):
+            if cue is not None:
+                yield {'start': cue[0], 'end': cue[1], 'text': "\n".join(cue[2])}
+                cue = None
+            if label is not None:
+                parser.unmatched(label)
+                label = None
+            skipping = False
+            block_start = True
+            continue
+
+        match = None
+        if ">" in line or "→" in line:
+            # A timing line belongs after a blank line or a cue number; elsewhere in a cue (or a
+            # skipped block), "9:00 → 10:00" or "A --> B" is text unless it is a complete timing line
+            if skipping or cue is not None and not (cue[2] and cue[2][-1].isdigit()):
+                match = _FULL_TIMING_RE.match(line)
+            else:
+                match = _TIMING_RE.match(line) or _BROKEN_TIMING_RE.match(line)
+        if match:
+            if cue is not None:
+                # No blank line before this cue: a bare number just above it was its cue number
+                if cue[2] and cue[2][-1].isdigit():
+                    cue[2].pop()
+                yield {'start': cue[0], 'end': cue[1], 'text': "\n".join(cue[2])}
+            times = parser.timing(match, number)
+            cue = None if times is None else [times[0], times[1], []]
+            skipping = times is None
+            label = None
+        elif cue is not None:
+            cue[2].append(stripped)
+        elif skipping:
+            pass
+        elif block_start and label is None and (
+                stripped.startswith("WEBVTT") or stripped.split(" ", 1)[0] in _SKIPPED_BLOCKS):
+            skipping = True
+        elif label is None:
+            label = (number, len(line) - len(line.lstrip()) + 1, stripped)
+        else:
+            # Commentary or a text line with no cue to belong to
+            parser.unmatched(label)
+            label = (number, len(line) - len(line.lstrip()) + 1, stripped)
+        block_start = False
+
+    if cue is not None:
+        yield {'start': cue[0], 'end': cue[1], 'text': "\n".join(cue[2])}
+    if label is not None:
+        parser.unmatched(label)
+
+def parse_subtitles(source, strict=False):
+    """Parses SRT/WebVTT text (a string or a text stream). Returns (segments, issues)."""
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    issues = []
+    segments = list(iter_segments(source, strict=strict, issues=issues))
+    return segments, issues
+
+def parse_file(path, strict=False):
+    """Parses an SRT/WebVTT file, reading it line by line. Returns (segments, issues)."""
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        return parse_subtitles(f, strict=strict)
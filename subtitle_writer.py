@@ -0,0 +1,110 @@
+"""
+Streaming subtitle output.
+
+Segments are rendered one cue at a time straight into file-like objects, so a
+long transcript never has to exist as one Python string. One pass can feed SRT,
+WebVTT and JSON (with word timings) outputs at the same time.
+"""
+import io
+import json
+
+from pipeline import format_timestamp
+
+FORMATS = ("srt", "vtt", "json")
+
+MIME_TYPES = {
+    "srt": "text/plain",
+    "vtt": "text/vtt",
+    "json": "application/json",
+}
+
+def format_vtt_timestamp(seconds):
+    """Converts seconds to WebVTT timestamp format (HH:MM:SS.mmm)."""
+    return format_timestamp(seconds).replace(",", ".")
+
+class SubtitleWriter:
+    """
+    Writes cues to any combination of SRT, VTT and JSON text streams.
+    Use as a context manager (or call close()) so the JSON array is terminated.
+    """
+
+    def __init__(self, srt=None, vtt=None, json_out=None):
+        self.srt = srt
+        self.vtt = vtt
+        self.json_out = json_out
+        self.count = 0
+        self.closed = False
+
+        if self.vtt is not None:
+            self.vtt.write("WEBVTT\n\n")
+        if self.json_out is not None:
+            self.json_out.write("[")
+
+    def write(self, segment):
+        self.count += 1
+        index = self.count
+        text = segment['text']
+
+        if self.srt is not None:
+            start_time = format_timestamp(segment['start'])
+            end_time = format_timestamp(segment['end'])
+            self.srt.write(f"{index}\n{start_time} --> {end_time}\n{text}\n\n")
+
+        if self.vtt is not None:
+            start_time = format_vtt_timestamp(segment['start'])
+            end_time = format_vtt_timestamp(segment['end'])
+            self.vtt.write(f"{index}\n{start_time} --> {end_time}\n{text}\n\n")
+
+        if self.json_out is not None:
+            cue = {
+                'index': index,
+                'start': round(segment['start'], 3),
+                'end': round(segment['end'], 3),
+                'text': text
+            }
+            if segment.get('words'):
+                cue['words'] = [
+                    {'start': round(start, 3), 'end': round(end, 3), 'word': word}
+                    for start, end, word in segment['words']
+                ]
+            self.json_out.write("\n  " if index == 1 else ",\n  ")
+            self.json_out.write(json.dumps(cue, ensure_ascii=False))
+
+    def write_all(self, segments):
+        for segment in segments:
+            self.write(segment)
+        return self.count
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.json_out is not None:
+            self.json_out.write("\n]\n" if self.count else "]\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def write_subtitles(segments, srt=None, vtt=None, json_out=None):
+    """Renders segments to the given streams in a single pass. Returns the cue count."""
+    with SubtitleWriter(srt=srt, vtt=vtt, json_out=json_out) as writer:
+        return writer.write_all(segments)
+
+def write_format(segments, fmt, fp):
+    """Renders segments in one format ('srt', 'vtt' or 'json') to a text stream."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown subtitle format: {fmt}")
+    return write_subtitles(segments, **{"json_out" if fmt == "json" else fmt: fp})
+
+def render_bytes(segments, fmt="srt"):
+    """Renders segments to a UTF-8 encoded BytesIO positioned at the start (for downloads)."""
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    write_format(segments, fmt, text)
+    text.flush()
+    text.detach()
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import time
+
+import batch_cli
+import pipeline
+
+class FakeInfo:
+    duration = 90.0
+
+def fake_transcribe(audio, **kwargs):
+    segments = [
+        {'start': 0.0, 'end': 1.5, 'text': "안녕하세요"},
+        {'start': 1.5, 'end': 3.0, 'text': "반갑습니다"}
+    ]
+    return segments, FakeInfo()
+
+def touch(path, mtime=None):
+    with open(path, "wb") as f:
+        f.write(b"\0")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_collect_audio_files():
+    print("--- Test Collect Audio Files ---")
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "sub"))
+        for name in ["a.mp3", "b.WAV", "notes.txt", os.path.join("sub", "c.m4a")]:
+            touch(os.path.join(root, name))
+
+        flat = [os.path.basename(p) for p in batch_cli.collect_audio_files([root])]
+        deep = [os.path.basename(p) for p in batch_cli.collect_audio_files([root], recursive=True)]
+        pattern = [os.path.basename(p) for p in batch_cli.collect_audio_files([os.path.join(root, "**", "*.m4a")])]
+        print(f"Flat: {flat}, Recursive: {deep}, Glob: {pattern}")
+        assert flat == ["a.mp3", "b.WAV"]
+        assert deep == ["a.mp3", "b.WAV", "c.m4a"]
+        assert pattern == ["c.m4a"]
+
+def test_skip_and_summary():
+    print("--- Test Skip If Up To Date ---")
+    original = pipeline.transcribe
+    pipeline.transcribe = fake_transcribe
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            now = time.time()
+            fresh = os.path.join(root, "fresh.mp3")
+            stale = os.path.join(root, "stale.mp3")
+            touch(fresh, now - 100)
+            touch(batch_cli.srt_path_for(fresh), now)
+            touch(stale, now)
+            touch(batch_cli.srt_path_for(stale), now - 100)
+
+            logs = []
+            results, skipped = batch_cli.run_batch([fresh, stale], {}, workers=1, log=logs.append)
+            print("\n".join(logs))
+            assert skipped == 1
+            assert [r['audio'] for r in results] == [stale]
+
+            with open(batch_cli.srt_path_for(stale), encoding="utf-8") as f:
+                assert f.read().startswith("1\n00:00:00,000 --> 00:00:01,500\n안녕하세요")
+
+            summary = batch_cli.format_summary(results, skipped, wall_seconds=45.0)
+            print(summary)
+            assert "(2.00 audio-hours per wall-hour)" in summary
+
+            results, skipped = batch_cli.run_batch([fresh, stale], {}, workers=1, force=True, log=logs.append)
+            assert skipped == 0 and len(results) == 2
+    finally:
+        pipeline.transcribe = original
+
+def test_multiple_formats():
+    print("--- Test Multiple Output Formats ---")
+    original = pipeline.transcribe
+    pipeline.transcribe = fake_transcribe
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            audio = os.path.join(root, "talk.m4a")
+            touch(audio, time.time() - 100)
+            options = {"formats": ("srt", "vtt", "json")}
+            results, _ = batch_cli.run_batch([audio], options, log=print)
+            assert sorted(os.path.basename(p) for p in results[0]['outputs']) == ["talk.json", "talk.srt", "talk.vtt"]
+            assert not [name for name in os.listdir(root) if name.endswith(".part")]
+
+            # An existing SRT alone is not enough when VTT is also requested
+            os.remove(batch_cli.output_path_for(audio, "vtt"))
+            results, skipped = batch_cli.run_batch([audio], options, log=print)
+            assert skipped == 0 and len(results) == 1
+    finally:
+        pipeline.transcribe = original
+
+def test_worker_preloads_leased_model():
+    print("--- Test Worker Preload Key ---")
+    import numpy as np
+    import model_pool
+
+    loads = []
+    def loader(size, device="auto", compute_type="int8", cpu_threads=0, num_workers=1):
+        loads.append((size, cpu_threads, num_workers))
+        return object()
+
+    saved, model_pool._pool = model_pool._pool, model_pool.ModelPool(memory_budget_mb=8192, loader=loader)
+    try:
+        batch_cli._init_worker("tiny", "int8", 4, chunk_workers=2)
+        try:
+            # The stand-in model cannot transcribe; only which model gets loaded matters
+            pipeline.transcribe_raw(np.zeros(16000, dtype="float32"), model_size="tiny", cpu_threads=4, workers=2)
+        except AttributeError:
+            pass
+        print(f"Loads: {loads}")
+        # The chunked job reuses the preloaded model instead of loading a second one
+        assert loads == [("tiny", 2, 2)]
+    finally:
+        model_pool._pool = saved
+
+if __name__ == "__main__":
+    test_collect_audio_files()
+    test_skip_and_summary()
+    test_multiple_formats()
+    test_worker_preloads_leased_model()
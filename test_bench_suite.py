@@ -0,0 +1,68 @@
+import bench_suite
+
+def test_suite_runs_real_pipeline():
+    print("--- Test Benchmark Suite ---")
+    # One run each is enough to check the wiring
+    sample_seconds, repeats = bench_suite.SAMPLE_SECONDS, bench_suite.REPEATS
+    bench_suite.SAMPLE_SECONDS, bench_suite.REPEATS = 0, 3
+    try:
+        results = bench_suite.run_suite(["1min"])
+    finally:
+        bench_suite.SAMPLE_SECONDS, bench_suite.REPEATS = sample_seconds, repeats
+    print({key: round(r['ops_per_sec']) for key, r in results.items()})
+    assert set(results) == {
+        "format_timestamp[1min]", "format_text[1min]", "split_into_segments[1min]",
+        "generate_srt_content[1min]", "parse_srt[1min]", "transcribe_audio[1min]"
+    }
+    assert results["transcribe_audio[1min]"]['ops'] == 60
+    assert all(r['ops_per_sec'] > 0 and r['score'] > 0 and r['spread'] >= 0 and r['peak_mb'] >= 0
+               for r in results.values())
+
+def test_fake_model_feeds_pipeline():
+    pipeline = bench_suite.pipeline
+    segments = pipeline.transcribe_audio("synthetic.wav", model=bench_suite.FakeWhisperModel(60))
+    # 168 words in 12 Whisper segments, split at sentence ends and 16 characters into 54 subtitles
+    words = bench_suite.make_words(60)
+    assert len(words) == 168 and len(list(bench_suite.make_segments(words))) == 12
+    assert len(segments) == 54
+    assert segments[0] == {'start': 0.0, 'end': words[2].end, 'text': "씨가 씨가 말했습니다"}
+    assert all(len(s['text']) <= 16 for s in segments)
+    # Every word lands in exactly one subtitle, in order
+    assert " ".join(s['text'] for s in segments).split() == [pipeline.format_text(w.word).strip() for w in words]
+    assert segments[-1]['end'] <= 60
+
+def test_compare_flags_regressions():
+    print("--- Test Baseline Comparison ---")
+    baseline = {
+        "a[1h]": {'score': 1000.0, 'spread': 0.02, 'peak_mb': 10.0},
+        "b[1h]": {'score': 1000.0, 'spread': 0.02, 'peak_mb': 10.0},
+        "d[1h]": {'score': 1000.0, 'spread': 0.15, 'peak_mb': 10.0},
+    }
+    results = {
+        "a[1h]": {'score': 900.0, 'spread': 0.02, 'peak_mb': 11.0},   # within tolerance
+        "b[1h]": {'score': 500.0, 'spread': 0.02, 'peak_mb': 20.0},   # slower and bigger
+        "c[1h]": {'score': 1.0, 'spread': 0.02, 'peak_mb': 99.0},     # not in the baseline
+        "d[1h]": {'score': 500.0, 'spread': 0.15, 'peak_mb': 10.0},   # too noisy to tell
+    }
+    regressions = bench_suite.compare(results, baseline, tolerance=0.3)
+    print(regressions)
+    assert len(regressions) == 2 and all(r.startswith("b[1h]") for r in regressions)
+    # The margin widens with the measured spread of both results
+    assert bench_suite.allowed_drop(results["a[1h]"], baseline["a[1h]"], 0.3) == 0.3
+    assert bench_suite.allowed_drop(results["d[1h]"], baseline["d[1h]"], 0.3) > 0.5
+
+def test_baseline_round_trip(tmp_path=None):
+    import os
+    import tempfile
+    path = os.path.join(tmp_path or tempfile.mkdtemp(), "baseline.json")
+    assert bench_suite.load_baseline(path) == {}
+    bench_suite.save_baseline({"a[1h]": {'score': 1.0, 'peak_mb': 1.0}}, path)
+    bench_suite.save_baseline({"b[1h]": {'score': 2.0, 'peak_mb': 1.0}}, path)
+    # Saving a partial run keeps the other entries
+    assert set(bench_suite.load_baseline(path)) == {"a[1h]", "b[1h]"}
+
+if __name__ == "__main__":
+    test_suite_runs_real_pipeline()
+    test_fake_model_feeds_pipeline()
+    test_compare_flags_regressions()
+    test_baseline_round_trip()
@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+
+from chunked import SAMPLE_RATE, chunk_threads, plan_chunks, transcribe_chunked
+from pipeline import Segment, Word, process_segment
+
+def test_plan_chunks():
+    print("--- Test Plan Chunks ---")
+    sr = SAMPLE_RATE
+    # Speech every 10 seconds, 8 seconds long, over one minute
+    speech = [{'start': i * 10 * sr, 'end': (i * 10 + 8) * sr} for i in range(6)]
+    chunks = plan_chunks(speech, 60 * sr, max_chunk_seconds=25)
+    print(f"Chunks (s): {[(a / sr, b / sr) for a, b in chunks]}")
+
+    # Cuts land in the middle of the 2s silences, and chunks are contiguous
+    assert chunks == [(0, 19 * sr), (19 * sr, 39 * sr), (39 * sr, 60 * sr)]
+    assert all(b - a <= 25 * sr for a, b in chunks)
+    # No speech found: the whole file is still transcribed, like the sequential path does
+    assert plan_chunks([], 60 * sr) == [(0, 60 * sr)]
+    assert plan_chunks([], 0) == []
+
+class RampModel:
+    """
+    Fake WhisperModel fed with a time ramp (sample value == absolute seconds), so it
+    can tell where its chunk sits and emit one word every half second of absolute time.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio, **kwargs):
+        with self.lock:
+            self.calls += 1
+        offset = float(audio[0])
+        length = len(audio) / SAMPLE_RATE
+        words = []
+        t = np.ceil(offset * 2) / 2
+        while t + 0.4 <= offset + length:
+            words.append(Word(t - offset, t + 0.4 - offset, f" w{int(t * 2)}", 1.0))
+            t += 0.5
+        text = "".join(w.word for w in words)
+        segments = [Segment(words[0].start, words[-1].end, text, words)] if words else []
+        return iter(segments), None
+
+def test_stitch_deduplicates_boundaries():
+    print("--- Test Stitch Boundaries ---")
+    sr = SAMPLE_RATE
+    audio = (np.arange(60 * sr) / sr).astype("float32")
+    speech = [{'start': i * 10 * sr, 'end': (i * 10 + 8) * sr} for i in range(6)]
+    model = RampModel()
+
+    progress = []
+    segments, info = transcribe_chunked(
+        audio,
+        workers=3,
+        max_chunk_seconds=25,
+        overlap_seconds=1.0,
+        speech_timestamps=speech,
+        model=model,
+        progress_callback=progress.append
+    )
+
+    words = [w for segment in segments for w in segment.words]
+    labels = [w.word.strip() for w in words]
+    expected = [f"w{i}" for i in range(len(labels))]
+    print(f"Chunks: {info.chunks}, words: {len(labels)}, first/last: {labels[0]}/{labels[-1]}")
+    assert model.calls == 3
+    assert labels == expected
+    # Timestamps are absolute again
+    assert all(abs(w.start - i * 0.5) < 1e-3 for i, w in enumerate(words))
+    assert progress[-1] == 1.0
+
+    # The stitched segments feed the normal splitter unchanged
+    subtitles = [s for segment in segments for s in process_segment(segment, max_chars=16)]
+    assert subtitles[0]['start'] == 0.0
+    assert all(a['end'] <= b['start'] for a, b in zip(subtitles, subtitles[1:]))
+
+def test_chunk_threads_split_budget():
+    print("--- Test Chunk Thread Budget ---")
+    # A batch process with 4 threads running 2 chunk workers: 2 threads each, not cores / 2
+    assert chunk_threads(2, cpu_threads=4) == 2
+    assert chunk_threads(8, cpu_threads=4) == 1
+    assert chunk_threads(1, cpu_threads=3) == 3
+
+if __name__ == "__main__":
+    test_plan_chunks()
+    test_stitch_deduplicates_boundaries()
+    test_chunk_threads_split_budget()
@@ -0,0 +1,97 @@
+from correction_memo import CorrectionMemo, normalize_text
+from gemini_correction import correct_segments
+from test_gemini_chunked import StubGemini, make_segments
+
+def test_only_new_texts_are_sent():
+    print("--- Test Correction Memo ---")
+    memo = CorrectionMemo()
+    sent = []
+
+    def correct(texts):
+        sent.append(list(texts))
+        return [t.replace("반갑슴니다", "반갑습니다") for t in texts]
+
+    segments = make_segments(10)
+    first, stats = memo.apply(segments, correct)
+    assert stats['sent'] == 10 and stats['reused'] == 0 and stats['changed'] == 10
+
+    # Two subtitles edited, one duplicated: only the two edits are sent, once each
+    edited = [dict(s) for s in segments] + [dict(segments[0])]
+    edited[3]['text'] = "새로운 반갑슴니다"
+    edited[7]['text'] = "또 다른   반갑슴니다"
+    second, stats = memo.apply(edited, correct)
+    print(stats)
+    assert sent[-1] == ["새로운 반갑슴니다", "또 다른 반갑슴니다"]
+    assert stats['sent'] == 2 and stats['reused'] == 9
+    assert second[7]['text'] == "또 다른 반갑습니다"
+    assert second[10]['text'] == first[0]['text']
+
+def test_failures_are_retried():
+    memo = CorrectionMemo()
+    segments = make_segments(3)
+    _, stats = memo.apply(segments, lambda texts: [None, "고침", None])
+    assert stats['failed'] == 2 and len(memo) == 1
+    calls = []
+    memo.apply(segments, lambda texts: calls.append(texts) or [t for t in texts])
+    assert calls == [[segments[0]['text'], segments[2]['text']]]
+
+def test_apply_without_corrector():
+    memo = CorrectionMemo()
+    memo.put("안녕 반갑슴니다", "안녕 반갑습니다")
+    segments = [{'start': 0, 'end': 1, 'text': "안녕  반갑슴니다", 'words': [(0, 1, "안녕")]}, {'start': 1, 'end': 2, 'text': "처음 보는 줄"}]
+    corrected, stats = memo.apply(segments)
+    assert corrected[0] == {'start': 0, 'end': 1, 'text': "안녕 반갑습니다"}
+    assert corrected[1] is segments[1]
+    assert stats['pending'] == 1 and stats['sent'] == 0
+
+def test_diff():
+    memo = CorrectionMemo()
+    segments = [{'text': "안녕하세요 반갑슴니다"}, {'text': "이것은 테스트입니다"}]
+    memo.apply(segments, lambda texts: [t.replace("반갑슴니다", "반갑습니다") for t in texts])
+    assert memo.diff(segments) == [{'index': 1, 'original': "안녕하세요 반갑슴니다", 'corrected': "안녕하세요 반갑습니다"}]
+
+def test_bounded():
+    memo = CorrectionMemo(max_entries=2)
+    for text in ("가", "나", "다"):
+        memo.put(text, text)
+    assert len(memo) == 2 and memo.get("가") is None
+    assert normalize_text("  가\t 나\r\n 다 \n\n") == "가 나\n다"
+
+def test_gemini_rerun_sends_only_changes():
+    print("--- Test Gemini Re-run With Memo ---")
+    memo = CorrectionMemo()
+    segments = make_segments(100)
+    stub = StubGemini(latency=0.0)
+    correct_segments(segments, stub, memo=memo, requests_per_minute=0)
+    first_calls = stub.calls
+
+    segments[50] = dict(segments[50], text="바뀐 줄 반갑슴니다")
+    corrected, report = correct_segments(segments, stub, memo=memo, requests_per_minute=0)
+    print(f"{first_calls} calls, then {stub.calls - first_calls} for one edited subtitle")
+    assert stub.calls - first_calls == 1
+    assert report['sent'] == 1 and report['reused'] == 99
+    assert corrected[50]['text'] == "바뀐 줄 반갑습니다"
+    assert "1|바뀐 줄 반갑슴니다" in stub.prompts[-1]
+
+def test_line_breaks_kept():
+    print("--- Test Multi-line Cues Through The Memo ---")
+    memo = CorrectionMemo()
+    stub = StubGemini(latency=0.0)
+    segments = [{'start': 0.0, 'end': 1.5, 'text': "안녕하세요\n반갑슴니다"}]
+    corrected, _ = correct_segments(segments, stub, memo=memo, requests_per_minute=0)
+    assert corrected[0]['text'] == "안녕하세요\n반갑습니다"
+    assert "1|안녕하세요<br>반갑슴니다" in stub.prompts[-1]
+
+    # Extra spaces around the break still find the stored correction
+    spaced = [dict(segments[0], text="안녕하세요 \n 반갑슴니다")]
+    corrected, report = correct_segments(spaced, stub, memo=memo, requests_per_minute=0)
+    assert report['sent'] == 0 and corrected[0]['text'] == "안녕하세요\n반갑습니다"
+
+if __name__ == "__main__":
+    test_only_new_texts_are_sent()
+    test_failures_are_retried()
+    test_apply_without_corrector()
+    test_diff()
+    test_bounded()
+    test_gemini_rerun_sends_only_changes()
+    test_line_breaks_kept()
@@ -0,0 +1,148 @@
+import threading
+import time
+
+from gemini_correction import (RateLimiter, batch_lines, build_prompt, correct_segments, correct_srt,
+                               correct_texts, estimate_tokens, encode_line, parse_reply)
+from pipeline import generate_srt_content
+
+class StubGemini:
+    """
+    Stands in for the Gemini client: echoes the NUMBER|TEXT lines in the prompt with
+    '반갑슴니다' fixed, after `latency` seconds. Tracks how many calls overlap.
+    `drop_lines` makes the first replies leave out their first line.
+    """
+
+    def __init__(self, latency=0.05, drop_lines=0):
+        self.latency = latency
+        self.drop_lines = drop_lines
+        self.calls = 0
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self.lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            drop = self.drop_lines > 0
+            self.drop_lines -= 1
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+
+        lines = [line.strip() for line in prompt.split("Lines:", 1)[1].strip().splitlines()]
+        if drop:
+            lines = lines[1:]
+        return "```\n" + "\n".join(line.replace("반갑슴니다", "반갑습니다") for line in lines) + "\n```"
+
+def make_segments(n):
+    return [{'start': i * 2.0, 'end': i * 2.0 + 1.5, 'text': f"안녕하세요 반갑슴니다 {i}"} for i in range(n)]
+
+def test_parse_and_batch():
+    print("--- Test Parse / Batch ---")
+    numbered = list(enumerate([s['text'] for s in make_segments(50)], start=1))
+    batches = batch_lines(numbered, max_tokens=100)
+    assert [pair for batch in batches for pair in batch] == numbered
+    assert all(sum(estimate_tokens(encode_line(n, t)) + 1 for n, t in b) <= 100 for b in batches)
+    print(f"{len(batches)} batches")
+
+    reply = "1|하나\n2|\n3|셋\n3|셋 다시\n7|모르는 번호\n설명 문장\n4 | 넷 <br> 둘째 줄"
+    assert parse_reply(reply, [1, 2, 3, 4]) == {1: "하나", 4: "넷\n둘째 줄"}
+
+def test_line_break_round_trip():
+    print("--- Test Line Break Marker Round Trip ---")
+    texts = ["A / B", "첫 줄\n둘째 줄", "a <br> b & c &lt; d", "<br/>\n&amp;"]
+    for number, text in enumerate(texts, start=1):
+        encoded = encode_line(number, text)
+        assert "\n" not in encoded
+        assert parse_reply(encoded, [number]) == {number: text}
+    # Through a correction: the model echoes the lines back
+    corrected, report = correct_texts(texts, StubGemini(0.0), requests_per_minute=0)
+    assert corrected == texts and report['unchanged_lines'] == 0
+
+def test_no_timestamps_sent():
+    print("--- Test Payload Contains Text Only ---")
+    stub = StubGemini(latency=0.0)
+    corrected, report = correct_segments(make_segments(30), stub, requests_per_minute=0)
+    payload = "".join(stub.prompts)
+    assert "-->" not in payload and "00:00" not in payload
+    assert [s['start'] for s in corrected] == [s['start'] for s in make_segments(30)]
+    assert all("반갑습니다" in s['text'] for s in corrected)
+
+def test_concurrent_correction():
+    print("--- Test Concurrent Correction (stub) ---")
+    segments = make_segments(200)
+    stub = StubGemini(latency=0.05)
+    started = time.perf_counter()
+    corrected, report = correct_segments(segments, stub, max_batch_tokens=200, concurrency=4, requests_per_minute=0)
+    elapsed = time.perf_counter() - started
+    print(f"{report['batches']} batches in {elapsed:.2f}s, max concurrent calls {stub.max_active}")
+
+    assert report['failed_batches'] == 0 and report['unchanged_lines'] == 0 and report['batches'] > 4
+    assert stub.max_active == 4
+    # Sequential would take batches * latency
+    assert elapsed < report['batches'] * stub.latency * 0.6
+    assert [s['text'] for s in corrected] == [s['text'].replace("반갑슴니다", "반갑습니다") for s in segments]
+
+def test_missing_lines_are_rerequested():
+    print("--- Test Re-request Of Missing Lines ---")
+    segments = make_segments(40)
+    # First reply drops a line: only that line is asked for again
+    stub = StubGemini(0.0, drop_lines=1)
+    corrected, report = correct_segments(segments, stub, max_batch_tokens=400, requests_per_minute=0, concurrency=1)
+    assert report['retries'] == 1 and report['unchanged_lines'] == 0
+    assert len(stub.prompts[-1].split("Lines:", 1)[1].strip().splitlines()) == 1
+    assert all("반갑습니다" in s['text'] for s in corrected)
+
+    # The re-request fails too: that line keeps its original text
+    stub = StubGemini(0.0, drop_lines=2)
+    corrected, report = correct_segments(segments, stub, max_batch_tokens=400, requests_per_minute=0,
+                                         concurrency=1, retries=1)
+    assert report['unchanged_lines'] == 1 and report['failed_batches'] == 0
+    assert sum("반갑슴니다" in s['text'] for s in corrected) == 1
+
+def test_srt_round_trip():
+    print("--- Test SRT Wrapper ---")
+    srt = generate_srt_content(make_segments(20))
+    corrected, _ = correct_srt(srt, StubGemini(0.0), requests_per_minute=0)
+    assert corrected == srt.replace("반갑슴니다", "반갑습니다")
+
+    # Malformed input goes through the tolerant parser: the fence and commentary are dropped and reported
+    fenced = "Here you go:\n```srt\n" + srt + "```\n"
+    corrected, report = correct_srt(fenced, StubGemini(0.0), requests_per_minute=0)
+    assert corrected == srt.replace("반갑슴니다", "반갑습니다")
+    assert [issue.line for issue in report['parse_issues']] == [1]
+
+    # Punctuation the model adds back is removed, as in correct_segments
+    def punctuate(prompt):
+        return StubGemini(0.0)(prompt).replace("반갑습니다", "반갑습니다!").replace("\n```", ".\n```")
+    corrected, _ = correct_srt(srt, punctuate, requests_per_minute=0)
+    assert corrected == srt.replace("반갑슴니다", "반갑습니다")
+
+def test_rate_limiter():
+    print("--- Test Rate Limiter ---")
+    limiter = RateLimiter(per_minute=1200)  # one call every 50 ms
+    started = time.perf_counter()
+    for _ in range(5):
+        limiter.wait()
+    assert time.perf_counter() - started >= 0.19
+
+def test_prompt_is_compact():
+    segments = make_segments(100)
+    srt_chars = len(generate_srt_content(segments))
+    compact_chars = len(build_prompt(list(enumerate([s['text'] for s in segments], start=1))))
+    print(f"SRT payload {srt_chars} chars vs compact {compact_chars} chars")
+    assert compact_chars < srt_chars * 0.6
+
+if __name__ == "__main__":
+    test_parse_and_batch()
+    test_line_break_round_trip()
+    test_no_timestamps_sent()
+    test_concurrent_correction()
+    test_missing_lines_are_rerequested()
+    test_srt_round_trip()
+    test_rate_limiter()
+    test_prompt_is_compact()
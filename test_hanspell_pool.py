@@ -0,0 +1,146 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from hanspell_custom import SpellerClient, html_to_text, pack_texts
+
+TYPOS = {"외않되": "왜 안 돼", "어떻게돼": "어떻게 돼"}
+
+class FakeNaver(BaseHTTPRequestHandler):
+    """Stand-in for the search page and the speller proxy. Keys stop working after `key_uses` requests."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body, content_type="application/json"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        state = self.server.state
+        with state['lock']:
+            state['connections'].add(self.client_address)
+        url = urlparse(self.path)
+        if url.path == "/search":
+            with state['lock']:
+                state['key_number'] += 1
+                state['key_uses'] = 0
+                state['searches'] += 1
+            self.reply(200, f"<script>var url='...&passportKey=key{state['key_number']}&x=1'</script>", "text/html")
+            return
+
+        params = parse_qs(url.query)
+        with state['lock']:
+            state['speller_calls'] += 1
+            expired = params['passportKey'][0] != f"key{state['key_number']}" or state['key_uses'] >= state['max_uses']
+            state['key_uses'] += 1
+        if expired:
+            self.reply(200, json.dumps({'message': {'error': "유효한 키가 아닙니다."}}))
+            return
+        text = params['q'][0]
+        assert len(text) <= 500
+        errors = 0
+        for typo, fix in TYPOS.items():
+            if typo in text:
+                errors += text.count(typo)
+                text = text.replace(typo, f"<em class='red_text'>{fix}</em>")
+        result = {'html': text.replace("\n", "<br>"), 'errata_count': errors}
+        self.reply(200, json.dumps({'message': {'result': result}}, ensure_ascii=False))
+
+def start_server(max_uses=1000):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNaver)
+    server.state = {
+        'lock': threading.Lock(), 'connections': set(), 'key_number': 0, 'key_uses': 0,
+        'max_uses': max_uses, 'searches': 0, 'speller_calls': 0
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_client(server, **options):
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return SpellerClient(search_url=base + "/search", speller_url=base + "/speller", **options)
+
+def test_html_to_text():
+    assert html_to_text("왜 <em class='red_text'>안</em> 돼<br>A &amp; B") == "왜 안 돼\nA & B"
+
+def test_pack_texts():
+    texts = ["가" * 200, "나" * 200, "다" * 200, "라\n마", "바"]
+    batches = pack_texts(texts, max_chars=500)
+    assert batches == [[0, 1], [2], [3], [4]]
+
+def test_pooled_session_and_cached_key():
+    print("--- Test Pooled Speller Client ---")
+    server = start_server()
+    try:
+        client = make_client(server, concurrency=1)
+        for text in ["맞춤법 외않되", "그래서 어떻게돼", "괜찮아요"]:
+            client.check(text)
+        state = server.state
+        print(f"{state['speller_calls']} speller calls, {state['searches']} key fetches, {len(state['connections'])} connections")
+        assert state['searches'] == 1
+        assert len(state['connections']) == 1
+        assert client.check("외않되").checked == "왜 안 돼"
+    finally:
+        server.shutdown()
+
+def test_refreshes_rejected_key():
+    server = start_server(max_uses=2)
+    try:
+        client = make_client(server)
+        results = [client.check("외않되") for _ in range(5)]
+        assert all(r.result and r.checked == "왜 안 돼" for r in results)
+        assert server.state['searches'] == 3
+    finally:
+        server.shutdown()
+
+def test_batches_map_back():
+    print("--- Test Batched Speller Requests ---")
+    server = start_server()
+    try:
+        client = make_client(server, concurrency=4)
+        texts = [f"{i}번 자막 외않되" if i % 3 == 0 else f"{i}번 자막 괜찮아요" for i in range(300)]
+        results = client.check_batch(texts)
+        calls = server.state['speller_calls']
+        print(f"{len(texts)} texts in {calls} requests")
+        assert calls <= len(texts) // 20
+        for i, result in enumerate(results):
+            expected = texts[i].replace("외않되", "왜 안 돼")
+            assert result.original == texts[i] and result.checked == expected
+    finally:
+        server.shutdown()
+
+def test_correct_segments():
+    server = start_server()
+    try:
+        client = make_client(server)
+        segments = [
+            {'start': 0.0, 'end': 1.0, 'text': "맞춤법 외않되", 'words': [(0.0, 1.0, " 맞춤법")]},
+            {'start': 1.0, 'end': 2.0, 'text': "괜찮아요"},
+        ]
+        corrected, stats = client.correct_segments(segments)
+        assert stats['changed'] == 1
+        assert corrected[0] == {'start': 0.0, 'end': 1.0, 'text': "맞춤법 왜 안 돼"}
+        assert corrected[1] is segments[1]
+    finally:
+        server.shutdown()
+
+def test_unreachable_service():
+    client = SpellerClient(search_url="http://127.0.0.1:9/search", speller_url="http://127.0.0.1:9/speller", timeout=1)
+    results = client.check_batch(["외않되", "괜찮아요"])
+    assert [r.result for r in results] == [False, False]
+    assert [r.checked for r in results] == ["외않되", "괜찮아요"]
+
+if __name__ == "__main__":
+    test_html_to_text()
+    test_pack_texts()
+    test_pooled_session_and_cached_key()
+    test_refreshes_rejected_key()
+    test_batches_map_back()
+    test_correct_segments()
+    test_unreachable_service()
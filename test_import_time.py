@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+# Everything the CLI and background workers import; none of it may pull in the UI or a backend
+CORE_MODULES = [
+    "pipeline", "transcript", "subtitle_writer", "batch_cli", "job_queue", "model_pool", "chunked",
+    "transcription_cache", "pcm_cache", "disk_cache", "uploads", "correction_memo", "gemini_correction",
+    "keyword_extraction", "hanspell_custom", "script_alignment", "metrics", "progress", "srt_parser",
+]
+# Loaded on first use only
+HEAVY_MODULES = [
+    "streamlit", "faster_whisper", "ctranslate2", "av", "google.generativeai", "dotenv",
+    "requests", "numpy", "rapidfuzz", "http.server",
+]
+IMPORT_BUDGET_SECONDS = 0.3
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {modules}
+elapsed = time.perf_counter() - started
+print(elapsed)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def run_probe():
+    code = PROBE.format(modules=", ".join(CORE_MODULES), heavy=HEAVY_MODULES)
+    # A fresh interpreter, so nothing is imported yet
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    elapsed, loaded = output.split("\n")[:2]
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+def test_core_imports_stay_light():
+    print("--- Test Import Time ---")
+    # Best of a few runs, so a busy machine does not fail the budget
+    results = [run_probe() for _ in range(3)]
+    elapsed = min(e for e, _ in results)
+    loaded = results[0][1]
+    print(f"Core modules imported in {elapsed * 1000:.0f} ms; heavy modules loaded: {loaded or 'none'}")
+    assert loaded == []
+    assert elapsed < IMPORT_BUDGET_SECONDS
+
+def test_backends_load_on_first_use():
+    from hanspell_custom import SpellerClient
+
+    client = SpellerClient()
+    assert client._session is None
+    # The pooled session (and requests) appear once the client is used
+    session = client.session
+    assert session is client.session and session.headers['User-Agent']
+
+if __name__ == "__main__":
+    test_core_imports_stay_light()
+    test_backends_load_on_first_use()
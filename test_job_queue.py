@@ -0,0 +1,99 @@
+import threading
+import time
+
+from job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue, QueueFull
+
+def sleeper(job, seconds, log=None, name=None):
+    steps = 10
+    for i in range(steps):
+        time.sleep(seconds / steps)
+        job.report((i + 1) / steps, f"step {i + 1}")
+    if log is not None:
+        log.append(name)
+    return name
+
+def test_result_and_progress():
+    print("--- Test Job Queue ---")
+    queue = JobQueue(workers=1)
+    job = queue.submit(sleeper, 0.2, name="a", owner="alice")
+    assert queue.get(job.id) is job
+    time.sleep(0.1)
+    assert job.status == RUNNING and 0 < job.progress < 1
+    assert job.wait(2)
+    assert job.status == DONE and job.result == "a" and job.progress == 1.0 and job.message == "step 10"
+
+def test_failure_is_captured():
+    queue = JobQueue(workers=1)
+
+    def broken(job):
+        raise ValueError("bad audio")
+
+    job = queue.submit(broken)
+    job.wait(2)
+    assert job.status == FAILED and job.error == "bad audio"
+    # The worker survives and takes the next job
+    assert queue.submit(sleeper, 0.01, name="b").wait(2)
+
+def test_cancel_queued_and_running():
+    print("--- Test Job Cancellation ---")
+    queue = JobQueue(workers=1)
+    cleaned = []
+    running = queue.submit(sleeper, 5, name="long", cleanup=lambda: cleaned.append("long"))
+    waiting = queue.submit(sleeper, 5, name="waiting", cleanup=lambda: cleaned.append("waiting"))
+    time.sleep(0.1)
+    assert running.status == RUNNING and waiting.status == QUEUED
+
+    queue.cancel(waiting.id)
+    assert waiting.status == CANCELLED and cleaned == ["waiting"]
+
+    started = time.perf_counter()
+    queue.cancel(running.id)
+    assert running.wait(2)
+    print(f"running job stopped after {time.perf_counter() - started:.2f}s")
+    assert running.status == CANCELLED and cleaned == ["waiting", "long"]
+
+def test_round_robin_between_owners():
+    print("--- Test Fair Scheduling ---")
+    queue = JobQueue(workers=1)
+    order = []
+    gate = threading.Event()
+
+    def blocker(job):
+        gate.wait(2)
+
+    first = queue.submit(blocker, owner="alice")
+    while first.status != RUNNING:
+        time.sleep(0.01)
+    jobs = [queue.submit(sleeper, 0.01, order, f"alice-{i}", owner="alice") for i in range(3)]
+    bob = queue.submit(sleeper, 0.01, order, "bob-0", owner="bob")
+    time.sleep(0.05)
+    assert queue.position(bob) == 1
+    gate.set()
+    for job in jobs + [bob, first]:
+        job.wait(2)
+    print(order)
+    # Bob's single job does not wait behind all of Alice's
+    assert order == ["alice-0", "bob-0", "alice-1", "alice-2"]
+
+def test_bounded_per_owner():
+    queue = JobQueue(workers=1, max_pending_per_owner=2)
+    gate = threading.Event()
+    queue.submit(lambda job: gate.wait(2), owner="alice")
+    time.sleep(0.05)
+    queue.submit(sleeper, 0.01, owner="alice")
+    queue.submit(sleeper, 0.01, owner="alice")
+    try:
+        queue.submit(sleeper, 0.01, owner="alice")
+        assert False, "expected QueueFull"
+    except QueueFull:
+        pass
+    # Other users can still queue
+    queue.submit(sleeper, 0.01, owner="bob")
+    gate.set()
+
+if __name__ == "__main__":
+    test_result_and_progress()
+    test_failure_is_captured()
+    test_cancel_queued_and_running()
+    test_round_robin_between_owners()
+    test_bounded_per_owner()
@@ -0,0 +1,178 @@
+import re
+import tempfile
+import threading
+import time
+
+from keyword_extraction import (KeywordCache, cached_extract_keywords, extract_keywords, extract_keywords_async,
+                                make_keyword_key, merge_keyword_lists, split_script)
+
+class CountingGemini:
+    def __init__(self, reply="김민중, 서울, 파이썬", latency=0.0):
+        self.reply = reply
+        self.latency = latency
+        self.calls = 0
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.calls += 1
+        self.prompts.append(prompt)
+        time.sleep(self.latency)
+        return self.reply + "\n"
+
+def test_cache_hit_skips_gemini():
+    print("--- Test Keyword Cache Hit ---")
+    with tempfile.TemporaryDirectory() as root:
+        cache = KeywordCache(root)
+        gemini = CountingGemini()
+        script = "김민중 씨가 서울에서 파이썬을 가르칩니다."
+
+        first = cached_extract_keywords(script, lambda: gemini, limit=30, cache=cache)
+        second = cached_extract_keywords(script, lambda: gemini, limit=30, cache=cache)
+        assert first == ("김민중, 서울, 파이썬", False)
+        assert second == ("김민중, 서울, 파이썬", True)
+        assert gemini.calls == 1 and "30 keywords" in gemini.prompts[0]
+
+        # A different limit is a different question
+        cached_extract_keywords(script, lambda: gemini, limit=50, cache=cache)
+        assert gemini.calls == 2
+
+def test_hit_needs_no_client():
+    with tempfile.TemporaryDirectory() as root:
+        cache = KeywordCache(root)
+        cache.put(make_keyword_key("script", 50), "키워드")
+
+        def no_client():
+            raise AssertionError("client built on a cache hit")
+
+        assert cached_extract_keywords("script", no_client, cache=cache) == ("키워드", True)
+
+def test_key_covers_script_limit_model():
+    base = make_keyword_key("script", 50, "gemini-2.5-flash")
+    assert base == make_keyword_key("script", 50, "gemini-2.5-flash")
+    assert base != make_keyword_key("script!", 50, "gemini-2.5-flash")
+    assert base != make_keyword_key("script", 40, "gemini-2.5-flash")
+    assert base != make_keyword_key("script", 50, "gemini-2.5-pro")
+    # The whole script is sent, so text past the first chunk matters too
+    long_script = "가" * 10000
+    assert make_keyword_key(long_script, 50) != make_keyword_key(long_script + "추가", 50)
+
+def test_ttl_expiry():
+    print("--- Test Keyword Cache TTL ---")
+    with tempfile.TemporaryDirectory() as root:
+        cache = KeywordCache(root, ttl_seconds=60)
+        cache.put("ab12", "키워드")
+        assert cache.get("ab12") == "키워드"
+
+        real_time = time.time
+        try:
+            time.time = lambda: real_time() + 120
+            assert cache.get("ab12") is None
+        finally:
+            time.time = real_time
+        assert cache.stats()['expired'] == 1 and cache.stats()['entries'] == 0
+
+def test_errors_are_not_cached():
+    with tempfile.TemporaryDirectory() as root:
+        cache = KeywordCache(root)
+
+        def failing(prompt):
+            raise RuntimeError("quota")
+
+        try:
+            cached_extract_keywords("script", lambda: failing, cache=cache)
+            assert False, "expected the error to propagate"
+        except RuntimeError:
+            pass
+        assert cache.stats()['entries'] == 0
+
+def test_async_overlaps_other_work():
+    print("--- Test Async Keyword Extraction ---")
+    with tempfile.TemporaryDirectory() as root:
+        cache = KeywordCache(root)
+        gemini = CountingGemini(latency=0.3)
+        started = time.perf_counter()
+        future = extract_keywords_async("script", lambda: gemini, cache=cache)
+        time.sleep(0.3)  # stands in for saving and decoding the upload
+        keywords, cached = future.result()
+        elapsed = time.perf_counter() - started
+        print(f"Both steps took {elapsed:.2f}s")
+        assert keywords == "김민중, 서울, 파이썬" and not cached
+        assert elapsed < 0.55
+
+class ChunkGemini:
+    """Replies with the names found in the chunk it was given; chunks containing "느림" never finish in time."""
+
+    def __init__(self, latency=0.1):
+        self.latency = latency
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(2 if "느림" in prompt else self.latency)
+            text = prompt.split("Text:", 1)[1]
+            names = sorted(set(re.findall(r"인물\d+", text)))
+            return ", ".join(["공통"] + names)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def long_script(n_chunks):
+    filler = "그리고 이야기가 계속됩니다 " * 600
+    return "\n".join(f"인물{i} 등장 {filler}" for i in range(n_chunks))
+
+def test_split_script():
+    script = long_script(4)
+    chunks = split_script(script, max_chars=10000)
+    assert all(len(chunk) <= 10000 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "").replace("\n", "") == script.replace(" ", "").replace("\n", "")
+
+def test_merge_by_frequency_and_rank():
+    merged = merge_keyword_lists([["가", "나", "다"], ["나", "라"], ["나", "가"]], limit=3)
+    assert merged == ["나", "가", "라"]
+
+def test_late_names_reach_the_prompt():
+    print("--- Test Map-Reduce Keyword Extraction ---")
+    gemini = ChunkGemini()
+    script = long_script(6)
+    started = time.perf_counter()
+    keywords, report = extract_keywords(script, gemini, limit=50, concurrency=3)
+    elapsed = time.perf_counter() - started
+    print(f"{report['chunks']} chunks, at most {gemini.max_active} at once, {elapsed:.2f}s: {keywords}")
+    words = keywords.split(", ")
+    # Named by every chunk, so it ranks first
+    assert words[0] == "공통"
+    assert "인물5" in words and report['completed'] == report['chunks']
+    assert gemini.max_active <= 3
+
+def test_time_budget():
+    print("--- Test Keyword Time Budget ---")
+    with tempfile.TemporaryDirectory() as root:
+        cache = KeywordCache(root)
+        script = long_script(3) + "\n느림 인물9"
+        started = time.perf_counter()
+        keywords, cached = cached_extract_keywords(
+            script, lambda: ChunkGemini(), cache=cache, concurrency=4, time_budget=0.5
+        )
+        elapsed = time.perf_counter() - started
+        print(f"Returned after {elapsed:.2f}s: {keywords}")
+        assert elapsed < 1.5
+        assert "인물0" in keywords and "인물9" not in keywords
+        # A partial result is not cached, so the next run tries the slow chunk again
+        assert cache.stats()['entries'] == 0
+
+if __name__ == "__main__":
+    test_cache_hit_skips_gemini()
+    test_hit_needs_no_client()
+    test_key_covers_script_limit_model()
+    test_ttl_expiry()
+    test_errors_are_not_cached()
+    test_async_overlaps_other_work()
+    test_split_script()
+    test_merge_by_frequency_and_rank()
+    test_late_names_reach_the_prompt()
+    test_time_budget()
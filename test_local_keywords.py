@@ -0,0 +1,72 @@
+import time
+
+from keyword_extraction import PARTICLES, SuffixTrie, extract_keywords_local
+
+def test_longest_match():
+    print("--- Test Suffix Trie ---")
+    trie = SuffixTrie(['에', '에서', '에서는', '는'])
+    assert trie.longest_suffix("학교에서는") == 3
+    assert trie.strip("학교에서") == "학교"
+    assert trie.strip("학교는") == "학교"
+    assert trie.strip("학교") == "학교"
+    # A suffix never swallows the whole word
+    assert trie.strip("에서") == "에서"
+    assert PARTICLES.strip("공부합니다") == "공부"
+
+def test_stripping_and_frequency():
+    print("--- Test Local Keyword Extraction ---")
+    script = "학교에서 학교는 학교가 선생님은 선생님이 학생"
+    result = extract_keywords_local(script)
+    print(f"Result: {result}")
+    assert result.split(", ")[:3] == ["학교", "선생님", "학생"]
+
+def test_stop_words():
+    script = "중요 그런데 그리고 하지만 그래서 그건 거죠 거예요"
+    result = extract_keywords_local(script)
+    assert result == "중요"
+
+def test_proper_nouns_boosted():
+    script = "강의 강의 김민중 씨가 설명합니다 김민중씨는 Python Python 강의"
+    words = extract_keywords_local(script).split(", ")
+    print(f"Result: {words}")
+    # Names and capitalized words outrank a noun that is only a little more frequent
+    assert words.index("김민중") < words.index("강의")
+    assert words.index("Python") < words.index("강의")
+    assert "김민중씨" not in words and "씨가" not in words
+
+def test_verbs_and_adjectives_dropped():
+    print("--- Test Verb Endings ---")
+    script = ("어제 회의에서 프로젝트 일정을 이야기했습니다. 발표가 길었습니다. 결과를 확인했고 "
+              "다음 주에 다시 만나겠습니다. 분위기가 좋았어요. 모두 열심히 준비했었다.")
+    words = extract_keywords_local(script).split(", ")
+    print(f"Result: {words}")
+    for stem in ("이야기했", "길었", "길었습니다", "확인했", "만나겠", "좋았", "좋았어요", "준비했었다", ""):
+        assert stem not in words
+    # The noun of a 하다 verb is still a keyword
+    assert {"회의", "프로젝트", "일정", "발표", "이야기", "확인"} <= set(words)
+
+def test_limit_and_empty():
+    assert extract_keywords_local("") is None
+    assert extract_keywords_local("가 나 다") is None
+    script = " ".join(f"단어{i}" for i in range(100))
+    assert len(extract_keywords_local(script, limit=10).split(", ")) == 10
+
+def test_large_script_is_fast():
+    print("--- Test Local Extraction Speed ---")
+    sentence = "오늘은 김민중 씨가 서울에서 파이썬 강의를 합니다 학생들은 열심히 공부합니다 "
+    script = sentence * (1024 * 1024 // len(sentence.encode("utf-8")))
+    started = time.perf_counter()
+    result = extract_keywords_local(script, limit=50)
+    elapsed = time.perf_counter() - started
+    print(f"{len(script.encode('utf-8')) / 2**20:.1f} MB in {elapsed * 1000:.0f} ms: {result}")
+    assert result.startswith("김민중")
+    assert elapsed < 1.0
+
+if __name__ == "__main__":
+    test_longest_match()
+    test_stripping_and_frequency()
+    test_stop_words()
+    test_proper_nouns_boosted()
+    test_verbs_and_adjectives_dropped()
+    test_limit_and_empty()
+    test_large_script_is_fast()
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import time
+import urllib.request
+
+from metrics import Metrics, Trace, start_server
+
+def make_metrics():
+    path = os.path.join(tempfile.mkdtemp(), "metrics.jsonl")
+    return Metrics(log_path=path), path
+
+def read_log(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_spans_and_log():
+    print("--- Test Trace Spans ---")
+    metrics, path = make_metrics()
+    with Trace("transcription", metrics=metrics, audio_hash="abc") as trace:
+        with trace.span("model_load"):
+            time.sleep(0.02)
+        with trace.span("transcribe") as span:
+            time.sleep(0.05)
+            span['audio_seconds'] = 10.0
+        trace.add("keyword_extraction", 0.5, source="gemini")
+
+    record = trace.record
+    print({s['stage']: round(s['seconds'], 3) for s in record['spans']})
+    assert record['status'] == "done" and record['audio_hash'] == "abc"
+    stages = {s['stage']: s for s in record['spans']}
+    assert stages['model_load']['seconds'] >= 0.02
+    assert 0.005 <= stages['transcribe']['rtf'] < 0.05
+    assert stages['keyword_extraction']['source'] == "gemini"
+    assert read_log(path) == [json.loads(json.dumps(record))]
+
+def test_failed_trace():
+    metrics, path = make_metrics()
+    try:
+        with Trace("correction", metrics=metrics) as trace, trace.span("correction"):
+            raise ValueError("quota")
+    except ValueError:
+        pass
+    record = read_log(path)[0]
+    assert record['status'] == "failed" and record['error'] == "ValueError"
+    assert record['spans'][0]['error'] == "ValueError"
+    # Finishing again changes nothing
+    assert trace.finish() is trace.record and len(read_log(path)) == 1
+
+def test_prometheus_text():
+    print("--- Test Prometheus Export ---")
+    metrics, _ = make_metrics()
+    for seconds in (0.2, 3.0, 40.0):
+        trace = Trace("transcription", metrics=metrics)
+        trace.add("transcribe", seconds, audio_seconds=100.0)
+        trace.finish()
+    Trace("transcription", metrics=metrics).finish("cancelled")
+
+    text = metrics.prometheus_text()
+    print(text[:400])
+    lines = set(text.splitlines())
+    assert 'srt_stage_seconds_bucket{stage="transcribe",le="0.5"} 1' in lines
+    assert 'srt_stage_seconds_bucket{stage="transcribe",le="5"} 2' in lines
+    assert 'srt_stage_seconds_bucket{stage="transcribe",le="+Inf"} 3' in lines
+    assert 'srt_stage_seconds_count{stage="transcribe"} 3' in lines
+    assert 'srt_jobs_total{kind="transcription",status="done"} 3' in lines
+    assert 'srt_jobs_total{kind="transcription",status="cancelled"} 1' in lines
+    assert 'srt_transcribed_audio_seconds_total 300.000' in lines
+
+def test_metrics_endpoint():
+    metrics, _ = make_metrics()
+    server = start_server(0, metrics)
+    assert server is None
+    server = start_server(18931, metrics, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen("http://127.0.0.1:18931/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert "# TYPE srt_stage_seconds histogram" in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_pipeline_stages():
+    print("--- Test Pipeline Instrumentation ---")
+    import pipeline
+    from bench_suite import FakeWhisperModel
+
+    metrics, _ = make_metrics()
+    with Trace("transcription", metrics=metrics) as trace:
+        pipeline.transcribe_raw("synthetic.wav", model=FakeWhisperModel(60), trace=trace)
+    stages = [s['stage'] for s in trace.record['spans']]
+    print(stages)
+    assert stages == ["model_load", "transcribe"]
+    assert trace.record['spans'][1]['audio_seconds'] == 60
+
+if __name__ == "__main__":
+    test_spans_and_log()
+    test_failed_trace()
+    test_prometheus_text()
+    test_metrics_endpoint()
+    test_pipeline_stages()
@@ -0,0 +1,213 @@
+import threading
+import time
+
+import model_pool
+from model_pool import InstanceSlots, ModelPool, thread_plan
+
+class FakeModel:
+    def __init__(self, size, device, compute_type, cpu_threads, num_workers):
+        self.key = (size, device, compute_type, cpu_threads, num_workers)
+
+def make_pool(budget_mb):
+    loads = []
+    def loader(size, device="auto", compute_type="int8", cpu_threads=0, num_workers=1):
+        loads.append(size)
+        return FakeModel(size, device, compute_type, cpu_threads, num_workers)
+    return ModelPool(memory_budget_mb=budget_mb, loader=loader), loads
+
+def test_model_reused():
+    print("--- Test Model Reuse ---")
+    pool, loads = make_pool(4096)
+    first = pool.get("medium")
+    second = pool.get("medium")
+    print(f"Loads: {loads}")
+    assert first is second
+    assert loads == ["medium"]
+
+    # A different key is a different model
+    threaded = pool.get("medium", cpu_threads=4)
+    assert threaded is not first
+    assert len(pool) == 2
+
+def test_lru_eviction():
+    print("--- Test LRU Eviction ---")
+    # Budget fits medium (1500) + small (480) but not another medium-sized model
+    pool, loads = make_pool(2000)
+    pool.get("medium")
+    pool.get("small")
+    pool.get("medium")  # touch medium so small becomes least recently used
+    pool.get("tiny")    # 1500 + 480 + 75 > 2000 -> evicts small
+    loaded = [key[0] for key, _ in pool.loaded()]
+    print(f"Loaded: {loaded}")
+    assert loaded == ["medium", "tiny"]
+    assert pool.used_mb() <= 2000
+
+def test_unload():
+    print("--- Test Unload ---")
+    pool, loads = make_pool(8192)
+    pool.get("medium")
+    pool.get("small")
+    assert pool.unload("small") == 1
+    assert [key[0] for key, _ in pool.loaded()] == ["medium"]
+    pool.get("small")
+    assert loads == ["medium", "small", "small"]
+    assert pool.clear() == 2
+    assert len(pool) == 0
+
+def test_budget_shrink():
+    print("--- Test Budget Shrink ---")
+    pool, _ = make_pool(8192)
+    pool.get("medium")
+    pool.get("small")
+    pool.set_memory_budget(1000)
+    assert [key[0] for key, _ in pool.loaded()] == ["small"]
+
+def test_thread_plan():
+    print("--- Test Thread Plan ---")
+    assert thread_plan(1, cores=8) == 8
+    assert thread_plan(3, cores=8) == 2
+    # More instances than cores still gets one thread each
+    assert thread_plan(16, cores=8) == 1
+
+def test_lease_bounds_concurrency():
+    print("--- Test Model Lease ---")
+    pool, loads = make_pool(8192)
+    running = []
+    peak = []
+    models = set()
+    lock = threading.Lock()
+
+    def job():
+        with pool.lease("small", instances=2) as model:
+            with lock:
+                running.append(model)
+                peak.append(len(running))
+                models.add(id(model))
+            time.sleep(0.05)
+            with lock:
+                running.remove(model)
+
+    threads = [threading.Thread(target=job) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Peak concurrency: {max(peak)}, loads: {loads}")
+    # Two separate copies, never more than two jobs on them at once
+    assert max(peak) == 2
+    assert len(models) == 2 and loads == ["small", "small"]
+    assert {key[5] for key, _ in pool.loaded()} == {0, 1}
+    assert pool.slots("small", instances=2).in_use() == 0
+
+def test_lease_respects_budget():
+    print("--- Test Lease Memory Budget ---")
+    loads = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def loader(size, **kwargs):
+        with lock:
+            loads.append(size)
+        time.sleep(0.02)
+        return FakeModel(size, **kwargs)
+
+    # 3 x medium (1500 MB) does not fit in 4096 MB, so only two instances are used
+    pool = ModelPool(memory_budget_mb=4096, loader=loader)
+    assert pool.max_instances("medium", instances=3) == 2
+
+    def job(delay):
+        time.sleep(delay)
+        with pool.lease("medium", instances=3):
+            with lock:
+                peak[0] = max(peak[0], pool.used_mb())
+            time.sleep(0.03)
+
+    # Three at once, then staggered jobs: no overshoot and no evict-and-reload of leased copies
+    threads = [threading.Thread(target=job, args=(i * 0.01 if i >= 3 else 0,)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Loads: {len(loads)}, peak: {peak[0]} MB")
+    assert len(loads) == 2 and peak[0] <= 4096
+
+def test_leased_model_not_evicted():
+    print("--- Test Leased Model Kept ---")
+    pool, loads = make_pool(600)
+    with pool.lease("small", instances=1) as model:
+        pool.get("tiny")
+        # small (480) + tiny (75) fit; a second small would not, but the leased one stays
+        pool.get("small", cpu_threads=1)
+        assert pool.leased() and pool.make_key("small", cpu_threads=model.key[3]) in pool
+    assert not pool.leased()
+
+def test_chunked_jobs_lease():
+    print("--- Test Chunked Jobs Lease ---")
+    import numpy as np
+    import pipeline
+
+    pool, loads = make_pool(8192)
+    saved, model_pool._pool = model_pool._pool, pool
+    waits = []
+
+    def give_up(ahead):
+        waits.append(ahead)
+        raise RuntimeError("gave up")
+
+    try:
+        # A sequential job holds the only instance; a chunked job has to queue behind it
+        with pool.lease("tiny", instances=1):
+            try:
+                pipeline.transcribe_raw(np.zeros(16000, dtype="float32"), model_size="tiny", workers=2,
+                                        instances=1, wait_callback=give_up)
+                assert False, "the chunked job should have waited"
+            except RuntimeError:
+                pass
+        assert waits == [0] and loads == ["tiny"]
+    finally:
+        model_pool._pool = saved
+
+def test_lease_wait_position_and_abandon():
+    print("--- Test Lease Queue Position ---")
+    slots = InstanceSlots(1)
+    model_pool.WAIT_POLL_SECONDS, poll = 0.01, model_pool.WAIT_POLL_SECONDS
+    try:
+        held = slots.acquire()
+        positions = {}
+
+        def waiter(name, give_up=False):
+            def on_wait(ahead):
+                positions.setdefault(name, []).append(ahead)
+                if give_up and len(positions[name]) > 3:
+                    raise RuntimeError("cancelled")
+            try:
+                slots.release(slots.acquire(on_wait))
+            except RuntimeError:
+                pass
+
+        first = threading.Thread(target=waiter, args=("first",))
+        first.start()
+        time.sleep(0.05)
+        second = threading.Thread(target=waiter, args=("second", True))
+        second.start()
+        second.join(2)
+        # The second waiter saw one job ahead and could leave the queue
+        assert positions["first"][0] == 0 and set(positions["second"]) == {1}
+        assert slots.waiting() == 1
+        slots.release(held)
+        first.join(2)
+        assert slots.waiting() == 0 and slots.in_use() == 0
+    finally:
+        model_pool.WAIT_POLL_SECONDS = poll
+
+if __name__ == "__main__":
+    test_model_reused()
+    test_lru_eviction()
+    test_unload()
+    test_budget_shrink()
+    test_thread_plan()
+    test_lease_bounds_concurrency()
+    test_lease_respects_budget()
+    test_leased_model_not_evicted()
+    test_chunked_jobs_lease()
+    test_lease_wait_position_and_abandon()
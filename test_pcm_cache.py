@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+import pcm_cache
+import pipeline
+from model_pool import ModelPool
+from pcm_cache import PcmCache
+from test_transcription_cache import FakeModel
+from transcription_cache import TranscriptionCache
+
+def write_wav(path, seconds=3, rate=44100):
+    t = np.arange(int(seconds * rate)) / rate
+    tone = (np.sin(2 * np.pi * 440 * t) * 12000).astype(np.int16)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(np.repeat(tone, 2).tobytes())
+
+def test_decode_once_then_map():
+    print("--- Test PCM Cache ---")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "tone.wav")
+        write_wav(path)
+        cache = PcmCache(os.path.join(root, "pcm"), max_bytes=10 * 1024 * 1024)
+
+        started = time.perf_counter()
+        decoded = cache.load(path, "ab" * 32)
+        decode_time = time.perf_counter() - started
+        started = time.perf_counter()
+        mapped = cache.load(path, "ab" * 32)
+        map_time = time.perf_counter() - started
+        print(f"decode {decode_time * 1000:.1f} ms, cached {map_time * 1000:.1f} ms")
+
+        assert decoded.dtype == np.float32 and len(decoded) == 3 * 16000
+        assert isinstance(mapped, np.memmap) and not mapped.flags.writeable
+        assert np.array_equal(decoded, mapped)
+        assert cache.decodes == 1
+        stats = cache.stats()
+        assert stats['entries'] == 1 and abs(stats['seconds'] - 3.0) < 0.01
+
+def test_eviction():
+    with tempfile.TemporaryDirectory() as root:
+        cache = PcmCache(root, max_bytes=3 * 16000 * 4)
+        for i in range(3):
+            cache.put(f"{i:02d}" * 32, np.zeros(16000 * 2, dtype=np.float32))
+            time.sleep(0.01)
+        assert cache.stats()['entries'] == 1
+        assert cache.get("02" * 32) is not None and cache.get("00" * 32) is None
+
+def test_decoding_overlaps_model_load():
+    print("--- Test Decode Overlaps Model Load ---")
+    model = FakeModel(1)
+
+    def slow_loader(*args, **kwargs):
+        time.sleep(0.3)
+        return model
+
+    real_get_pool, real_load_audio = pipeline.get_model_pool, pcm_cache.load_audio
+    pool = ModelPool(loader=slow_loader)
+    decoded_audio = []
+
+    def slow_decode(audio):
+        time.sleep(0.3)
+        samples = np.zeros(16000, dtype=np.float32)
+        decoded_audio.append(samples)
+        return samples
+
+    pipeline.get_model_pool = lambda: pool
+    pcm_cache.load_audio = slow_decode
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            started = time.perf_counter()
+            pipeline.transcribe_raw(
+                "talk.m4a", audio_hash="cd" * 32, cache=TranscriptionCache(os.path.join(root, "t")),
+                pcm_cache=PcmCache(os.path.join(root, "pcm"))
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        pipeline.get_model_pool, pcm_cache.load_audio = real_get_pool, real_load_audio
+    print(f"0.3 s load + 0.3 s decode took {elapsed:.2f}s")
+    assert len(decoded_audio) == 1
+    assert elapsed < 0.5
+
+if __name__ == "__main__":
+    test_decode_once_then_map()
+    test_eviction()
+    test_decoding_overlaps_model_load()
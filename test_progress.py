@@ -0,0 +1,95 @@
+import threading
+import time
+
+from progress import Progress, ProgressReporter, format_progress
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_throttled_updates():
+    print("--- Test Progress Throttling ---")
+    received = []
+    threads = set()
+
+    def sink(progress):
+        received.append(progress.fraction)
+        threads.add(threading.current_thread().name)
+
+    with ProgressReporter(sink, interval=0.05) as reporter:
+        # One call per Whisper segment of a long file
+        for i in range(1, 20001):
+            reporter(i / 20000)
+            if i % 1000 == 0:
+                time.sleep(0.01)
+    print(f"{reporter.updates} updates -> {reporter.sent} sent")
+    assert reporter.updates == 20000
+    assert reporter.sent == len(received) <= 10
+    # Updates are sent from the reporter's thread; the final value always arrives (on close)
+    assert "progress-reporter" in threads
+    assert received[-1] == 1.0
+
+def test_min_delta():
+    received = []
+    reporter = ProgressReporter(lambda p: received.append(round(p.fraction, 3)), interval=0.01, min_delta=0.1)
+    for i in range(1, 31):
+        reporter(i / 100)
+        time.sleep(0.005)
+    reporter.close()
+    print(received)
+    # Steps smaller than min_delta are held back until they add up
+    assert all(b - a >= 0.1 for a, b in zip(received, received[1:-1]))
+    assert received[-1] == 0.3
+
+def test_eta_and_rtf():
+    print("--- Test Progress ETA ---")
+    clock = FakeClock()
+    reporter = ProgressReporter(lambda p: None, clock=clock)
+    clock.now = 100.0
+    reporter.begin(audio_seconds=600)
+    clock.now = 130.0
+    progress = reporter.snapshot(0.25)
+    print(progress, format_progress(progress))
+    # 25% in 30 s: 90 s to go; 150 s of audio in 30 s
+    assert progress.eta == 90.0 and progress.rtf == 0.2
+    assert format_progress(progress) == "25% (1:30 left, 0.20x real time)"
+    assert format_progress(Progress(0.0, 0.0, None, None)) == "0%"
+
+def test_sink_error_reaches_producer():
+    class Cancelled(Exception):
+        pass
+
+    def sink(progress):
+        raise Cancelled()
+
+    reporter = ProgressReporter(sink, interval=0.01)
+    reporter(0.1)
+    time.sleep(0.1)
+    try:
+        reporter(0.2)
+        assert False, "expected the sink's exception"
+    except Cancelled:
+        pass
+    reporter.close()
+
+def test_pipeline_uses_reporter():
+    print("--- Test Pipeline Progress ---")
+    import pipeline
+    from bench_suite import FakeWhisperModel
+
+    received = []
+    with ProgressReporter(received.append, interval=0.05) as reporter:
+        raw, _ = pipeline.transcribe_raw("synthetic.wav", progress_callback=reporter, model=FakeWhisperModel(3600))
+    print(f"{len(raw)} segments, {reporter.sent} updates sent")
+    assert reporter.updates == len(raw) and reporter.sent <= 5
+    assert received[-1].fraction > 0.99 and received[-1].rtf is not None
+
+if __name__ == "__main__":
+    test_throttled_updates()
+    test_min_delta()
+    test_eta_and_rtf()
+    test_sink_error_reaches_producer()
+    test_pipeline_uses_reporter()
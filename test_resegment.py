@@ -0,0 +1,28 @@
+import time
+
+import pipeline
+from test_transcription_cache import FakeModel
+
+def test_resegment_matches_transcribe():
+    print("--- Test Re-segmentation ---")
+    model = FakeModel(minutes=10)
+    raw, info = pipeline.transcribe_raw("a.mp3", model=model)
+    for max_chars in (10, 16, 30):
+        direct, _ = pipeline.transcribe("a.mp3", max_chars=max_chars, model=model)
+        assert pipeline.resegment(raw, max_chars=max_chars) == direct
+    assert info.duration == 600.0
+
+def test_resegment_hour_under_100ms():
+    print("--- Test Re-segmentation Speed ---")
+    raw, _ = pipeline.transcribe_raw("a.mp3", model=FakeModel(minutes=60))
+    best = float("inf")
+    for max_chars in (16, 24, 12):
+        started = time.perf_counter()
+        segments = pipeline.resegment(raw, max_chars=max_chars, keep_words=True)
+        best = min(best, time.perf_counter() - started)
+    print(f"{raw.word_count} words -> {len(segments)} cues in {best * 1000:.1f} ms")
+    assert best < 0.1
+
+if __name__ == "__main__":
+    test_resegment_matches_transcribe()
+    test_resegment_hour_under_100ms()
@@ -0,0 +1,97 @@
+import random
+import time
+
+from script_alignment import NgramIndex, ScriptAligner, align_segments, normalize, split_sentences
+
+SCRIPT = """안녕하세요. 저는 김민중입니다.
+오늘은 날씨가 참 좋네요? 그렇죠!
+내일은 비가 올까요. 아마 그럴 겁니다."""
+
+def random_sentences(count, seed=7):
+    """Distinct sentences of random Hangul words, so only the true sentence matches well."""
+    rng = random.Random(seed)
+    def word():
+        return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(2, 4)))
+    return [" ".join(word() for _ in range(rng.randint(5, 9))) for _ in range(count)]
+
+def make_segments(texts):
+    return [{'start': float(i), 'end': i + 1.0, 'text': text} for i, text in enumerate(texts)]
+
+def test_normalize_keeps_positions():
+    text, positions = normalize("날씨가 참, 좋네요.")
+    assert text == "날씨가참좋네요"
+    assert positions == [0, 1, 2, 4, 7, 8, 9]
+
+def test_snaps_to_script_wording():
+    print("--- Test Script Alignment ---")
+    segments = make_segments(["안녕하세요", "저는 김민 중입니다", "오늘은 날씨가", "아마 그럴겁니다"])
+    aligned, stats = align_segments(segments, SCRIPT)
+    texts = [s['text'] for s in aligned]
+    print(texts, stats)
+    assert texts == ["안녕하세요", "저는 김민중입니다", "오늘은 날씨가", "아마 그럴 겁니다"]
+    # Timings are untouched
+    assert [s['start'] for s in aligned] == [0.0, 1.0, 2.0, 3.0]
+
+def test_unmatched_text_is_kept():
+    segments = make_segments(["음", "전혀 다른 이야기를 합니다"])
+    aligned, stats = align_segments(segments, SCRIPT)
+    assert [s['text'] for s in aligned] == ["음", "전혀 다른 이야기를 합니다"]
+    assert stats['unmatched'] == 2
+
+def test_monotonic():
+    aligner = ScriptAligner(SCRIPT)
+    aligner.align_text("오늘은 날씨가 참 좋네요")
+    position = aligner.position
+    # An earlier sentence is not matched once the aligner has moved past it
+    assert aligner.align_text("저는 김민중입니다") == "저는 김민중입니다"
+    assert aligner.position == position
+
+def test_reanchors_after_skip():
+    print("--- Test Re-anchoring After a Skip ---")
+    sentences = random_sentences(2000)
+    script = "\n".join(sentences)
+    aligner = ScriptAligner(script, window=20)
+    assert aligner.align_text(sentences[0]) == sentences[0]
+    # The speaker jumps far past the window
+    assert aligner.align_text(sentences[1500]) == sentences[1500]
+    assert aligner.stats['reanchored'] == 1
+    assert aligner.position == 1501
+    assert aligner.align_text(sentences[1501]) == sentences[1501]
+
+def test_index_candidates():
+    texts = [normalize(s)[0] for s in split_sentences(SCRIPT)]
+    index = NgramIndex(texts)
+    assert index.candidates("날씨가좋네요")[0] == 2
+    assert 2 not in index.candidates("날씨가좋네요", start=3)
+
+def test_long_transcript_is_fast():
+    print("--- Test Alignment Speed ---")
+    sentences = random_sentences(5000)
+    script = "\n".join(sentences)
+    # Each sentence is read as two subtitles with Whisper's spacing; 50 of every 500 sentences are skipped
+    texts = []
+    expected = []
+    for i, sentence in enumerate(sentences):
+        if 250 <= i % 500 < 300:
+            continue
+        words = sentence.split()
+        half = len(words) // 2
+        expected.extend([" ".join(words[:half]), " ".join(words[half:])])
+        texts.extend(["".join(words[:half]), "".join(words[half:])])
+    started = time.perf_counter()
+    aligned, stats = align_segments(make_segments(texts), script)
+    elapsed = time.perf_counter() - started
+    print(f"{len(texts)} subtitles against {len(sentences)} sentences in {elapsed:.2f}s: {stats}")
+    assert stats['reanchored'] == 10
+    correct = sum(a['text'] == e for a, e in zip(aligned, expected))
+    assert correct > len(texts) * 0.99
+    assert elapsed < 10
+
+if __name__ == "__main__":
+    test_normalize_keeps_positions()
+    test_snaps_to_script_wording()
+    test_unmatched_text_is_kept()
+    test_monotonic()
+    test_reanchors_after_skip()
+    test_index_candidates()
+    test_long_transcript_is_fast()
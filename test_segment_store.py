@@ -0,0 +1,84 @@
+import io
+import random
+
+from pipeline import format_timestamp
+from segment_store import WRITE_BATCH, SegmentStore, format_timestamps
+from subtitle_writer import write_format
+
+SEGMENTS = [
+    {'start': 0.0, 'end': 1.5, 'text': "안녕하세요"},
+    {'start': 1.8, 'end': 3.25, 'text': "저는 김민중입니다"},
+    {'start': 5.0, 'end': 6.0, 'text': ""},
+    {'start': 3661.5, 'end': 3663.0, 'text': "반갑습니다"}
+]
+
+def test_timestamp_rounding():
+    print("--- Test Timestamp Rounding ---")
+    # Rounding must carry into the seconds instead of printing 1000 milliseconds
+    assert format_timestamp(59.9996) == "00:01:00,000"
+    assert format_timestamp(3599.9999) == "01:00:00,000"
+    assert format_timestamp(1.0004) == "00:00:01,000"
+    assert format_timestamp(-0.3) == "00:00:00,000"
+    assert format_timestamp(360000.0) == "100:00:00,000"
+
+def test_vectorized_matches_format_timestamp():
+    print("--- Test Vectorized Timestamps ---")
+    rng = random.Random(0)
+    times = [rng.uniform(0, 40000) for _ in range(2000)] + [59.9996, 0.0005, 0.0015, -1.0, 360000.4, 3599.9995]
+    assert format_timestamps(times).tolist() == [format_timestamp(t) for t in times]
+    assert format_timestamps(times, ".").tolist() == [format_timestamp(t).replace(",", ".") for t in times]
+    assert format_timestamps([]).tolist() == []
+
+def test_round_trip_and_output():
+    print("--- Test Store Round Trip And Output ---")
+    store = SegmentStore.from_segments(SEGMENTS)
+    assert len(store) == 4
+    assert store.to_segments() == SEGMENTS
+    assert store[1] == SEGMENTS[1] and store[-1] == SEGMENTS[-1]
+    assert store.texts(1, 3) == ["저는 김민중입니다", ""]
+
+    for fmt, write in (("srt", store.write_srt), ("vtt", store.write_vtt)):
+        expected, actual = io.StringIO(), io.StringIO()
+        write_format(SEGMENTS, fmt, expected)
+        assert write(actual) == 4
+        assert actual.getvalue() == expected.getvalue()
+
+    empty = SegmentStore.from_segments([])
+    assert len(empty) == 0 and empty.to_segments() == []
+
+def test_batches():
+    print("--- Test Output Across Batches ---")
+    segments = [{'start': i * 2.0, 'end': i * 2.0 + 1.0, 'text': f"자막 {i}"} for i in range(WRITE_BATCH * 2 + 3)]
+    store = SegmentStore.from_segments(segments)
+    expected, actual = io.StringIO(), io.StringIO()
+    write_format(segments, "srt", expected)
+    store.write_srt(actual)
+    assert actual.getvalue() == expected.getvalue()
+    assert store.to_segments() == segments
+
+def test_retiming():
+    print("--- Test Bulk Retiming ---")
+    store = SegmentStore.from_segments(SEGMENTS)
+
+    shifted = store.shift(-1.0)
+    assert shifted.starts.tolist() == [0.0, 0.8, 4.0, 3660.5]
+    assert shifted.ends.tolist()[0] == 0.5
+    # Retiming returns a new store; the original is untouched
+    assert store.starts[1] == 1.8
+    assert shifted.texts() == store.texts()
+
+    converted = store.convert_frame_rate(25, 50)
+    assert converted.starts.tolist() == [t / 2 for t in store.starts.tolist()]
+
+    closed = store.close_gaps(0.5, min_gap=0.1)
+    # 1.5 -> 1.8 is closed up to 0.1 s before the next cue; 3.25 -> 5.0 is too long a pause
+    assert abs(closed.ends[0] - 1.7) < 1e-9
+    assert closed.ends[1] == 3.25
+    assert closed.ends[-1] == 3663.0
+
+if __name__ == "__main__":
+    test_timestamp_rounding()
+    test_vectorized_matches_format_timestamp()
+    test_round_trip_and_output()
+    test_batches()
+    test_retiming()
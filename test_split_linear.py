@@ -0,0 +1,101 @@
+import random
+
+from pipeline import format_text, split_into_segments
+
+class MockWord:
+    def __init__(self, word, start, end):
+        self.word = word
+        self.start = start
+        self.end = end
+
+def reference_split_into_segments(words, max_chars=16):
+    """The original (quadratic) splitter, kept verbatim to check the rewrite against."""
+    segments = []
+    current_words = []
+
+    for word in words:
+        current_len = sum(len(w.word) for w in current_words)
+        new_len = current_len + len(word.word)
+
+        force_break = False
+        if current_words:
+            last_word_text = current_words[-1].word.strip()
+            if last_word_text.endswith('.') or last_word_text.endswith('?'):
+                force_break = True
+
+        if (new_len > max_chars and current_words) or force_break:
+            start = current_words[0].start
+            end = current_words[-1].end
+            text = "".join([w.word for w in current_words])
+            formatted_text = format_text(text).strip()
+            segments.append({'start': start, 'end': end, 'text': formatted_text})
+            current_words = [word]
+        else:
+            current_words.append(word)
+
+    if current_words:
+        start = current_words[0].start
+        end = current_words[-1].end
+        text = "".join([w.word for w in current_words])
+        formatted_text = format_text(text).strip()
+        segments.append({'start': start, 'end': end, 'text': formatted_text})
+
+    return segments
+
+# Word lists from test_splitting.py, test_punctuation_split.py and test_hybrid.py
+FIXTURES = {
+    "splitting": ([
+        MockWord("안녕하세요.", 0.0, 1.0),
+        MockWord("저는", 1.0, 1.5),
+        MockWord("김민중입니다.", 1.5, 2.5),
+        MockWord("반갑습니다!", 2.5, 3.5)
+    ], 14),
+    "punctuation_split": ([
+        MockWord("안녕하세요.", 0, 1),
+        MockWord(" ", 1, 1.1),
+        MockWord("반갑습니다.", 1.1, 2)
+    ], 50),
+    "hybrid": ([
+        MockWord("안녕하세요", 0.0, 1.0)
+    ], 14),
+    "hybrid_long": ([
+        MockWord("이것은", 2.0, 2.5),
+        MockWord("아주", 2.5, 3.0),
+        MockWord("긴", 3.0, 3.5),
+        MockWord("문장이라서", 3.5, 4.5),
+        MockWord("반드시", 4.5, 5.0),
+        MockWord("잘라야", 5.0, 5.5),
+        MockWord("합니다", 5.5, 6.0)
+    ], 14),
+}
+
+def test_fixtures_match_reference():
+    print("--- Test Linear Split vs Reference (fixtures) ---")
+    for name, (words, max_chars) in FIXTURES.items():
+        for limit in (max_chars, 16, 5):
+            expected = reference_split_into_segments(words, max_chars=limit)
+            actual = split_into_segments(words, max_chars=limit)
+            print(f"{name} (max_chars={limit}): {[s['text'] for s in actual]}")
+            assert actual == expected
+
+def test_random_streams_match_reference():
+    print("--- Test Linear Split vs Reference (random) ---")
+    rng = random.Random(1234)
+    vocabulary = [" 안녕하세요", " 저는", " 김민중입니다.", " 반갑습니다!", " 정말요?", " 네", " -", " 그렇죠,", "긴단어입니다"]
+    for _ in range(200):
+        words = []
+        t = 0.0
+        for _ in range(rng.randint(0, 40)):
+            words.append(MockWord(rng.choice(vocabulary), t, t + 0.3))
+            t += 0.3
+        limit = rng.randint(1, 40)
+        assert split_into_segments(words, max_chars=limit) == reference_split_into_segments(words, max_chars=limit)
+
+def test_accepts_iterators():
+    words = FIXTURES["hybrid_long"][0]
+    assert split_into_segments(iter(words), max_chars=14) == split_into_segments(words, max_chars=14)
+
+if __name__ == "__main__":
+    test_fixtures_match_reference()
+    test_random_streams_match_reference()
+    test_accepts_iterators()
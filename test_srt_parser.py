@@ -0,0 +1,117 @@
+import io
+import os
+import tempfile
+
+from pipeline import format_timestamp, generate_srt_content
+from segment_store import SegmentStore
+from srt_parser import SubtitleParseError, iter_segments, parse_file, parse_subtitles, parse_timestamp
+from subtitle_writer import write_format
+
+SEGMENTS = [
+    {'start': 0.0, 'end': 1.5, 'text': "안녕하세요"},
+    {'start': 1.5, 'end': 3.25, 'text': "저는\n김민중입니다"},
+    {'start': 3661.5, 'end': 3663.0, 'text': "반갑습니다"}
+]
+
+LLM_OUTPUT = """Here is the corrected SRT:
+```srt
+1
+00:00:00,000 --> 00:00:01,500
+안녕하세요
+2
+00:00:01,5 --> 00:00:03:250
+저는 김민중입니다
+
+
+00:00:04.000 --> 00:00:03.000
+거꾸로
+4
+00:00:xx,000 --> 00:00:06,000
+버려짐
+
+5 00:00:07,000 --> 00:00:08,000
+한 줄
+```
+"""
+
+def test_parse_timestamp():
+    print("--- Test Timestamp Parsing ---")
+    assert parse_timestamp("01:01:01,500") == 3661.5
+    assert parse_timestamp("00:01.250") == 1.25
+    assert parse_timestamp("0:00:02") == 2.0
+    assert parse_timestamp("00:00:02:5") == 2.5
+    assert parse_timestamp("100:00:00,000") == 360000.0
+    assert parse_timestamp("00:61:00,000") is None
+    assert parse_timestamp("00:00:xx") is None
+
+def test_round_trip():
+    print("--- Test SRT/VTT Round Trip ---")
+    for fmt in ("srt", "vtt"):
+        out = io.StringIO()
+        write_format(SEGMENTS, fmt, out)
+        segments, issues = parse_subtitles(out.getvalue())
+        assert segments == SEGMENTS and issues == []
+    # Windows line endings and a byte order mark
+    srt = "\ufeff" + generate_srt_content(SEGMENTS).replace("\n", "\r\n")
+    assert parse_subtitles(srt) == (SEGMENTS, [])
+
+def test_malformed_llm_output():
+    print("--- Test Malformed LLM Output ---")
+    segments, issues = parse_subtitles(LLM_OUTPUT)
+    print(issues)
+    assert [s['text'] for s in segments] == ["안녕하세요", "저는 김민중입니다", "거꾸로", "한 줄"]
+    assert segments[1]['start'] == 1.5 and segments[1]['end'] == 3.25
+    assert segments[2]['end'] == segments[2]['start'] == 4.0
+    assert [(i.line, i.column) for i in issues] == [(1, 1), (11, 18), (14, 1)]
+    assert "ends before it starts" in issues[1].message
+    assert "00:00:xx,000" in issues[2].message
+
+    try:
+        parse_subtitles(LLM_OUTPUT.split("```srt\n")[1], strict=True)
+        assert False, "strict mode should raise"
+    except SubtitleParseError as e:
+        assert (e.line, e.column) == (9, 18)
+
+def test_arrow_in_text():
+    print("--- Test Arrow In Subtitle Text ---")
+    srt = "1\n00:00:01,000 --> 00:00:02,000\n서울 --> 부산\nA --> B\n\n2\n00:00:03,000 --> 00:00:04,000\n다음\n"
+    segments, issues = parse_subtitles(srt)
+    assert issues == []
+    assert [s['text'] for s in segments] == ["서울 --> 부산\nA --> B", "다음"]
+
+    # Times in the text are not a timing line either, unless written out in full
+    srt = "1\n00:00:01,000 --> 00:00:02,000\n회의 시간은\n9:00 → 10:00\n00:01.000 --> 00:02.000\n"
+    srt += "00:00:03,000 --> 00:00:04,000\n다음\n"
+    segments, issues = parse_subtitles(srt)
+    assert issues == []
+    assert segments == [
+        {'start': 1.0, 'end': 2.0, 'text': "회의 시간은\n9:00 → 10:00\n00:01.000 --> 00:02.000"},
+        {'start': 3.0, 'end': 4.0, 'text': "다음"}
+    ]
+
+def test_vtt_blocks():
+    print("--- Test WebVTT Header And Blocks ---")
+    vtt = "WEBVTT - lecture\nKind: captions\n\nNOTE\nnot a cue\n\nintro\n00:01.000 --> 00:02.500 line:0\nHi\n"
+    assert parse_subtitles(vtt) == ([{'start': 1.0, 'end': 2.5, 'text': "Hi"}], [])
+
+def test_streams_large_file():
+    print("--- Test Streaming A File ---")
+    segments = [{'start': i * 2.0, 'end': i * 2.0 + 1.5, 'text': f"자막 {i}"} for i in range(20000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "large.srt")
+        with open(path, "w", encoding="utf-8") as f:
+            write_format(segments, "srt", f)
+        parsed, issues = parse_file(path)
+        assert parsed == segments and issues == []
+        # Straight into columnar storage, one line at a time
+        with open(path, encoding="utf-8") as f:
+            store = SegmentStore.from_segments(iter_segments(f))
+        assert len(store) == 20000 and format_timestamp(store.ends[-1]) == "11:06:39,500"
+
+if __name__ == "__main__":
+    test_parse_timestamp()
+    test_round_trip()
+    test_malformed_llm_output()
+    test_arrow_in_text()
+    test_vtt_blocks()
+    test_streams_large_file()
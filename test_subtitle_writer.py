@@ -0,0 +1,61 @@
+import io
+import json
+
+from pipeline import format_timestamp, generate_srt_content
+from subtitle_writer import SubtitleWriter, render_bytes, write_subtitles
+
+SEGMENTS = [
+    {'start': 0.0, 'end': 1.5, 'text': "안녕하세요", 'words': [(0.0, 1.5, " 안녕하세요.")]},
+    {'start': 1.5, 'end': 3.25, 'text': "저는 김민중입니다"},
+    {'start': 3661.5, 'end': 3663.0, 'text': "반갑습니다"}
+]
+
+def concat_srt(segments):
+    """The original string-concatenation renderer, for comparison."""
+    srt_content = ""
+    for i, segment in enumerate(segments, start=1):
+        start_time = format_timestamp(segment['start'])
+        end_time = format_timestamp(segment['end'])
+        srt_content += f"{i}\n{start_time} --> {end_time}\n{segment['text']}\n\n"
+    return srt_content
+
+def test_srt_matches_original():
+    print("--- Test SRT Output ---")
+    assert generate_srt_content(SEGMENTS) == concat_srt(SEGMENTS)
+    assert generate_srt_content([]) == ""
+
+def test_single_pass_all_formats():
+    print("--- Test SRT/VTT/JSON In One Pass ---")
+    srt, vtt, json_out = io.StringIO(), io.StringIO(), io.StringIO()
+
+    def once():
+        # A generator can only be consumed once, so all outputs must come from one pass
+        yield from SEGMENTS
+
+    count = write_subtitles(once(), srt=srt, vtt=vtt, json_out=json_out)
+    assert count == 3
+    assert srt.getvalue() == concat_srt(SEGMENTS)
+
+    print(vtt.getvalue())
+    assert vtt.getvalue().startswith("WEBVTT\n\n1\n00:00:00.000 --> 00:00:01.500\n안녕하세요\n\n")
+    assert "01:01:01.500 --> 01:01:03.000" in vtt.getvalue()
+
+    cues = json.loads(json_out.getvalue())
+    assert [c['index'] for c in cues] == [1, 2, 3]
+    assert cues[0]['words'] == [{'start': 0.0, 'end': 1.5, 'word': " 안녕하세요."}]
+    assert 'words' not in cues[1]
+
+def test_empty_and_bytes():
+    print("--- Test Empty JSON / Bytes Rendering ---")
+    json_out = io.StringIO()
+    with SubtitleWriter(json_out=json_out):
+        pass
+    assert json.loads(json_out.getvalue()) == []
+
+    data = render_bytes(SEGMENTS, "srt").read().decode("utf-8")
+    assert data == concat_srt(SEGMENTS)
+
+if __name__ == "__main__":
+    test_srt_matches_original()
+    test_single_pass_all_formats()
+    test_empty_and_bytes()
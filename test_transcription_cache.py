@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+
+import pipeline
+from disk_cache import DiskCache
+from pipeline import Segment, Word
+from transcript import RawTranscript
+from transcription_cache import TranscriptionCache, hash_bytes, make_key
+
+class FakeInfo:
+    def __init__(self, duration):
+        self.duration = duration
+
+class FakeModel:
+    """Emits `minutes` of synthetic speech: one 5-second segment of 14 words at a time."""
+
+    def __init__(self, minutes):
+        self.minutes = minutes
+        self.calls = 0
+
+    def transcribe(self, audio, **kwargs):
+        self.calls += 1
+        segments = []
+        for i in range(self.minutes * 12):
+            start = i * 5.0
+            words = [Word(start + j * 0.35, start + j * 0.35 + 0.3, f" 단어{j}", 0.9) for j in range(14)]
+            segments.append(Segment(start, start + 5.0, "".join(w.word for w in words) + ".", words))
+        return iter(segments), FakeInfo(self.minutes * 60.0)
+
+def test_raw_transcript_round_trip():
+    print("--- Test RawTranscript Round Trip ---")
+    segments = [
+        Segment(0.0, 1.2, " 안녕하세요.", [Word(0.0, 1.2, " 안녕하세요.", 0.875)]),
+        Segment(1.2, 2.0, " 음", None),
+    ]
+    transcript = RawTranscript.from_segments(segments, duration=2.0)
+    restored = RawTranscript.from_bytes(transcript.to_bytes())
+    assert list(restored.iter_segments()) == segments
+    assert restored.duration == 2.0 and restored.word_count == 1
+
+def test_disk_cache_lru():
+    print("--- Test Disk Cache LRU ---")
+    with tempfile.TemporaryDirectory() as root:
+        cache = DiskCache(root, max_bytes=250)
+        for key in ("aa01", "bb02"):
+            cache.put(key, b"x" * 100)
+        # Make aa01 the most recently used, then push the cache over budget
+        past = time.time() - 10
+        os.utime(cache._path("bb02"), (past, past))
+        assert cache.get("aa01") == b"x" * 100
+        cache.put("cc03", b"y" * 100)
+        assert cache.get("bb02") is None
+        assert cache.get("aa01") is not None and cache.get("cc03") is not None
+        stats = cache.stats()
+        print(stats)
+        assert stats['evictions'] == 1 and stats['misses'] == 1 and stats['size_bytes'] <= 250
+
+def test_key_covers_decode_params():
+    base = make_key("abc", "medium", "int8", 5, "ko", "김민중")
+    assert base == make_key("abc", "medium", "int8", 5, "ko", "김민중")
+    assert base != make_key("abc", "medium", "int8", 5, "ko", None)
+    assert base != make_key("abc", "small", "int8", 5, "ko", "김민중")
+    assert base != make_key("abd", "medium", "int8", 5, "ko", "김민중")
+    # Chunked and sequential transcripts of the same file are kept apart
+    chunked = make_key("abc", "medium", "int8", 5, "ko", "김민중", max_chunk_seconds=60)
+    assert chunked != base
+    assert chunked != make_key("abc", "medium", "int8", 5, "ko", "김민중", max_chunk_seconds=30)
+
+def test_cache_hit_skips_whisper():
+    print("--- Test Cache Hit ---")
+    with tempfile.TemporaryDirectory() as root:
+        cache = TranscriptionCache(root)
+        model = FakeModel(minutes=120)
+        audio_hash = hash_bytes(b"same mp3 bytes")
+
+        first, info = pipeline.transcribe("a.mp3", model=model, audio_hash=audio_hash, cache=cache)
+        assert model.calls == 1 and not getattr(info, "cached", False)
+
+        started = time.perf_counter()
+        second, info = pipeline.transcribe("a.mp3", model=model, audio_hash=audio_hash, cache=cache)
+        elapsed = time.perf_counter() - started
+        print(f"2h transcript from cache in {elapsed * 1000:.0f} ms ({len(second)} cues)")
+        assert model.calls == 1 and info.cached and info.duration == 7200.0
+        assert second == first
+        assert elapsed < 1.0
+
+        # Formatting settings are not part of the key
+        wider, _ = pipeline.transcribe("a.mp3", max_chars=40, model=model, audio_hash=audio_hash, cache=cache)
+        assert model.calls == 1 and len(wider) < len(first)
+
+        # A different prompt is a different decode
+        pipeline.transcribe("a.mp3", initial_prompt="김민중", model=model, audio_hash=audio_hash, cache=cache)
+        assert model.calls == 2
+        assert cache.stats()['hits'] == 2
+
+if __name__ == "__main__":
+    test_raw_transcript_round_trip()
+    test_disk_cache_lru()
+    test_key_covers_decode_params()
+    test_cache_hit_skips_whisper()
@@ -0,0 +1,68 @@
+import io
+import os
+import tempfile
+import tracemalloc
+
+from transcription_cache import hash_bytes, hash_file
+from uploads import save_upload, upload_suffix
+
+UPLOAD_MB = 64
+
+class FakeUpload(io.BytesIO):
+    """Like Streamlit's UploadedFile: an in-memory buffer with a name."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+def test_suffix():
+    assert upload_suffix("lecture.WAV") == ".wav"
+    assert upload_suffix("noext") == ".mp3"
+    assert upload_suffix(None) == ".mp3"
+
+def test_round_trip_and_hash():
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    upload = FakeUpload(data, "talk.m4a")
+    upload.read(10)  # a partially read upload is still saved from the start
+    with tempfile.TemporaryDirectory() as directory:
+        path, digest, size = save_upload(upload, directory=directory)
+        assert path.endswith(".m4a") and size == len(data)
+        assert digest == hash_bytes(data) == hash_file(path)
+        with open(path, "rb") as f:
+            assert f.read() == data
+
+def test_peak_memory():
+    print("--- Test Upload Peak Memory ---")
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "big.wav")
+        with open(source, "wb") as f:
+            for _ in range(UPLOAD_MB):
+                f.write(b"\0" * 1024 * 1024)
+
+        tracemalloc.start()
+        try:
+            # The old path: read everything into memory, write it, hash it
+            tracemalloc.reset_peak()
+            with open(source, "rb") as upload:
+                data = upload.read()
+            with open(os.path.join(directory, "old.wav"), "wb") as f:
+                f.write(data)
+            hash_bytes(data)
+            del data
+            _, old_peak = tracemalloc.get_traced_memory()
+
+            tracemalloc.reset_peak()
+            with open(source, "rb") as upload:
+                path, digest, size = save_upload(upload, directory=directory)
+            _, new_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert size == UPLOAD_MB * 1024 * 1024 and digest == hash_file(source)
+    print(f"read() + write: {old_peak / 2**20:.1f} MB peak, streamed: {new_peak / 2**20:.1f} MB peak")
+    assert old_peak >= UPLOAD_MB * 1024 * 1024
+    assert new_peak < 4 * 1024 * 1024
+
+if __name__ == "__main__":
+    test_suffix()
+    test_round_trip_and_hash()
+    test_peak_memory()
@@ -0,0 +1,119 @@
+"""
+Compact storage for raw Whisper output (segments plus word timestamps).
+
+Instead of keeping thousands of Segment/Word objects alive, timings live in flat
+arrays and texts in two lists. A transcript can be serialized to a compressed
+byte string and turned back into Segment/Word tuples for re-segmentation.
+"""
+import json
+import struct
+import zlib
+from array import array
+from collections import namedtuple
+
+from pipeline import LANGUAGE, Segment, Word
+
+TranscriptInfo = namedtuple("TranscriptInfo", "duration language cached")
+
+_MAGIC = b"RTX1"
+
+class RawTranscript:
+    def __init__(self, duration=0.0, language=LANGUAGE):
+        self.duration = duration
+        self.language = language
+        self.segment_starts = array("d")
+        self.segment_ends = array("d")
+        self.segment_texts = []
+        # Words of segment i are word_* [word_offsets[i]:word_offsets[i + 1]]
+        self.word_offsets = array("I", [0])
+        self.word_starts = array("d")
+        self.word_ends = array("d")
+        self.word_probabilities = array("f")
+        self.word_texts = []
+
+    @classmethod
+    def from_segments(cls, segments, duration=0.0, language=LANGUAGE):
+        transcript = cls(duration, language)
+        for segment in segments:
+            transcript.append(segment)
+        return transcript
+
+    def append(self, segment):
+        """Adds one Whisper (or pipeline) segment."""
+        self.segment_starts.append(segment.start)
+        self.segment_ends.append(segment.end)
+        self.segment_texts.append(segment.text)
+        for word in segment.words or ():
+            self.word_starts.append(word.start)
+            self.word_ends.append(word.end)
+            self.word_probabilities.append(word.probability)
+            self.word_texts.append(word.word)
+        self.word_offsets.append(len(self.word_texts))
+
+    def __len__(self):
+        return len(self.segment_texts)
+
+    @property
+    def word_count(self):
+        return len(self.word_texts)
+
+    def iter_segments(self):
+        """Yields pipeline.Segment tuples with their Word lists."""
+        offsets = self.word_offsets
+        for i in range(len(self.segment_texts)):
+            lo, hi = offsets[i], offsets[i + 1]
+            words = [
+                Word(self.word_starts[j], self.word_ends[j], self.word_texts[j], self.word_probabilities[j])
+                for j in range(lo, hi)
+            ]
+            yield Segment(self.segment_starts[i], self.segment_ends[i], self.segment_texts[i], words or None)
+
+    def info(self, cached=False):
+        return TranscriptInfo(duration=self.duration, language=self.language, cached=cached)
+
+    def to_bytes(self):
+        header = json.dumps({
+            'duration': self.duration,
+            'language': self.language,
+            'segments': len(self.segment_texts),
+            'words': len(self.word_texts),
+            'segment_texts': self.segment_texts,
+            'word_texts': self.word_texts
+        }, ensure_ascii=False).encode("utf-8")
+        body = b"".join([
+            self.segment_starts.tobytes(),
+            self.segment_ends.tobytes(),
+            self.word_offsets.tobytes(),
+            self.word_starts.tobytes(),
+            self.word_ends.tobytes(),
+            self.word_probabilities.tobytes()
+        ])
+        return _MAGIC + zlib.compress(struct.pack("<I", len(header)) + header + body, 6)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != _MAGIC:
+            raise ValueError("Not a serialized RawTranscript")
+        raw = zlib.decompress(data[4:])
+        (header_len,) = struct.unpack_from("<I", raw)
+        header = json.loads(raw[4:4 + header_len].decode("utf-8"))
+        transcript = cls(header['duration'], header['language'])
+        transcript.segment_texts = header['segment_texts']
+        transcript.word_texts = header['word_texts']
+
+        position = 4 + header_len
+        n_segments, n_words = header['segments'], header['words']
+        for name, count in (
+            ("segment_starts", n_segments),
+            ("segment_ends", n_segments),
+            ("word_offsets", n_segments + 1),
+            ("word_starts", n_words),
+            ("word_ends", n_words),
+            ("word_probabilities", n_words),
+        ):
+            values = getattr(transcript, name)
+            del values[:]
+            size = values.itemsize * count
+            values.frombytes(raw[position:position + size])
+            position += size
+        return transcript
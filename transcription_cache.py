@@ -0,0 +1,77 @@
+"""
+Content-addressed cache of raw Whisper transcripts.
+
+The key is a hash of the audio bytes plus every parameter that changes the decode
+(model size, compute type, beam size, language, initial prompt and, for chunked
+transcription, the chunk length, since the VAD split moves segment boundaries and
+skips non-speech), so re-uploading
+the same file with the same settings skips Whisper entirely. Formatting settings
+such as max_chars are not part of the key: subtitles are re-split from the cached
+words.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from disk_cache import DEFAULT_CACHE_DIR, DiskCache
+from transcript import RawTranscript
+
+DEFAULT_MAX_MB = int(os.getenv("TRANSCRIPT_CACHE_MB", "512"))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def make_key(audio_hash, model_size, compute_type, beam_size, language, initial_prompt, max_chunk_seconds=None):
+    """max_chunk_seconds: None for sequential transcription, the chunk limit for chunked transcription."""
+    params = [audio_hash, model_size, compute_type, beam_size, language, initial_prompt or ""]
+    if max_chunk_seconds is not None:
+        # Sequential keys stay as they were, so existing cache entries remain valid
+        params += ["chunked", max_chunk_seconds]
+    params = json.dumps(params, ensure_ascii=False)
+    return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+class TranscriptionCache:
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.store = DiskCache(root or os.path.join(DEFAULT_CACHE_DIR, "transcripts"), max_bytes)
+
+    def get(self, key):
+        """Returns a RawTranscript, or None on a miss (or an unreadable entry)."""
+        data = self.store.get(key)
+        if data is None:
+            return None
+        try:
+            return RawTranscript.from_bytes(data)
+        except Exception:
+            self.store.delete(key)
+            return None
+
+    def put(self, key, transcript):
+        self.store.put(key, transcript.to_bytes())
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self):
+        return self.store.stats()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_transcription_cache():
+    """Returns the process-wide transcription cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptionCache()
+        return _cache
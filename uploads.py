@@ -0,0 +1,38 @@
+"""
+Saving uploaded audio to disk without holding a second copy in memory.
+
+Uploads are copied to a temporary file in fixed-size chunks and hashed while they
+are written, so the transcription cache key costs no extra pass and peak memory
+stays at one chunk no matter how large the file is. The file keeps the upload's
+extension so the decoder can tell WAV from MP3 from M4A.
+"""
+import hashlib
+import os
+import tempfile
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+def upload_suffix(name, default=".mp3"):
+    suffix = os.path.splitext(name or "")[1].lower()
+    return suffix or default
+
+def save_upload(fileobj, name=None, directory=None, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Streams a file object to a new temporary file. Returns (path, SHA-256 hex digest, size in bytes).
+    The caller removes the file.
+    """
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=upload_suffix(name or getattr(fileobj, "name", None)), dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest(), size